@@ -0,0 +1,51 @@
+"""Benchmark batched VLM generation against one generate call per frame.
+
+Uses a tiny random SmolVLM on CPU, so it runs offline; it checks that
+batched outputs match per-frame outputs and reports frames/s.
+
+Usage (from backend/): python bench/batching.py [frame_count]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from tests.synthetic import make_tiny_smolvlm  # noqa: E402
+from video_processor import process_batch  # noqa: E402
+
+
+def benchmark_batching(frame_count: int = 32, batch_sizes=(1, 2, 4, 8, 16),
+                       max_new_tokens: int = 20):
+    """Check batched generation against per-frame generation and report frames/s."""
+    model, processor = make_tiny_smolvlm()
+    rng = np.random.default_rng(0)
+    # Mixed aspect ratios, so prompts differ in length and need padding
+    sizes = [(64, 16), (16, 64), (48, 32), (64, 64)]
+    images = [Image.fromarray(rng.integers(0, 255, (h, w, 3), dtype=np.uint8))
+              for w, h in (sizes[i % len(sizes)] for i in range(frame_count))]
+
+    process_batch(images[:1], model, processor, max_new_tokens)  # warm-up
+    start = time.perf_counter()
+    reference = [description for image in images
+                 for description in process_batch([image], model, processor, max_new_tokens)]
+    elapsed = time.perf_counter() - start
+    print(f"sequential: {frame_count / elapsed:.1f} frames/s")
+
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        descriptions = []
+        for i in range(0, frame_count, batch_size):
+            descriptions.extend(process_batch(
+                images[i:i + batch_size], model, processor, max_new_tokens))
+        elapsed = time.perf_counter() - start
+        matches = sum(a == b for a, b in zip(descriptions, reference))
+        print(f"batch_size={batch_size:>2}: {frame_count / elapsed:.1f} frames/s, "
+              f"{matches}/{frame_count} outputs match sequential")
+
+
+if __name__ == "__main__":
+    benchmark_batching(frame_count=int(sys.argv[1]) if len(sys.argv) > 1 else 32)
@@ -0,0 +1,95 @@
+"""Benchmark int8 CPU inference against the reference model.
+
+Reports per-frame latency and agreement with the reference model (fp16 on
+GPU, fp32 on CPU) on a fixed set of frames. Agreement is the share of
+identical descriptions and the mean word-level similarity (difflib
+ratio). Pass "tiny" (the default) for a tiny random SmolVLM that runs
+offline; its outputs are noise, so only the latency and the plumbing are
+meaningful then.
+
+Usage (from backend/): python bench/cpu_inference.py [model_id|tiny] [threads] [max_new_tokens]
+"""
+import difflib
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from tests.synthetic import make_tiny_smolvlm  # noqa: E402
+from video_processor import (  # noqa: E402
+    MAX_NEW_TOKENS,
+    _release_memory,
+    load_model,
+    process_batch,
+    quantize_language_model,
+)
+
+
+def _quantized(entry: Tuple) -> Tuple:
+    model, processor = entry
+    return quantize_language_model(model), processor
+
+
+def benchmark_cpu_inference(model_id: Optional[str] = None, frame_count: int = 8,
+                            threads: int = 0, max_new_tokens: int = MAX_NEW_TOKENS):
+    """Compare the int8 model's latency and descriptions with the reference model's."""
+    # Fixed test set: coloured shapes and captions on varied backgrounds
+    rng = np.random.default_rng(0)
+    images = []
+    for i in range(frame_count):
+        frame = np.full((360, 640, 3), rng.integers(0, 256, 3), np.uint8)
+        for _ in range(4):
+            x, y = int(rng.integers(0, 560)), int(rng.integers(0, 280))
+            cv2.rectangle(frame, (x, y), (x + int(rng.integers(40, 200)), y + int(rng.integers(40, 160))),
+                          tuple(int(c) for c in rng.integers(0, 256, 3)), -1)
+        cv2.putText(frame, f"Scene {i + 1}", (20, 60), cv2.FONT_HERSHEY_SIMPLEX,
+                    1.5, (255, 255, 255), 3)
+        images.append(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+
+    if model_id:
+        variants = [("reference", lambda: load_model(model_id)),
+                    ("int8", lambda: load_model(model_id, "int8", threads))]
+    else:
+        variants = [("reference", make_tiny_smolvlm),
+                    ("int8", lambda: _quantized(make_tiny_smolvlm()))]
+    if threads > 0:
+        import torch
+        torch.set_num_threads(threads)
+
+    reference = None
+    for name, load in variants:
+        model, processor = load()
+        device = next(model.parameters()).device
+        process_batch(images[:1], model, processor, max_new_tokens)  # warm-up
+        latencies, descriptions = [], []
+        for image in images:
+            start = time.perf_counter()
+            descriptions.extend(process_batch([image], model, processor, max_new_tokens))
+            latencies.append(time.perf_counter() - start)
+        reference = reference or descriptions
+        exact = sum(a == b for a, b in zip(descriptions, reference))
+        similarity = statistics.mean(
+            difflib.SequenceMatcher(None, a.split(), b.split()).ratio()
+            for a, b in zip(descriptions, reference))
+        dtype = getattr(model, "quantization", None) or str(next(model.parameters()).dtype)
+        print(f"{name:>9} ({dtype} on {device}): {statistics.mean(latencies) * 1000:.0f} ms/frame "
+              f"(p50 {statistics.median(latencies) * 1000:.0f} ms), "
+              f"{exact}/{frame_count} identical, similarity {similarity:.2f}")
+        del model
+        _release_memory()
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    benchmark_cpu_inference(
+        model_id=args[0] if len(args) > 0 and args[0] != "tiny" else None,
+        threads=int(args[1]) if len(args) > 1 else 0,
+        max_new_tokens=int(args[2]) if len(args) > 2 else MAX_NEW_TOKENS,
+    )
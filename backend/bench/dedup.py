@@ -0,0 +1,53 @@
+"""Benchmark model time with and without perceptual-hash deduplication.
+
+Runs a synthetic slide-deck recording through the frame pipeline with a
+stub model that sleeps per described frame.
+
+Usage (from backend/): python bench/dedup.py [slides] [seconds_per_slide]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tests.synthetic import describe_batches, make_slide_video  # noqa: E402
+from video_processor import DEDUP_DISTANCE, BatchPrefetcher, iter_frames  # noqa: E402
+
+
+def benchmark_dedup(slides: int = 8, seconds_per_slide: float = 20.0, interval: int = 2,
+                    seconds_per_frame: float = 0.05):
+    """Compare model time with and without perceptual-hash deduplication."""
+    fd, path = tempfile.mkstemp(suffix=".mp4")
+    os.close(fd)
+    try:
+        make_slide_video(path, slides, seconds_per_slide)
+        for dedup_distance in (-1, DEDUP_DISTANCE):
+            model_seconds = 0.0
+
+            def stub_describe(images, hashes=None):
+                nonlocal model_seconds
+                model_seconds += seconds_per_frame * len(images)
+                time.sleep(seconds_per_frame * len(images))
+                return [f"slide frame {i}" for i in range(len(images))]
+
+            batches = BatchPrefetcher(iter_frames(path, interval), 8)
+            try:
+                summaries = describe_batches(batches, stub_describe, dedup_distance)
+            finally:
+                batches.close()
+            skipped = sum(1 for s in summaries if "reused_from" in s)
+            print(f"dedup_distance={dedup_distance:>2}: {len(summaries)} frames, "
+                  f"{len(summaries) - skipped} described, {skipped} skipped, "
+                  f"model time {model_seconds:.2f}s")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    benchmark_dedup(
+        slides=int(sys.argv[1]) if len(sys.argv) > 1 else 8,
+        seconds_per_slide=float(sys.argv[2]) if len(sys.argv) > 2 else 20.0,
+    )
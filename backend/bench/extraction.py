@@ -0,0 +1,45 @@
+"""Benchmark decode-everything vs seek-based frame extraction on CPU.
+
+Usage (from backend/): python bench/extraction.py [duration_seconds] [interval]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tests.synthetic import (  # noqa: E402
+    extract_frames, extract_frames_sequential, make_synthetic_video)
+from video_processor import MAX_IMAGE_EDGE, needs_transcode  # noqa: E402
+
+
+def benchmark_extraction(duration: float = 120.0, interval: int = 5,
+                         width: int = 1920, height: int = 1080):
+    """Compare decode-everything vs. seek-based extraction on CPU."""
+    fd, path = tempfile.mkstemp(suffix=".mp4")
+    os.close(fd)
+    try:
+        print(f"Writing {duration:.0f}s {width}x{height} synthetic video...")
+        make_synthetic_video(path, duration, width=width, height=height)
+        print(f"needs_transcode: {needs_transcode(path)}")
+
+        for name, fn in [("sequential", extract_frames_sequential),
+                         ("seek", lambda path, interval: extract_frames(
+                             path, interval, MAX_IMAGE_EDGE))]:
+            start = time.perf_counter()
+            frames, timestamps = fn(path, interval)
+            elapsed = time.perf_counter() - start
+            print(f"{name:>10}: {len(frames)} frames of {frames[0].size} "
+                  f"in {elapsed:.2f}s ({len(frames) / elapsed:.1f} frames/s), "
+                  f"timestamps {timestamps[:3]}...")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    benchmark_extraction(
+        duration=float(sys.argv[1]) if len(sys.argv) > 1 else 120.0,
+        interval=int(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    )
@@ -0,0 +1,43 @@
+"""Benchmark interval and scene sampling on a fast-cut ad followed by long shots.
+
+Coverage is the share of shots with at least one sampled frame.
+
+Usage (from backend/): python bench/scene_sampling.py [interval]
+"""
+import bisect
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tests.synthetic import make_shot_video  # noqa: E402
+from video_probe import probe_header  # noqa: E402
+from video_processor import SAMPLING_MODES, sample_frames  # noqa: E402
+
+
+def benchmark_scene_sampling(interval: int = 2):
+    """Report frames sampled, shots covered and the longest gap per sampling mode."""
+    fd, path = tempfile.mkstemp(suffix=".mp4")
+    os.close(fd)
+    try:
+        starts = make_shot_video(path)
+        duration = probe_header(path).duration
+        print(f"{len(starts)} shots over {duration:.0f}s, interval={interval}s")
+        for sampling in SAMPLING_MODES:
+            start = time.perf_counter()
+            timestamps = [ts for _, ts, _ in sample_frames(path, interval, sampling)]
+            elapsed = time.perf_counter() - start
+            shots = {bisect.bisect_right(starts, ts) - 1 for ts in timestamps}
+            gaps = [b - a for a, b in zip(timestamps, timestamps[1:] + [duration])]
+            print(f"{sampling:>9}: {len(timestamps)} frames, "
+                  f"{len(shots)}/{len(starts)} shots covered, "
+                  f"longest gap {max(gaps):.1f}s, sampled in {elapsed:.2f}s")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    benchmark_scene_sampling(interval=int(sys.argv[1]) if len(sys.argv) > 1 else 2)
@@ -0,0 +1,91 @@
+"""Benchmark the in-process search index on synthetic frame descriptions.
+
+Indexes about 1M synthetic descriptions by default, then times the first
+page of each query.
+
+Usage (from backend/): python bench/search.py [count] [query...]
+"""
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from search_index import SearchIndex  # noqa: E402
+
+
+# Vocabulary of the synthetic descriptions
+_SUBJECTS = ("a man", "a woman", "two people", "a child", "a dog", "a cat", "a crowd",
+             "a cyclist", "a chef", "a presenter", "a motorcycle", "a red car", "a bus",
+             "a truck", "a horse", "a bird", "a boat", "a train", "an airplane", "a robot")
+_ACTIONS = ("walking", "standing", "sitting", "talking", "running", "driving", "parked",
+            "cooking", "pointing at a chart", "holding a phone", "riding", "waving",
+            "reading a book", "typing on a laptop", "looking at the camera")
+_PLACES = ("on a city street", "in a kitchen", "in an office", "on a highway", "in a park",
+           "on a beach", "in a classroom", "on a stage", "in a forest", "at night",
+           "in the rain", "next to a building", "inside a garage", "on a mountain road")
+_DETAILS = ("The lighting is bright.", "The scene is blurry.", "Text is visible on screen.",
+            "The camera pans left.", "Several cars pass by.", "A logo appears in the corner.",
+            "The background is dark.", "Trees are visible.", "People are in the background.",
+            "The image is in black and white.", "A slide with bullet points is shown.")
+
+
+def synthetic_descriptions(count: int, seed: int = 0) -> Iterable[Dict[str, Any]]:
+    """Yield ``count`` synthetic summaries, 500 frames per video."""
+    rng = random.Random(seed)
+    for i in range(count):
+        video, frame = divmod(i, 500)
+        description = (f"{rng.choice(_SUBJECTS).capitalize()} {rng.choice(_ACTIONS)} "
+                       f"{rng.choice(_PLACES)}. {rng.choice(_DETAILS)}")
+        if rng.random() < 0.5:
+            description += " " + rng.choice(_DETAILS)
+        yield {
+            "video_id": f"00000000-0000-0000-0000-{video:012d}",
+            "frame_number": frame,
+            "timestamp": f"{frame * 2 // 60}:{frame * 2 % 60:02d}",
+            "timestamp_seconds": frame * 2.0,
+            "description": description,
+        }
+
+
+BENCHMARK_QUERIES = ("motorcycle", "motorcycle highway", "red car parked at night",
+                     "chef cooking kitchen", "people", "man walking city street")
+
+
+def benchmark_search(count: int = 1_000_000, queries: Iterable[str] = BENCHMARK_QUERIES,
+                     repeats: int = 5):
+    """
+    Index ``count`` synthetic descriptions and time queries against them.
+
+    Prints the indexing rate, index size and, per query, the number of
+    hits and the time for the first page of 20.
+    """
+    index = SearchIndex()
+    started = time.perf_counter()
+    batch = []
+    for summary in synthetic_descriptions(count):
+        batch.append(summary)
+        if len(batch) == 10_000:
+            index.add_many(batch)
+            batch = []
+    index.add_many(batch)
+    elapsed = time.perf_counter() - started
+    print(f"Indexed {count:,} descriptions in {elapsed:.1f}s "
+          f"({count / elapsed:,.0f}/s); {index.stats()}")
+
+    for query in queries:
+        hits = len(index.search(query, limit=count))
+        started = time.perf_counter()
+        for _ in range(repeats):
+            index.search(query, limit=20)
+        per_query = (time.perf_counter() - started) / repeats
+        print(f"{query!r}: {hits:,} hits, first page in {per_query * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark_search(
+        count=int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000,
+        queries=sys.argv[2:] or BENCHMARK_QUERIES,
+    )
@@ -0,0 +1,74 @@
+"""Benchmark the Postgres search function on synthetic frame descriptions.
+
+Stores synthetic descriptions (100k by default, the same ones as
+``bench/search.py``) under a scratch video in the database at SUPABASE_URL,
+then times the first page of each query through
+``rpc/search_video_summaries``, as ``GET /search`` calls it with
+``SEARCH_BACKEND=postgres``. The scratch video and its summaries are
+deleted afterwards. Run it against a scratch project, not production.
+
+Usage (from backend/): python bench/search_postgres.py [count] [query...]
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Iterable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import supabase_client  # noqa: E402
+from search import BENCHMARK_QUERIES, synthetic_descriptions  # noqa: E402
+
+
+async def benchmark_postgres_search(count: int = 100_000,
+                                    queries: Iterable[str] = BENCHMARK_QUERIES,
+                                    repeats: int = 5):
+    """
+    Store ``count`` synthetic descriptions and time queries against them.
+
+    Prints the insert rate, the round trip of a plain read for reference
+    and, per query, the time for the first page of 20. Hit counts include
+    any summaries already in the database.
+    """
+    video = await supabase_client.create_video({
+        "video_url": "bench://search", "title": "Search benchmark",
+        "duration": "0:00", "status": "processing"})
+    try:
+        started = time.perf_counter()
+        batch = []
+        for i, summary in enumerate(synthetic_descriptions(count)):
+            # One scratch video, so frame numbers must not repeat
+            batch.append({**summary, "video_id": video["id"], "frame_number": i})
+            if len(batch) == 10_000:
+                await supabase_client.create_video_summaries(batch)
+                batch = []
+        await supabase_client.create_video_summaries(batch)
+        elapsed = time.perf_counter() - started
+        print(f"Stored {count:,} descriptions in {elapsed:.1f}s ({count / elapsed:,.0f}/s)")
+
+        started = time.perf_counter()
+        for _ in range(repeats):
+            await supabase_client.get_video(video["id"])
+        round_trip = (time.perf_counter() - started) / repeats
+        print(f"Reading the video row: {round_trip * 1000:.1f} ms")
+
+        for query in queries:
+            hits = len(await supabase_client.search_summaries(query, limit=1000))
+            started = time.perf_counter()
+            for _ in range(repeats):
+                await supabase_client.search_summaries(query, limit=20)
+            per_query = (time.perf_counter() - started) / repeats
+            print(f"{query!r}: {hits:,}{'+' if hits == 1000 else ''} hits, "
+                  f"first page in {per_query * 1000:.1f} ms")
+    finally:
+        # Summaries go with the video (ON DELETE CASCADE)
+        await supabase_client._request("DELETE", "videos", params={"id": f"eq.{video['id']}"})
+        await supabase_client.close_http_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark_postgres_search(
+        count=int(sys.argv[1]) if len(sys.argv) > 1 else 100_000,
+        queries=sys.argv[2:] or BENCHMARK_QUERIES,
+    ))
@@ -0,0 +1,71 @@
+"""Benchmark describing a video as time ranges in a pool of worker processes.
+
+Uses a stub model that sleeps like a GPU would. Checks that the merged
+timestamps and frame numbers match one pass over the whole video, and
+reports how wall-clock time scales with workers.
+
+Usage (from backend/): python bench/sharding.py [duration_seconds] [workers...]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shards import merge_shard_streams, plan_shards  # noqa: E402
+from tests.synthetic import describe_batches, make_synthetic_video  # noqa: E402
+from video_processor import BatchPrefetcher, iter_frames  # noqa: E402
+
+
+def describe_range_stub(path: str, interval: int, start: float, end: Optional[float],
+                        seconds_per_frame: float) -> List[Dict]:
+    """Describe one time range with a stub model that sleeps like a GPU would."""
+    def stub_describe(images, hashes=None):
+        time.sleep(seconds_per_frame * len(images))
+        return [f"{image.size[0]}x{image.size[1]} frame" for image in images]
+
+    batches = BatchPrefetcher(iter_frames(path, interval, start=start, end=end), 8)
+    try:
+        return describe_batches(batches, stub_describe, dedup_distance=-1)
+    finally:
+        batches.close()
+
+
+def benchmark_sharding(duration: float = 240.0, interval: int = 2, workers=(1, 2, 4),
+                       seconds_per_frame: float = 0.2):
+    """Compare one pass over a video with its time ranges split across workers."""
+    fd, path = tempfile.mkstemp(suffix=".mp4")
+    os.close(fd)
+    try:
+        make_synthetic_video(path, duration, width=640, height=360)
+        reference = [(s["timestamp_seconds"], s["frame_number"])
+                     for s in describe_range_stub(path, interval, 0.0, None, 0.0)]
+        baseline = None
+        for count in workers:
+            ranges = plan_shards(duration, duration / count, count)
+            start = time.perf_counter()
+            with ProcessPoolExecutor(count, mp_context=multiprocessing.get_context("spawn")) as pool:
+                shards = list(pool.map(
+                    describe_range_stub, *zip(*[(path, interval, a, b, seconds_per_frame)
+                                                for a, b in ranges])))
+            elapsed = time.perf_counter() - start
+            summaries = [summary for batch in merge_shard_streams([iter([s]) for s in shards])
+                         for summary in batch]
+            baseline = baseline or elapsed
+            consistent = [(s["timestamp_seconds"], s["frame_number"]) for s in summaries] == reference
+            print(f"workers={count}: {len(summaries)} frames in {elapsed:.2f}s "
+                  f"(speedup {baseline / elapsed:.2f}x), matches single pass: {consistent}")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    benchmark_sharding(
+        duration=float(sys.argv[1]) if len(sys.argv) > 1 else 240.0,
+        workers=tuple(int(a) for a in sys.argv[2:]) or (1, 2, 4),
+    )
@@ -0,0 +1,70 @@
+"""Benchmark downloading a video before decoding against streaming it.
+
+Both modes read from a local range server with simulated network latency
+(seconds per request) and bandwidth (bytes per second), and must sample
+the same frames.
+
+Usage (from backend/): python bench/streaming.py [duration_seconds] [interval]
+"""
+import contextlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from range_stream import RangeServer  # noqa: E402
+from tests.file_source import FileSource  # noqa: E402
+from tests.synthetic import make_synthetic_video  # noqa: E402
+from video_processor import sample_frames, stream_video  # noqa: E402
+
+
+def benchmark_streaming(duration: float = 60.0, interval: int = 10,
+                        latency: float = 0.03, bandwidth: float = 25e6):
+    """Report time to first frame, total time and bytes transferred per mode."""
+    fd, path = tempfile.mkstemp(suffix=".mp4")
+    os.close(fd)
+    fd, download_path = tempfile.mkstemp(suffix=".mp4")
+    os.close(fd)
+    try:
+        make_synthetic_video(path, duration, width=640, height=360)
+        source = FileSource(path)
+        print(f"{source.size / 1e6:.1f} MB video, {duration:.0f}s, interval={interval}s, "
+              f"{latency * 1000:.0f} ms latency, {bandwidth / 1e6:.0f} MB/s")
+        expected = None
+        for mode in ("download", "stream"):
+            with RangeServer(source, latency=latency, bandwidth=bandwidth) as origin:
+                start = time.perf_counter()
+                first_frame = None
+                with contextlib.ExitStack() as stack:
+                    if mode == "download":
+                        with urllib.request.urlopen(origin.url) as response, \
+                                open(download_path, "wb") as f:
+                            shutil.copyfileobj(response, f)
+                        video_path = download_path
+                    else:
+                        video_path = stack.enter_context(stream_video(origin.url))
+                    timestamps = []
+                    for _, timestamp, _ in sample_frames(video_path, interval):
+                        first_frame = first_frame or time.perf_counter() - start
+                        timestamps.append(timestamp)
+                elapsed = time.perf_counter() - start
+                expected = expected or timestamps
+                print(f"{mode:>8}: first frame after {first_frame:.2f}s, {len(timestamps)} "
+                      f"frames in {elapsed:.2f}s, {origin.bytes_served / 1e6:.1f} MB in "
+                      f"{origin.requests} requests, same frames: {timestamps == expected}")
+        source.close()
+    finally:
+        os.remove(path)
+        os.remove(download_path)
+
+
+if __name__ == "__main__":
+    benchmark_streaming(
+        duration=float(sys.argv[1]) if len(sys.argv) > 1 else 60.0,
+        interval=int(sys.argv[2]) if len(sys.argv) > 2 else 10,
+    )
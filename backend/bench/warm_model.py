@@ -0,0 +1,45 @@
+"""Benchmark consecutive jobs through one resident model cache.
+
+The first job pays for the model load and the rest reuse the resident
+model. Without a model ID a tiny random SmolVLM is used, so it runs
+offline.
+
+Usage (from backend/): python bench/warm_model.py [model_id]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tests.synthetic import make_synthetic_video, make_tiny_smolvlm  # noqa: E402
+from video_processor import ModelCache, describe_video, load_model  # noqa: E402
+
+
+def benchmark_warm_model(model_id: Optional[str] = None, jobs: int = 3,
+                         duration: float = 20.0, interval: int = 2):
+    """Time ``jobs`` consecutive jobs through one ModelCache."""
+    loader = load_model if model_id else (lambda _: make_tiny_smolvlm())
+    models = ModelCache(loader=loader)
+    model_id = model_id or "tiny-random-smolvlm"
+
+    fd, path = tempfile.mkstemp(suffix=".mp4")
+    os.close(fd)
+    try:
+        make_synthetic_video(path, duration, width=640, height=360)
+        for i in range(jobs):
+            start = time.perf_counter()
+            summaries = describe_video(path, interval, 8, model_id, models)
+            elapsed = time.perf_counter() - start
+            print(f"job {i + 1} ({'cold' if i == 0 else 'warm'}): {len(summaries)} frames "
+                  f"in {elapsed:.2f}s")
+        print(f"model cache: {models.misses} loads, {models.hits} hits")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    benchmark_warm_model(model_id=sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,142 @@
+"""Small in-process caches."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire.
+
+    Holds at most ``max_entries`` entries; adding another evicts the least
+    recently used one. Each entry expires ``ttl`` seconds after it was set,
+    or after its own ``ttl`` if one is given to ``set``. Expired entries are
+    dropped when they are next looked up.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value cached for ``key``, or ``default`` if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Cache ``value`` for ``ttl`` seconds (the cache's default if None)."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            self.pop(key)
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> bool:
+        """Evict ``key``; returns whether it was cached."""
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class ByteLRUCache:
+    """
+    Thread-safe LRU cache bounded by the total size of its values.
+
+    ``set`` takes each value's size in bytes; least recently used entries
+    are evicted once the total exceeds ``max_bytes``. Values larger than
+    ``max_bytes`` are not cached, so ``max_bytes=0`` disables the cache.
+
+    To cache the result of a read without racing a concurrent
+    invalidation, take ``token()`` before reading and pass it to ``set``:
+    the value is dropped if any key was popped in between.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._invalidations = 0
+        self.hits = 0
+        self.misses = 0
+
+    def token(self) -> int:
+        """Current invalidation count, for ``set``."""
+        return self._invalidations
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value cached for ``key``, or ``default``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, size: int, token: Optional[int] = None):
+        """Cache ``value`` of ``size`` bytes, unless invalidated since ``token``."""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if token is not None and token != self._invalidations:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def pop(self, key: Hashable) -> bool:
+        """Evict ``key``; returns whether it was cached."""
+        with self._lock:
+            self._invalidations += 1
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            self._bytes -= entry[1]
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries), "bytes": self._bytes,
+                "hits": self.hits, "misses": self.misses}
@@ -16,6 +16,26 @@ class Settings:
     # Supabase configuration
     SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
     SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "20"))
+    DB_TIMEOUT: float = float(os.getenv("DB_TIMEOUT", "30"))  # seconds
+    # Retries of transient database failures (timeouts, 5xx) for bulk writes
+    DB_RETRIES: int = int(os.getenv("DB_RETRIES", "3"))
+    # Summaries per insert request, and insert requests in flight per write
+    SUMMARY_INSERT_CHUNK_SIZE: int = int(os.getenv("SUMMARY_INSERT_CHUNK_SIZE", "500"))
+    SUMMARY_INSERT_CONCURRENCY: int = int(os.getenv("SUMMARY_INSERT_CONCURRENCY", "4"))
+    # Seconds the total video count of GET /videos is cached for
+    VIDEO_COUNT_TTL: float = float(os.getenv("VIDEO_COUNT_TTL", "60"))
+    # In-memory API key validation cache: seconds valid keys are trusted,
+    # seconds unknown or expired keys are rejected without a lookup
+    API_KEY_CACHE_TTL: float = float(os.getenv("API_KEY_CACHE_TTL", "300"))
+    API_KEY_NEGATIVE_TTL: float = float(os.getenv("API_KEY_NEGATIVE_TTL", "30"))
+    API_KEY_CACHE_SIZE: int = int(os.getenv("API_KEY_CACHE_SIZE", "10000"))
+    # Bytes of serialized completed-video responses kept in memory; 0 disables
+    VIDEO_RESPONSE_CACHE_BYTES: int = int(
+        os.getenv("VIDEO_RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024)))
+    # GET /search: postgres (search_video_summaries function) or memory
+    # (in-process index built at startup; single-process deployments only)
+    SEARCH_BACKEND: str = os.getenv("SEARCH_BACKEND", "postgres")
 
     # Model configuration
     MODEL_ID: str = os.getenv("MODEL_ID", "HuggingFaceTB/SmolVLM-Instruct")
@@ -23,6 +43,15 @@ class Settings:
     # Upload configuration
     UPLOAD_DIR: Path = Path(os.getenv("UPLOAD_DIR", str(BASE_DIR / "uploads")))
     MAX_VIDEO_SIZE: int = int(os.getenv("MAX_VIDEO_SIZE", "500"))  # MB
+    UPLOAD_CHUNK_SIZE: int = int(
+        os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))  # bytes
+    # Resumable (chunked) uploads
+    RESUMABLE_CHUNK_SIZE: int = int(
+        os.getenv("RESUMABLE_CHUNK_SIZE", str(8 * 1024 * 1024)))  # bytes
+    RESUMABLE_MAX_CHUNK_SIZE: int = int(
+        os.getenv("RESUMABLE_MAX_CHUNK_SIZE", str(64 * 1024 * 1024)))  # bytes
+    UPLOAD_SESSION_TTL: int = int(
+        os.getenv("UPLOAD_SESSION_TTL", str(24 * 3600)))  # seconds
 
     # Allowed video formats
     ALLOWED_VIDEO_EXTENSIONS = {".mp4", ".avi",
@@ -31,6 +60,8 @@ class Settings:
     # Frame processing
     DEFAULT_FRAME_INTERVAL: int = int(
         os.getenv("FRAME_INTERVAL", "5"))  # seconds
+    # Max dHash bit difference for a frame to reuse the previous description
+    FRAME_DEDUP_DISTANCE: int = int(os.getenv("FRAME_DEDUP_DISTANCE", "5"))
 
     # Apify configuration
     APIFY_API_KEY: str = os.getenv("APIFY_API_KEY", "")
@@ -41,6 +72,43 @@ class Settings:
     GCP_SERVICE_KEY_PATH: Path = Path(
         os.getenv("GCP_SERVICE_KEY_PATH", str(BASE_DIR / "service-key.json"))
     )
+    # Point at a local fake-GCS server instead of storage.googleapis.com
+    STORAGE_EMULATOR_HOST: str = os.getenv("STORAGE_EMULATOR_HOST", "")
+    GCS_STREAM_CHUNK_SIZE: int = int(
+        os.getenv("GCS_STREAM_CHUNK_SIZE", str(8 * 1024 * 1024)))  # bytes
+    # Parallel composite uploads of local files
+    GCS_PARALLEL_THRESHOLD: int = int(
+        os.getenv("GCS_PARALLEL_THRESHOLD", str(64 * 1024 * 1024)))  # bytes
+    GCS_SLICE_SIZE: int = int(
+        os.getenv("GCS_SLICE_SIZE", str(16 * 1024 * 1024)))  # bytes
+    GCS_UPLOAD_WORKERS: int = int(os.getenv("GCS_UPLOAD_WORKERS", "8"))
+    STREAM_PROBE_BYTES: int = int(
+        os.getenv("STREAM_PROBE_BYTES", str(4 * 1024 * 1024)))  # bytes
+
+    # Background job configuration
+    INFERENCE_BACKEND: str = os.getenv("INFERENCE_BACKEND", "modal")  # modal, local or fake
+    MAX_RESIDENT_MODELS: int = int(os.getenv("MAX_RESIDENT_MODELS", "2"))  # local backend
+    # Local backend model precision: auto (fp16 on GPU, fp32 on CPU), or
+    # fp32 / int8 on CPU; int8 dynamically quantizes the language model
+    LOCAL_PRECISION: str = os.getenv("LOCAL_PRECISION", "auto")
+    CPU_THREADS: int = int(os.getenv("CPU_THREADS", "0"))  # 0 = one per core
+    MAX_NEW_TOKENS: int = int(os.getenv("MAX_NEW_TOKENS", "100"))  # local backend, per frame
+    # Cross-video frame-description cache for the local backend ("" disables)
+    FRAME_CACHE_PATH: str = os.getenv(
+        "FRAME_CACHE_PATH", str(BASE_DIR / "frame_cache.sqlite3"))
+    FRAME_CACHE_MAX_ENTRIES: int = int(os.getenv("FRAME_CACHE_MAX_ENTRIES", "100000"))
+    # Long videos are split into ranges of about this many seconds and
+    # processed by up to MAX_SHARDS workers at once
+    SHARD_SECONDS: float = float(os.getenv("SHARD_SECONDS", "900"))
+    MAX_SHARDS: int = int(os.getenv("MAX_SHARDS", "8"))
+    LOCAL_SHARD_WORKERS: int = int(os.getenv("LOCAL_SHARD_WORKERS", "1"))  # local backend
+    # Local backend: decode videos from GCS with range requests instead of
+    # downloading them first
+    STREAM_GCS_VIDEOS: bool = os.getenv("STREAM_GCS_VIDEOS", "true").lower() == "true"
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))
+    # GET /videos/{id}/stream polls the database after this long without events
+    SSE_POLL_SECONDS: float = float(os.getenv("SSE_POLL_SECONDS", "15"))
+    MAX_TRACKED_JOBS: int = int(os.getenv("MAX_TRACKED_JOBS", "1000"))
 
     def __init__(self):
         """Initialize settings and create upload directory if it doesn't exist."""
@@ -0,0 +1,173 @@
+"""Persistent cache of frame descriptions shared across videos and workers.
+
+Descriptions are keyed by ``(model_id, prompt, perceptual hash)``, so the
+intros, outros, logos and sponsor segments that recur across videos are
+described once. The cache is a single SQLite file; any number of threads
+and processes may use it at the same time.
+
+Only the standard library is imported so this module can also be used by
+the Modal worker.
+"""
+import logging
+import sqlite3
+import time
+from contextlib import closing
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# SQLite stores signed 64-bit integers; hashes are unsigned
+_SIGN_BIT = 1 << 63
+
+# Largest number of host parameters used in one IN (...) query
+_MAX_QUERY_PARAMS = 500
+
+
+def _to_signed(value: int) -> int:
+    return value - (1 << 64) if value >= _SIGN_BIT else value
+
+
+class FrameDescriptionCache:
+    """
+    Size-bounded, disk-backed LRU map of frame hash to description.
+
+    Each operation opens its own short-lived connection, so the cache is
+    safe to share between threads and processes, and no file handle stays
+    open between calls (which network volumes need to sync the file). At
+    most ``max_entries`` descriptions are kept; the least recently used are
+    evicted. Hit and miss counts are stored in the database, so the hit rate
+    covers every worker that uses the file.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100_000, wal: bool = True):
+        self.path = str(path)
+        self.max_entries = max_entries
+        self.wal = wal
+        # Counters for this process only; see stats() for global ones
+        self.hits = 0
+        self.misses = 0
+
+        with closing(self._connect()) as conn:
+            if self.wal:
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS frame_descriptions (
+                    model_id TEXT NOT NULL,
+                    prompt TEXT NOT NULL,
+                    phash INTEGER NOT NULL,
+                    description TEXT NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model_id, prompt, phash)
+                );
+                CREATE INDEX IF NOT EXISTS idx_frame_descriptions_last_used
+                    ON frame_descriptions(last_used);
+                CREATE TABLE IF NOT EXISTS cache_stats (
+                    name TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO cache_stats VALUES ('hits', 0), ('misses', 0);
+                INSERT OR IGNORE INTO cache_stats
+                    SELECT 'entries', COUNT(*) FROM frame_descriptions;
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def get_many(self, model_id: str, prompt: str, hashes: List[int]) -> Dict[int, str]:
+        """
+        Look up descriptions for several frame hashes at once.
+
+        Args:
+            model_id: Model that produced the descriptions
+            prompt: Prompt the descriptions were generated with
+            hashes: Perceptual hashes of the frames
+
+        Returns:
+            Mapping of hash to description for the hashes that were cached
+        """
+        unique = list(dict.fromkeys(hashes))
+        found: Dict[int, str] = {}
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for start in range(0, len(unique), _MAX_QUERY_PARAMS):
+                chunk = [_to_signed(h) for h in unique[start:start + _MAX_QUERY_PARAMS]]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT phash, description FROM frame_descriptions "
+                    f"WHERE model_id = ? AND prompt = ? AND phash IN ({placeholders})",
+                    [model_id, prompt, *chunk],
+                ).fetchall()
+                for phash, description in rows:
+                    found[phash % (1 << 64)] = description
+                if rows:
+                    conn.executemany(
+                        "UPDATE frame_descriptions SET last_used = ? "
+                        "WHERE model_id = ? AND prompt = ? AND phash = ?",
+                        [(now, model_id, prompt, phash) for phash, _ in rows],
+                    )
+
+            hits = sum(1 for h in hashes if h in found)
+            misses = len(hashes) - hits
+            conn.executemany(
+                "UPDATE cache_stats SET value = value + ? WHERE name = ?",
+                [(hits, "hits"), (misses, "misses")],
+            )
+            conn.execute("COMMIT")
+
+        self.hits += hits
+        self.misses += misses
+        return found
+
+    def put_many(self, model_id: str, prompt: str, descriptions: Dict[int, str]):
+        """Store descriptions by frame hash, evicting the least recently used if full."""
+        if not descriptions:
+            return
+        now = time.time()
+        rows = [(d, now, model_id, prompt, _to_signed(h)) for h, d in descriptions.items()]
+        with closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # The entry count is kept in cache_stats, so the table is never
+            # scanned; only rows that did not exist yet add to it
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO frame_descriptions "
+                "(description, last_used, model_id, prompt, phash) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            added = conn.total_changes - before
+            if added < len(rows):
+                conn.executemany(
+                    "UPDATE frame_descriptions SET description = ?, last_used = ? "
+                    "WHERE model_id = ? AND prompt = ? AND phash = ?",
+                    rows,
+                )
+            conn.execute(
+                "UPDATE cache_stats SET value = value + ? WHERE name = 'entries'", (added,))
+            count = conn.execute(
+                "SELECT value FROM cache_stats WHERE name = 'entries'").fetchone()[0]
+            if count > self.max_entries:
+                evicted = conn.execute(
+                    "DELETE FROM frame_descriptions WHERE rowid IN ("
+                    "SELECT rowid FROM frame_descriptions ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                ).rowcount
+                conn.execute(
+                    "UPDATE cache_stats SET value = value - ? WHERE name = 'entries'",
+                    (evicted,),
+                )
+            conn.execute("COMMIT")
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """Entry count and hit/miss counters across all users of the file."""
+        with closing(self._connect()) as conn:
+            counters = dict(conn.execute("SELECT name, value FROM cache_stats").fetchall())
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "entries": counters["entries"],
+            "hits": counters["hits"],
+            "misses": counters["misses"],
+            "hit_rate": counters["hits"] / lookups if lookups else None,
+        }
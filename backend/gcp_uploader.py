@@ -1,23 +1,235 @@
 """Google Cloud Storage utilities."""
+import asyncio
+import hashlib
 import logging
+import math
+import mimetypes
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional, Tuple
 from google.cloud import storage
 from google.oauth2 import service_account
+import httpx
 import uuid
 
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+GCS_SCOPES = ["https://www.googleapis.com/auth/devstorage.read_write"]
+# Resumable upload chunks must be a multiple of 256 KiB (except the last one)
+GCS_UPLOAD_ALIGNMENT = 256 * 1024
+# Maximum number of source objects in a single GCS compose request
+GCS_COMPOSE_LIMIT = 32
 
-def upload_file_to_gcp(local_file_path: Path, blob_name: Optional[str] = None) -> tuple[str, str]:
+
+class GCSClientManager:
+    """
+    Process-wide, thread-safe holder of GCS credentials and clients.
+
+    The service key is read once, the access token is only refreshed when
+    it has expired, and both the ``storage.Client`` (sync) and the
+    ``httpx.AsyncClient`` (async JSON API calls) are reused so their
+    connections stay alive between uploads.
+    """
+
+    def __init__(self, pool_size: int):
+        self.pool_size = pool_size
+        self._lock = threading.Lock()
+        self._credentials = None
+        self._storage_client: Optional[storage.Client] = None
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get_credentials(self):
+        """Load the service account credentials, once per process."""
+        with self._lock:
+            if self._credentials is None:
+                if settings.STORAGE_EMULATOR_HOST:
+                    from google.auth.credentials import AnonymousCredentials
+                    self._credentials = AnonymousCredentials()
+                else:
+                    service_key_path = settings.GCP_SERVICE_KEY_PATH
+                    if not service_key_path.exists():
+                        raise ValueError(
+                            f"GCP service key file not found: {service_key_path}. "
+                            f"Cannot upload to GCP without authentication."
+                        )
+                    self._credentials = service_account.Credentials.from_service_account_file(
+                        str(service_key_path), scopes=GCS_SCOPES
+                    )
+                    logger.info("Loaded GCP credentials from: %s", service_key_path)
+            return self._credentials
+
+    def get_auth_headers(self) -> Dict[str, str]:
+        """
+        Get an Authorization header for the GCS JSON API.
+
+        Blocking when the cached access token has to be refreshed. No header
+        is needed when talking to a local emulator.
+        """
+        if settings.STORAGE_EMULATOR_HOST:
+            return {}
+
+        credentials = self.get_credentials()
+        with self._lock:
+            if not credentials.valid:
+                from google.auth.transport.requests import Request
+                credentials.refresh(Request())
+            return {"Authorization": f"Bearer {credentials.token}"}
+
+    def get_storage_client(self) -> storage.Client:
+        """Get the shared ``storage.Client``, sized for parallel uploads."""
+        credentials = self.get_credentials()
+        with self._lock:
+            if self._storage_client is None:
+                from requests.adapters import HTTPAdapter
+
+                project = getattr(credentials, "project_id", None) or "local"
+                client_options = None
+                if settings.STORAGE_EMULATOR_HOST:
+                    client_options = {"api_endpoint": settings.STORAGE_EMULATOR_HOST}
+                client = storage.Client(credentials=credentials, project=project,
+                                        client_options=client_options)
+                # Default pool keeps 10 connections; allow one per upload worker
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                client._http.mount("https://", adapter)
+                client._http.mount("http://", adapter)
+                self._storage_client = client
+                logger.info("GCS storage client initialized")
+            return self._storage_client
+
+    def get_async_client(self) -> httpx.AsyncClient:
+        """Get the shared async HTTP client for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = httpx.AsyncClient(
+                timeout=300.0,
+                limits=httpx.Limits(
+                    max_connections=self.pool_size * 4,
+                    max_keepalive_connections=self.pool_size,
+                ),
+            )
+            self._async_loop = loop
+        return self._async_client
+
+    async def get_auth_headers_async(self) -> Dict[str, str]:
+        """Async variant of ``get_auth_headers``; refreshes off the event loop."""
+        if settings.STORAGE_EMULATOR_HOST:
+            return {}
+        credentials = self.get_credentials()
+        if credentials.valid:
+            return {"Authorization": f"Bearer {credentials.token}"}
+        return await asyncio.to_thread(self.get_auth_headers)
+
+    async def aclose(self):
+        """Close the async HTTP client."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_loop = None
+
+
+# Global GCS client manager
+gcs_clients = GCSClientManager(settings.GCS_UPLOAD_WORKERS)
+
+
+def _compose_rounds(source_names: List[str], blob_name: str) -> List[List[Tuple[List[str], str]]]:
+    """
+    Plan a compose of any number of objects as rounds of <= 32-object composes.
+
+    Returns:
+        List of rounds, each a list of (sources, destination) pairs; every
+        destination except ``blob_name`` is an intermediate object
+    """
+    rounds = []
+    level = list(source_names)
+    round_number = 0
+    while len(level) > GCS_COMPOSE_LIMIT:
+        groups = [level[i:i + GCS_COMPOSE_LIMIT]
+                  for i in range(0, len(level), GCS_COMPOSE_LIMIT)]
+        names = [f"{blob_name}.compose-{round_number}-{i}"
+                 for i in range(len(groups))]
+        rounds.append(list(zip(groups, names)))
+        level = names
+        round_number += 1
+    rounds.append([(level, blob_name)])
+    return rounds
+
+
+def _parallel_composite_upload(
+    bucket: storage.Bucket,
+    local_file_path: Path,
+    blob_name: str,
+    size: int,
+    slice_size: int,
+    workers: int,
+):
+    """
+    Upload a file as slices in parallel, then compose them into one blob.
+
+    Each worker holds one slice in memory at a time, so peak memory is
+    about ``workers * slice_size``.
+    """
+    slice_count = math.ceil(size / slice_size)
+    slice_names = [f"{blob_name}.slice-{i:05d}" for i in range(slice_count)]
+
+    def upload_slice(index: int):
+        with open(local_file_path, "rb") as f:
+            f.seek(index * slice_size)
+            data = f.read(slice_size)
+        bucket.blob(slice_names[index]).upload_from_string(
+            data, content_type="application/octet-stream")
+
+    intermediates = []
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gcs-slice") as executor:
+            list(executor.map(upload_slice, range(slice_count)))
+
+            for compose_round in _compose_rounds(slice_names, blob_name):
+                def compose(step):
+                    sources, destination = step
+                    bucket.blob(destination).compose(
+                        [bucket.blob(name) for name in sources])
+                list(executor.map(compose, compose_round))
+                intermediates.extend(
+                    dest for _, dest in compose_round if dest != blob_name)
+    finally:
+        for name in slice_names + intermediates:
+            try:
+                bucket.blob(name).delete()
+            except Exception:
+                pass
+
+
+def upload_file_to_gcp(
+    local_file_path: Path,
+    blob_name: Optional[str] = None,
+    content_hash: Optional[str] = None,
+    parallel: Optional[bool] = None,
+) -> tuple[str, str]:
     """
     Upload a local file to Google Cloud Storage.
 
+    When ``content_hash`` is given the blob is named after it, and the upload
+    is skipped if a blob with that name already exists, so identical bytes
+    are only ever stored once.
+
+    Files of at least GCS_PARALLEL_THRESHOLD bytes are uploaded as
+    GCS_SLICE_SIZE slices by GCS_UPLOAD_WORKERS threads and composed into
+    the final blob; smaller files use a single-stream upload.
+
     Args:
         local_file_path: Path to the local file to upload
-        blob_name: Optional blob name in GCP. If None, generates a unique name.
+        blob_name: Optional blob name in GCP. If None, generates a name from
+            ``content_hash`` or a unique name.
+        content_hash: Optional SHA-256 hex digest of the file
+        parallel: Force (True) or disable (False) the parallel composite
+            upload; by default it depends on the file size
 
     Returns:
         Tuple of (bucket_name, blob_path)
@@ -29,38 +241,48 @@ def upload_file_to_gcp(local_file_path: Path, blob_name: Optional[str] = None) -
     if not settings.GCP_BUCKET_NAME:
         raise ValueError("GCP_BUCKET_NAME environment variable is required")
 
-    # Load GCP service key
-    service_key_path = settings.GCP_SERVICE_KEY_PATH
-    if not service_key_path.exists():
-        raise ValueError(
-            f"GCP service key file not found: {service_key_path}. "
-            f"Cannot upload to GCP without authentication."
-        )
+    client = gcs_clients.get_storage_client()
 
     try:
-        # Initialize GCS client
-        credentials = service_account.Credentials.from_service_account_file(
-            str(service_key_path)
-        )
-        client = storage.Client(credentials=credentials,
-                                project=credentials.project_id)
-
         # Get bucket
         bucket = client.bucket(settings.GCP_BUCKET_NAME)
 
         # Generate blob name if not provided
         if blob_name is None:
             file_ext = local_file_path.suffix or ".mp4"
-            blob_name = f"temp_uploads/{uuid.uuid4()}{file_ext}"
+            if content_hash:
+                blob_name = f"videos/{content_hash}{file_ext}"
+            else:
+                blob_name = f"temp_uploads/{uuid.uuid4()}{file_ext}"
 
-        # Upload file
+        # Upload file, unless the same content is already stored
         blob = bucket.blob(blob_name)
+        if content_hash and blob.exists():
+            logger.info("File already in GCP, skipping upload: gs://%s/%s",
+                        settings.GCP_BUCKET_NAME, blob_name)
+            return settings.GCP_BUCKET_NAME, blob_name
+
+        size = local_file_path.stat().st_size
+        if parallel is None:
+            parallel = (size >= settings.GCS_PARALLEL_THRESHOLD
+                        and settings.GCS_UPLOAD_WORKERS > 1)
+
         logger.info("Uploading file to GCP: %s -> gs://%s/%s",
                     local_file_path, settings.GCP_BUCKET_NAME, blob_name)
-        blob.upload_from_filename(str(local_file_path))
+        start = time.perf_counter()
+        if parallel:
+            _parallel_composite_upload(
+                bucket, local_file_path, blob_name, size,
+                settings.GCS_SLICE_SIZE, settings.GCS_UPLOAD_WORKERS)
+        else:
+            blob.upload_from_filename(str(local_file_path))
+        elapsed = time.perf_counter() - start
 
-        logger.info("Successfully uploaded file to GCP: gs://%s/%s",
-                    settings.GCP_BUCKET_NAME, blob_name)
+        logger.info("Successfully uploaded file to GCP: gs://%s/%s "
+                    "(%d bytes in %.2fs, %.1f MB/s, %s)",
+                    settings.GCP_BUCKET_NAME, blob_name, size, elapsed,
+                    size / 1e6 / max(elapsed, 1e-9),
+                    "parallel composite" if parallel else "single stream")
         return settings.GCP_BUCKET_NAME, blob_name
 
     except Exception as e:
@@ -68,6 +290,395 @@ def upload_file_to_gcp(local_file_path: Path, blob_name: Optional[str] = None) -
         raise RuntimeError(f"Failed to upload file to GCP: {str(e)}")
 
 
+class StreamedTransfer:
+    """Result of streaming a remote file into GCS."""
+
+    def __init__(self, bucket_name: str, blob_name: str, size: int, sha256: str, head: bytes):
+        self.bucket_name = bucket_name
+        self.blob_name = blob_name
+        self.size = size
+        self.sha256 = sha256
+        self.head = head
+
+
+def _gcs_endpoint() -> str:
+    """Base URL of the GCS JSON API, or of a local emulator if configured."""
+    return (settings.STORAGE_EMULATOR_HOST or "https://storage.googleapis.com").rstrip("/")
+
+
+def video_suffix(url: str, content_type: Optional[str] = None) -> str:
+    """
+    File extension for a downloaded video.
+
+    Taken from the URL path if it is an allowed video extension, else from
+    the response ``Content-Type``, else ``.mp4``.
+    """
+    suffix = Path(urllib.parse.urlparse(url).path).suffix.lower()
+    if suffix in settings.ALLOWED_VIDEO_EXTENSIONS:
+        return suffix
+    if content_type:
+        mime_type = content_type.split(";", 1)[0].strip().lower()
+        for suffix in mimetypes.guess_all_extensions(mime_type):
+            if suffix in settings.ALLOWED_VIDEO_EXTENSIONS:
+                return suffix
+    return ".mp4"
+
+
+def gcs_media_url(bucket_name: str, blob_name: str) -> str:
+    """JSON API URL that downloads an object's contents (supports ``Range``)."""
+    return (f"{_gcs_endpoint()}/storage/v1/b/{bucket_name}/o/"
+            f"{urllib.parse.quote(blob_name, safe='')}?alt=media")
+
+
+async def _put_resumable_chunk(
+    client: httpx.AsyncClient,
+    session_uri: str,
+    data: bytes,
+    offset: int,
+    total: Optional[int] = None,
+) -> int:
+    """
+    Send one chunk of a resumable upload session.
+
+    Args:
+        client: HTTP client for GCS
+        session_uri: Resumable session URI
+        data: Chunk bytes; must be 256 KiB aligned unless ``total`` is given
+        offset: Byte offset of the chunk in the object
+        total: Total object size, given only with the final chunk
+
+    Returns:
+        Offset of the first byte GCS has not yet persisted
+    """
+    if data:
+        content_range = f"bytes {offset}-{offset + len(data) - 1}/{'*' if total is None else total}"
+    else:
+        content_range = f"bytes */{total}"
+
+    response = await client.put(
+        session_uri, content=data, headers={"Content-Range": content_range})
+
+    if total is None:
+        if response.status_code != 308:
+            raise RuntimeError(
+                f"Unexpected GCS response to upload chunk: HTTP {response.status_code}")
+        # "Range: bytes=0-N" is what has been persisted so far
+        persisted = response.headers.get("Range")
+        return int(persisted.rsplit("-", 1)[1]) + 1 if persisted else 0
+
+    if response.status_code not in (200, 201):
+        raise RuntimeError(
+            f"Failed to finalize GCS upload: HTTP {response.status_code}")
+    return total
+
+
+async def _promote_blob(
+    client: httpx.AsyncClient,
+    auth_headers: Dict[str, str],
+    bucket_name: str,
+    temp_name: str,
+    final_name: str,
+):
+    """Move a temp blob to its final name, unless that blob already exists."""
+    endpoint = _gcs_endpoint()
+    objects_url = f"{endpoint}/storage/v1/b/{bucket_name}/o"
+    temp_quoted = urllib.parse.quote(temp_name, safe="")
+    final_quoted = urllib.parse.quote(final_name, safe="")
+
+    response = await client.get(
+        f"{objects_url}/{final_quoted}", headers=auth_headers)
+    if response.status_code == 404:
+        # Server-side rewrite, repeated until GCS reports it is done
+        rewrite_url = f"{objects_url}/{temp_quoted}/rewriteTo/b/{bucket_name}/o/{final_quoted}"
+        params: Dict[str, str] = {}
+        while True:
+            response = await client.post(
+                rewrite_url, params=params, json={}, headers=auth_headers)
+            response.raise_for_status()
+            result = response.json()
+            if result.get("done", True):
+                break
+            params["rewriteToken"] = result["rewriteToken"]
+    else:
+        response.raise_for_status()
+        logger.info("Blob already in GCP: gs://%s/%s", bucket_name, final_name)
+
+    await client.delete(f"{objects_url}/{temp_quoted}", headers=auth_headers)
+
+
+async def stream_url_to_gcp(
+    url: str,
+    request_headers: Optional[Dict[str, str]] = None,
+    max_bytes: Optional[int] = None,
+) -> StreamedTransfer:
+    """
+    Stream a remote file into Google Cloud Storage without touching local disk.
+
+    Bytes from ``url`` are fed into a GCS resumable upload session in
+    GCS_STREAM_CHUNK_SIZE pieces as they arrive. The content is hashed on
+    the way through and, once complete, the blob is moved to
+    ``videos/<sha256><ext>`` (or dropped, if that blob already exists).
+    The first STREAM_PROBE_BYTES are kept so the caller can probe metadata.
+
+    Set STORAGE_EMULATOR_HOST to point at a local fake-GCS server.
+
+    Args:
+        url: Source URL
+        request_headers: Headers to send with the source request
+        max_bytes: Optional maximum size; the transfer is aborted beyond it
+
+    Returns:
+        StreamedTransfer with the bucket, blob name, size, hash and head bytes
+
+    Raises:
+        ValueError: If GCP is not configured or the file is too large
+        RuntimeError: If the download or upload fails
+    """
+    if not settings.GCP_BUCKET_NAME:
+        raise ValueError("GCP_BUCKET_NAME environment variable is required")
+
+    bucket_name = settings.GCP_BUCKET_NAME
+    chunk_size = settings.GCS_STREAM_CHUNK_SIZE
+    chunk_size -= chunk_size % GCS_UPLOAD_ALIGNMENT
+    file_ext = video_suffix(url)
+    temp_name = f"temp_uploads/{uuid.uuid4()}{file_ext}"
+
+    gcs = gcs_clients.get_async_client()
+    auth_headers = await gcs_clients.get_auth_headers_async()
+
+    async with httpx.AsyncClient(
+        timeout=300.0, follow_redirects=True, headers=request_headers
+    ) as source:
+        response = await gcs.post(
+            f"{_gcs_endpoint()}/upload/storage/v1/b/{bucket_name}/o",
+            params={"uploadType": "resumable", "name": temp_name},
+            headers={**auth_headers, "X-Upload-Content-Type": "application/octet-stream"},
+            json={},
+        )
+        if response.status_code != 200 or "location" not in response.headers:
+            raise RuntimeError(
+                f"Failed to start GCS upload session: HTTP {response.status_code}")
+        session_uri = response.headers["location"]
+
+        logger.info("Streaming %s -> gs://%s/%s", url, bucket_name, temp_name)
+        hasher = hashlib.sha256()
+        head = bytearray()
+        buffer = bytearray()
+        offset = 0
+        size = 0
+        try:
+            try:
+                async with source.stream("GET", url) as response:
+                    if response.status_code not in (200, 206):
+                        raise RuntimeError(
+                            f"Failed to download video from URL: HTTP {response.status_code}")
+                    file_ext = video_suffix(url, response.headers.get("content-type"))
+
+                    async for chunk in response.aiter_bytes():
+                        size += len(chunk)
+                        if max_bytes is not None and size > max_bytes:
+                            raise ValueError(
+                                f"File too large. Maximum size: {max_bytes // (1024 * 1024)}MB")
+                        hasher.update(chunk)
+                        if len(head) < settings.STREAM_PROBE_BYTES:
+                            head += chunk[:settings.STREAM_PROBE_BYTES - len(head)]
+                        buffer += chunk
+
+                        if len(buffer) >= chunk_size:
+                            persisted = await _put_resumable_chunk(
+                                gcs, session_uri, bytes(buffer[:chunk_size]), offset)
+                            # GCS may persist less than was sent; resend the rest
+                            del buffer[:persisted - offset]
+                            offset = persisted
+            except httpx.RequestError as e:
+                raise RuntimeError(f"Failed to download video from URL: {str(e)}")
+
+            while len(buffer) >= chunk_size:
+                persisted = await _put_resumable_chunk(
+                    gcs, session_uri, bytes(buffer[:chunk_size]), offset)
+                del buffer[:persisted - offset]
+                offset = persisted
+            await _put_resumable_chunk(gcs, session_uri, bytes(buffer), offset, total=size)
+        except BaseException:
+            # Cancel the session so GCS discards the partial upload
+            try:
+                await gcs.delete(session_uri)
+            except httpx.HTTPError:
+                pass
+            raise
+
+        content_hash = hasher.hexdigest()
+        blob_name = f"videos/{content_hash}{file_ext}"
+        await _promote_blob(gcs, auth_headers, bucket_name, temp_name, blob_name)
+
+    logger.info("Successfully streamed %d bytes to GCP: gs://%s/%s",
+                size, bucket_name, blob_name)
+    return StreamedTransfer(bucket_name, blob_name, size, content_hash, bytes(head))
+
+
+async def upload_stream_to_gcp(
+    chunks: AsyncIterable[bytes], blob_name: str, size: int
+) -> Tuple[str, str]:
+    """
+    Upload an object from an async byte stream in a single request.
+
+    The bytes are forwarded as they arrive, without buffering the object.
+    GCS only creates the object once all ``size`` bytes have been received,
+    so a stream that fails part-way leaves nothing behind.
+
+    Args:
+        chunks: Object contents; must yield exactly ``size`` bytes
+        blob_name: Blob name in GCP
+        size: Object size in bytes, sent as the Content-Length
+
+    Returns:
+        Tuple of (bucket_name, blob_path)
+    """
+    if not settings.GCP_BUCKET_NAME:
+        raise ValueError("GCP_BUCKET_NAME environment variable is required")
+
+    client = gcs_clients.get_async_client()
+    auth_headers = await gcs_clients.get_auth_headers_async()
+    response = await client.post(
+        f"{_gcs_endpoint()}/upload/storage/v1/b/{settings.GCP_BUCKET_NAME}/o",
+        params={"uploadType": "media", "name": blob_name},
+        headers={
+            **auth_headers,
+            "Content-Type": "application/octet-stream",
+            "Content-Length": str(size),
+        },
+        content=chunks,
+    )
+    if response.status_code not in (200, 201):
+        raise RuntimeError(
+            f"Failed to upload gs://{settings.GCP_BUCKET_NAME}/{blob_name}: HTTP {response.status_code}")
+    return settings.GCP_BUCKET_NAME, blob_name
+
+
+async def gcp_blob_exists(bucket_name: str, blob_name: str) -> bool:
+    """Whether a GCS object exists."""
+    client = gcs_clients.get_async_client()
+    auth_headers = await gcs_clients.get_auth_headers_async()
+    response = await client.get(
+        f"{_gcs_endpoint()}/storage/v1/b/{bucket_name}/o/"
+        f"{urllib.parse.quote(blob_name, safe='')}",
+        headers=auth_headers,
+    )
+    if response.status_code == 404:
+        return False
+    response.raise_for_status()
+    return True
+
+
+async def iter_gcp_blob(bucket_name: str, blob_name: str) -> AsyncIterator[bytes]:
+    """Stream the contents of a GCS object."""
+    client = gcs_clients.get_async_client()
+    auth_headers = await gcs_clients.get_auth_headers_async()
+    async with client.stream(
+        "GET", gcs_media_url(bucket_name, blob_name), headers=auth_headers
+    ) as response:
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Failed to read gs://{bucket_name}/{blob_name}: HTTP {response.status_code}")
+        async for chunk in response.aiter_bytes():
+            yield chunk
+
+
+async def read_gcp_blob_head(bucket_name: str, blob_name: str, size: int) -> bytes:
+    """
+    Download the first ``size`` bytes of a GCS object with a range request.
+
+    Args:
+        bucket_name: Bucket holding the object
+        blob_name: Blob name in GCP
+        size: Number of leading bytes to fetch
+
+    Returns:
+        The leading bytes (fewer if the object is smaller)
+    """
+    client = gcs_clients.get_async_client()
+    auth_headers = await gcs_clients.get_auth_headers_async()
+    response = await client.get(
+        gcs_media_url(bucket_name, blob_name),
+        headers={**auth_headers, "Range": f"bytes=0-{size - 1}"},
+    )
+    if response.status_code not in (200, 206):
+        raise RuntimeError(
+            f"Failed to read gs://{bucket_name}/{blob_name}: HTTP {response.status_code}")
+    return response.content[:size]
+
+
+async def compose_gcp_blobs(source_names: list[str], blob_name: str) -> Tuple[str, str]:
+    """
+    Concatenate GCS objects server-side into a new object.
+
+    GCS composes at most 32 objects per request, so larger lists are
+    composed in rounds through intermediate objects, which are deleted
+    afterwards. The source objects themselves are left in place.
+
+    Args:
+        source_names: Blob names to concatenate, in order
+        blob_name: Name of the composed blob
+
+    Returns:
+        Tuple of (bucket_name, blob_path)
+    """
+    if not settings.GCP_BUCKET_NAME:
+        raise ValueError("GCP_BUCKET_NAME environment variable is required")
+    if not source_names:
+        raise ValueError("Nothing to compose")
+
+    bucket_name = settings.GCP_BUCKET_NAME
+    objects_url = f"{_gcs_endpoint()}/storage/v1/b/{bucket_name}/o"
+    client = gcs_clients.get_async_client()
+    auth_headers = await gcs_clients.get_auth_headers_async()
+    intermediates: list[str] = []
+
+    async def compose(sources: list[str], destination: str):
+        response = await client.post(
+            f"{objects_url}/{urllib.parse.quote(destination, safe='')}/compose",
+            json={
+                "sourceObjects": [{"name": name} for name in sources],
+                "destination": {"contentType": "application/octet-stream"},
+            },
+            headers=auth_headers,
+        )
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Failed to compose gs://{bucket_name}/{destination}: HTTP {response.status_code}")
+
+    try:
+        for compose_round in _compose_rounds(source_names, blob_name):
+            await asyncio.gather(*(compose(g, n) for g, n in compose_round))
+            intermediates.extend(n for _, n in compose_round if n != blob_name)
+    finally:
+        await delete_gcp_blobs(intermediates)
+
+    logger.info("Composed %d objects into gs://%s/%s",
+                len(source_names), bucket_name, blob_name)
+    return bucket_name, blob_name
+
+
+async def delete_gcp_blobs(blob_names: list[str]):
+    """Delete GCS objects, ignoring ones that no longer exist."""
+    if not blob_names:
+        return
+
+    objects_url = f"{_gcs_endpoint()}/storage/v1/b/{settings.GCP_BUCKET_NAME}/o"
+    client = gcs_clients.get_async_client()
+    auth_headers = await gcs_clients.get_auth_headers_async()
+    responses = await asyncio.gather(*(
+        client.delete(
+            f"{objects_url}/{urllib.parse.quote(name, safe='')}", headers=auth_headers)
+        for name in blob_names
+    ), return_exceptions=True)
+    failed = [r for r in responses
+              if isinstance(r, Exception) or r.status_code not in (200, 204, 404)]
+    if failed:
+        logger.warning("Failed to delete %d of %d GCS objects",
+                       len(failed), len(blob_names))
+
+
 def parse_gcp_url(url: str) -> Tuple[str, str]:
     """
     Parse a GCP URL to extract bucket name and blob path.
@@ -135,3 +746,4 @@ def parse_gcp_url(url: str) -> Tuple[str, str]:
         raise ValueError(
             f"Unsupported GCP URL format: {url}. Use gs://, https://storage.googleapis.com/, or https://storage.cloud.google.com/"
         )
+
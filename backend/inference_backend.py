@@ -0,0 +1,355 @@
+"""Pluggable backends that turn a video in GCS into frame summaries."""
+import contextlib
+import functools
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from config import settings
+from shards import TimeRange, merge_shard_streams, plan_shards
+from video_utils import format_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceBackend:
+    """
+    Runs the frame-description pipeline on a video stored in GCS.
+
+    ``iter_video`` yields summaries batch by batch as the model produces
+    them. It blocks, so callers on the event loop should run it through
+    ``job_manager.run_blocking``. Videos longer than ``SHARD_SECONDS`` are
+    split into up to ``max_shards`` time ranges, which subclasses process
+    in parallel in ``stream_ranges``.
+    """
+
+    name = "base"
+    max_shards = 1
+
+    def iter_video(
+        self,
+        gcp_bucket_name: str,
+        gcp_blob_path: str,
+        interval: int = 2,
+        batch_size: int = 8,
+        model_id: str = settings.MODEL_ID,
+        dedup_distance: int = settings.FRAME_DEDUP_DISTANCE,
+        sampling: str = "interval",
+        duration: Optional[float] = None,
+    ) -> Iterator[List[Dict]]:
+        """
+        Describe sampled frames of a video, yielding the summaries in
+        batches, in timestamp order, as soon as they are described.
+
+        Args:
+            interval: Seconds between frames; with ``sampling="scene"``,
+                the average frame budget instead
+            dedup_distance: Frames whose perceptual hash is within this many
+                bits of the last described frame reuse its description
+                (negative to describe every frame)
+            sampling: ``"interval"`` for one frame every ``interval``
+                seconds, or ``"scene"`` for one frame per shot
+            duration: Video length in seconds, if known; needed to split
+                long videos into time ranges
+
+        Yields:
+            Lists of summary dicts with timestamp, timestamp_seconds,
+            description and frame_number, plus reused_from for frames
+            that reused an earlier description
+        """
+        ranges = plan_shards(duration or 0.0, settings.SHARD_SECONDS, self.max_shards)
+        if len(ranges) > 1:
+            logger.info("Processing gs://%s/%s as %d time ranges of %.0fs",
+                        gcp_bucket_name, gcp_blob_path, len(ranges), ranges[0][1])
+        return self.stream_ranges(
+            gcp_bucket_name, gcp_blob_path, ranges, interval, batch_size,
+            model_id, dedup_distance, sampling)
+
+    def stream_ranges(
+        self,
+        gcp_bucket_name: str,
+        gcp_blob_path: str,
+        ranges: List[TimeRange],
+        interval: int,
+        batch_size: int,
+        model_id: str,
+        dedup_distance: int,
+        sampling: str,
+    ) -> Iterator[List[Dict]]:
+        """
+        Describe each ``(start, end)`` range of a video.
+
+        Yields:
+            Batches of summaries in timestamp order, numbered across all
+            ranges (see ``shards.merge_shard_streams``)
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Release resources held by the backend."""
+
+
+class ModalBackend(InferenceBackend):
+    """
+    Calls the deployed ``VideoProcessor`` Modal class, which keeps models warm.
+
+    Summaries are streamed back with ``process_stream.remote_gen``. Time
+    ranges of a long video each get their own call, so they run on
+    separate containers; each container downloads the video and seeks to
+    its range.
+    """
+
+    name = "modal"
+    max_shards = settings.MAX_SHARDS
+
+    def __init__(self, app_name: str = "video-frame-processor", cls_name: str = "VideoProcessor"):
+        import modal
+
+        self._processor = modal.Cls.from_name(app_name, cls_name)()
+
+    def stream_ranges(
+        self,
+        gcp_bucket_name: str,
+        gcp_blob_path: str,
+        ranges: List[TimeRange],
+        interval: int,
+        batch_size: int,
+        model_id: str,
+        dedup_distance: int,
+        sampling: str,
+    ) -> Iterator[List[Dict]]:
+        return merge_shard_streams([
+            self._processor.process_stream.remote_gen(
+                gcp_bucket_name=gcp_bucket_name,
+                gcp_blob_path=gcp_blob_path,
+                interval=interval,
+                batch_size=batch_size,
+                model_id=model_id,
+                dedup_distance=dedup_distance,
+                sampling=sampling,
+                start=start,
+                end=end,
+            )
+            for start, end in ranges
+        ])
+
+
+class LocalBackend(InferenceBackend):
+    """
+    Runs the pipeline in this process on the local CPU or GPU.
+
+    Models are loaded on first use and stay resident (up to
+    ``max_models``, least recently used evicted). Frame descriptions are
+    cached across videos in the SQLite file at ``FRAME_CACHE_PATH``.
+    ``generate`` calls run on one dedicated thread, a batch at a time, so
+    concurrent jobs take turns rather than competing for the same model;
+    each job transcodes and decodes on its own threads. Requires torch and
+    transformers.
+
+    With ``shard_workers`` above 1, long videos are split into time ranges
+    that are described by a pool of that many processes. Each worker
+    process loads its own copy of the model. A range's summaries are
+    yielded once the whole range is done.
+
+    ``precision`` and ``cpu_threads`` select how models are loaded (see
+    ``video_processor.load_model``); ``"int8"`` runs a dynamically
+    quantized model on CPU, e.g. for low-priority backfills on nodes
+    without a GPU. Descriptions are capped at ``max_new_tokens`` tokens.
+
+    With ``STREAM_GCS_VIDEOS`` the video is not downloaded: it is decoded
+    from GCS with range requests through a loopback server (see
+    ``video_processor.stream_video``), which shard workers open as well.
+    """
+
+    name = "local"
+
+    def __init__(self, max_models: int = settings.MAX_RESIDENT_MODELS, models=None,
+                 frame_cache_path: str = settings.FRAME_CACHE_PATH,
+                 shard_workers: int = settings.LOCAL_SHARD_WORKERS,
+                 loader: Optional[Callable[[str], Tuple]] = None,
+                 precision: str = settings.LOCAL_PRECISION,
+                 cpu_threads: int = settings.CPU_THREADS,
+                 max_new_tokens: int = settings.MAX_NEW_TOKENS):
+        import video_processor
+        from frame_cache import FrameDescriptionCache
+
+        if precision not in video_processor.PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}'. "
+                             f"Choose from: {', '.join(video_processor.PRECISIONS)}")
+        if loader is None:
+            loader = functools.partial(
+                video_processor.load_model, precision=precision, threads=cpu_threads)
+        self._video_processor = video_processor
+        self.precision = precision
+        self.max_new_tokens = max_new_tokens
+        self.max_models = max_models
+        self.models = models or video_processor.ModelCache(max_models, loader)
+        self.frame_cache_path = frame_cache_path
+        self.frame_cache = FrameDescriptionCache(
+            frame_cache_path, settings.FRAME_CACHE_MAX_ENTRIES) if frame_cache_path else None
+        self.max_shards = shard_workers
+        self._loader = loader
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Every in-process generate call runs on this one thread, one batch
+        # at a time, so concurrent jobs take turns instead of sharing a model
+        self._model_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="local-model")
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_shards,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=self._video_processor.init_shard_worker,
+                    initargs=(self.max_models, self.frame_cache_path,
+                              settings.FRAME_CACHE_MAX_ENTRIES, self._loader),
+                )
+            return self._pool
+
+    def stream_ranges(
+        self,
+        gcp_bucket_name: str,
+        gcp_blob_path: str,
+        ranges: List[TimeRange],
+        interval: int,
+        batch_size: int,
+        model_id: str,
+        dedup_distance: int,
+        sampling: str,
+    ) -> Iterator[List[Dict]]:
+        from gcp_uploader import gcs_clients, gcs_media_url
+
+        vp = self._video_processor
+        with contextlib.ExitStack() as stack:
+            if settings.STREAM_GCS_VIDEOS:
+                # Headers are fetched per request, so tokens that expire
+                # during a long job are refreshed
+                video_path = stack.enter_context(vp.stream_video(
+                    gcs_media_url(gcp_bucket_name, gcp_blob_path),
+                    gcs_clients.get_auth_headers,
+                    os.path.splitext(gcp_blob_path)[1] or ".mp4"))
+            else:
+                video_path = vp.download_blob(
+                    gcs_clients.get_storage_client(), gcp_bucket_name, gcp_blob_path)
+                stack.callback(os.remove, video_path)
+            if len(ranges) == 1:
+                start, end = ranges[0]
+                yield from vp.describe_video_batches(
+                    video_path, interval, batch_size, model_id, self.models,
+                    dedup_distance, self.frame_cache, sampling, start, end,
+                    self.max_new_tokens, self._model_executor)
+                return
+
+            # Transcode once here rather than once per range
+            if vp.needs_transcode(video_path):
+                video_path = vp.transcode_video(video_path)
+                stack.callback(os.remove, video_path)
+            pool = self._get_pool()
+            futures = [
+                pool.submit(vp.describe_shard, video_path,
+                            interval, batch_size, model_id, dedup_distance,
+                            sampling, start, end, self.max_new_tokens)
+                for start, end in ranges
+            ]
+            try:
+                yield from merge_shard_streams(
+                    [_iter_future_result(future) for future in futures])
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        self._model_executor.shutdown(cancel_futures=True)
+
+
+def _iter_future_result(future: Future) -> Iterator[List[Dict]]:
+    """Yield the result of a future that returns one list of summaries."""
+    yield future.result()
+
+
+class FakeBackend(InferenceBackend):
+    """
+    In-process stand-in that needs neither Modal nor a model.
+
+    Produces one placeholder summary per ``interval`` seconds, whatever the
+    sampling mode, in batches of ``batch_size``, so the job pipeline can
+    run end-to-end in development and tests.
+    """
+
+    name = "fake"
+    max_shards = settings.MAX_SHARDS
+
+    def __init__(self, duration_seconds: float = 30.0, delay_per_frame: float = 0.0):
+        self.duration_seconds = duration_seconds
+        self.delay_per_frame = delay_per_frame
+
+    def stream_ranges(
+        self,
+        gcp_bucket_name: str,
+        gcp_blob_path: str,
+        ranges: List[TimeRange],
+        interval: int,
+        batch_size: int,
+        model_id: str,
+        dedup_distance: int,
+        sampling: str,
+    ) -> Iterator[List[Dict]]:
+        return merge_shard_streams([
+            self._fake_range(gcp_bucket_name, gcp_blob_path, start, end, interval, batch_size)
+            for start, end in ranges
+        ])
+
+    def _fake_range(self, gcp_bucket_name: str, gcp_blob_path: str, start: float,
+                    end: Optional[float], interval: int, batch_size: int) -> Iterator[List[Dict]]:
+        end = self.duration_seconds if end is None else min(end, self.duration_seconds)
+        frame_number = 0
+        batch = []
+        ts = math.ceil(start / interval) * interval
+        while ts < end:
+            if self.delay_per_frame:
+                time.sleep(self.delay_per_frame)
+            batch.append({
+                "timestamp": format_timestamp(ts),
+                "timestamp_seconds": ts,
+                "description": f"Frame at {ts:g}s of gs://{gcp_bucket_name}/{gcp_blob_path}",
+                "frame_number": frame_number,
+            })
+            frame_number += 1
+            ts += interval
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+BACKENDS = {
+    "modal": ModalBackend,
+    "local": LocalBackend,
+    "fake": FakeBackend,
+}
+
+
+def create_backend(name: str) -> InferenceBackend:
+    """
+    Create the inference backend called ``name``.
+
+    Raises:
+        ValueError: If ``name`` is not a known backend
+    """
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown inference backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return backend_cls()
@@ -0,0 +1,166 @@
+"""Background job queue for long-running video processing."""
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+class Job:
+    """State of a single background job."""
+
+    def __init__(self, kind: str, video_id: Optional[str] = None):
+        now = datetime.now(timezone.utc)
+        self.id = str(uuid.uuid4())
+        self.kind = kind
+        self.video_id = video_id
+        self.status = JOB_QUEUED
+        self.stage = "queued"
+        self.progress = 0.0
+        self.error: Optional[str] = None
+        self.result: Dict[str, Any] = {}
+        self.created_at = now
+        self.updated_at = now
+
+    def update(self, stage: str, progress: Optional[float] = None):
+        """Record the current pipeline stage and, optionally, progress (0-1)."""
+        self.stage = stage
+        if progress is not None:
+            self.progress = max(0.0, min(1.0, progress))
+        self.updated_at = datetime.now(timezone.utc)
+        logger.info("Job %s: %s (%.0f%%)", self.id, stage, self.progress * 100)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_COMPLETED, JOB_FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "video_id": self.video_id,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "error": self.error,
+            "result": self.result,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class JobManager:
+    """
+    Runs job coroutines on the event loop with bounded concurrency.
+
+    At most ``max_workers`` jobs run at once; the rest wait in FIFO order.
+    Blocking calls made by a job (Modal, GCS) should go through
+    ``run_blocking`` so they execute on the manager's own thread pool
+    instead of stalling the event loop.
+    """
+
+    def __init__(self, max_workers: int, max_tracked_jobs: int = 1000):
+        self.max_workers = max_workers
+        self.max_tracked_jobs = max_tracked_jobs
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._tasks: set = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="job-worker")
+
+    def create(self, kind: str, video_id: Optional[str] = None) -> Job:
+        """Register a new queued job."""
+        job = Job(kind, video_id)
+        self._jobs[job.id] = job
+        self._evict_finished()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def submit(self, job: Job, fn: Callable[[Job], Awaitable[Any]]) -> Job:
+        """Schedule ``fn(job)`` to run once a worker slot is free."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        task = asyncio.create_task(self._run(job, fn))
+        # Keep a strong reference so the task is not garbage collected
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def run_blocking(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking callable on the job thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: fn(*args, **kwargs))
+
+    async def _run(self, job: Job, fn: Callable[[Job], Awaitable[Any]]):
+        async with self._semaphore:
+            job.status = JOB_RUNNING
+            job.update("running")
+            try:
+                await fn(job)
+                job.status = JOB_COMPLETED
+                job.update("completed", 1.0)
+            except Exception as e:
+                logger.error("Job %s failed: %s", job.id, e)
+                job.status = JOB_FAILED
+                job.error = getattr(e, "detail", None) or str(e)
+                job.update("failed")
+
+    def _evict_finished(self):
+        """Drop the oldest finished jobs once the tracked-job limit is exceeded."""
+        if len(self._jobs) <= self.max_tracked_jobs:
+            return
+        for job_id in [jid for jid, j in self._jobs.items() if j.finished]:
+            if len(self._jobs) <= self.max_tracked_jobs:
+                break
+            del self._jobs[job_id]
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class VideoEvents:
+    """
+    In-process publish/subscribe of per-video events for live clients.
+
+    Jobs publish ``(event, data)`` pairs for a video; every subscriber of
+    that video gets them on its own queue. Must be used from the event loop.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, video_id: str) -> "asyncio.Queue[Tuple[str, Any]]":
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(str(video_id), set()).add(queue)
+        return queue
+
+    def unsubscribe(self, video_id: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(str(video_id))
+        if subscribers is not None:
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[str(video_id)]
+
+    def publish(self, video_id: str, event: str, data: Any):
+        for queue in self._subscribers.get(str(video_id), ()):
+            queue.put_nowait((event, data))
+
+
+# Global job manager instance
+job_manager = JobManager(settings.JOB_WORKERS, settings.MAX_TRACKED_JOBS)
+
+# Global video event hub (summaries and status for GET /videos/{id}/stream)
+video_events = VideoEvents()
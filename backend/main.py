@@ -1,39 +1,71 @@
 """FastAPI application for video processing."""
+import asyncio
+import hashlib
+import json
 import logging
-import tempfile
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Optional
 from uuid import UUID
-from fastapi import FastAPI, UploadFile, File, HTTPException, Query, Depends, Header
+from fastapi import FastAPI, HTTPException, Query, Depends, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional
-import httpx
-import modal
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 from config import settings
-from video_utils import format_timestamp, get_video_duration
+from video_utils import format_timestamp, get_video_duration, get_video_duration_from_head
 from models import (
+    SamplingMode,
     VideoResponse,
     VideoListResponse,
     VideoSummaryResponse,
+    SearchHit,
+    SearchResponse,
     ProcessUrlRequest,
     YouTubeUploadRequest,
     ApiKeyResponse,
+    JobResponse,
+    UploadSessionCreateRequest,
+    UploadSessionResponse,
 )
 from supabase_client import (
     create_video,
     get_video,
     get_video_with_summaries,
+    video_responses,
     update_video,
     list_videos,
     create_video_summaries,
     get_video_summaries,
+    get_video_summaries_after,
+    get_video_summaries_page,
+    summary_cursor,
     aggregate_key_topics,
+    find_completed_video_by_hash,
+    clone_video_summaries,
     create_api_key,
     validate_api_key,
+    revoke_api_key,
+    load_summary_index,
+    search_summaries,
+    close_http_client,
 )
 from youtube_uploader import upload_youtube_to_gcp
-from gcp_uploader import upload_file_to_gcp, parse_gcp_url
+from gcp_uploader import (
+    upload_file_to_gcp,
+    parse_gcp_url,
+    read_gcp_blob_head,
+    stream_url_to_gcp,
+    upload_stream_to_gcp,
+    compose_gcp_blobs,
+    delete_gcp_blobs,
+    gcp_blob_exists,
+    iter_gcp_blob,
+    gcs_clients,
+)
+from jobs import Job, job_manager, video_events
+from inference_backend import InferenceBackend, create_backend
+from uploads import UploadSession, stream_upload_to_disk, upload_session_store
 
 # Configure logging
 logging.basicConfig(
@@ -43,15 +75,15 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-# Lookup Modal function - handle case where Modal is not available (for local dev)
-modal_app = None
+# Set up the inference backend - handle case where it is not available (for local dev)
+inference_backend: Optional[InferenceBackend] = None
 try:
-    modal_app = modal.Function.from_name(
-        "video-frame-processor", "process_video_on_gpu")
-    logger.info("Modal function loaded successfully")
-except (AttributeError, Exception) as e:
+    inference_backend = create_backend(settings.INFERENCE_BACKEND)
+    logger.info("Using %s inference backend", inference_backend.name)
+except Exception as e:
     logger.warning(
-        "Modal not available or function not found: %s. Video processing will fail.", e)
+        "Inference backend '%s' not available: %s. Video processing will fail.",
+        settings.INFERENCE_BACKEND, e)
 
 # Create FastAPI app
 app = FastAPI(
@@ -76,6 +108,22 @@ async def startup_event():
     logger.info("Starting FastAPI application")
     logger.info(f"Upload directory: {settings.UPLOAD_DIR}")
     logger.info(f"Model ID: {settings.MODEL_ID}")
+    logger.info(f"Job workers: {settings.JOB_WORKERS}")
+    if settings.SEARCH_BACKEND == "memory":
+        await load_summary_index()
+    elif settings.SEARCH_BACKEND != "postgres":
+        raise ValueError(
+            f"Unknown search backend '{settings.SEARCH_BACKEND}'. Choose from: postgres, memory")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release background job and connection pool resources on shutdown."""
+    job_manager.shutdown()
+    if inference_backend is not None:
+        inference_backend.close()
+    await close_http_client()
+    await gcs_clients.aclose()
 
 
 @app.get("/")
@@ -90,7 +138,7 @@ async def health():
     return {"status": "healthy"}
 
 
-def verify_api_key(x_api_key: Optional[str] = Header(None)) -> str:
+async def verify_api_key(x_api_key: Optional[str] = Header(None)) -> str:
     """
     Dependency to verify API key from X-API-Key header.
 
@@ -109,7 +157,7 @@ def verify_api_key(x_api_key: Optional[str] = Header(None)) -> str:
             detail="API key required. Please provide X-API-Key header."
         )
 
-    if not validate_api_key(x_api_key):
+    if not await validate_api_key(x_api_key):
         raise HTTPException(
             status_code=401,
             detail="Invalid or expired API key."
@@ -127,7 +175,7 @@ async def generate_api_key():
         Generated API key with metadata
     """
     try:
-        api_key_record = create_api_key()
+        api_key_record = await create_api_key()
         return ApiKeyResponse(**api_key_record)
     except Exception as e:
         logger.error(f"Error generating API key: {e}")
@@ -135,198 +183,296 @@ async def generate_api_key():
             status_code=500, detail=f"Error generating API key: {str(e)}")
 
 
+@app.post("/api-keys/revoke")
+async def revoke_current_api_key(api_key: str = Depends(verify_api_key)):
+    """
+    Revoke the API key sent in the X-API-Key header.
+
+    The key stops working immediately on this server; other server processes
+    stop accepting it within API_KEY_CACHE_TTL seconds.
+
+    Returns:
+        Confirmation that the key was revoked
+    """
+    try:
+        await revoke_api_key(api_key)
+    except Exception as e:
+        logger.error(f"Error revoking API key: {e}")
+        raise HTTPException(
+            status_code=500, detail=f"Error revoking API key: {str(e)}")
+    return {"revoked": True}
+
+
 def validate_video_file(filename: str) -> bool:
     """Validate that the uploaded file is a supported video format."""
     ext = Path(filename).suffix.lower()
     return ext in settings.ALLOWED_VIDEO_EXTENSIONS
 
 
-async def download_video_from_url(url: str, output_path: Path) -> Path:
-    """Download a video from a URL."""
-    logger.info("Downloading video from URL: %s", url)
-
-    # Configure headers to mimic a browser request
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-        "Accept": "*/*",
-        "Accept-Language": "en-US,en;q=0.9",
-        "Referer": "https://www.youtube.com/",
-        "Accept-Encoding": "identity",  # Don't compress, we want raw video data
-    }
-
-    async with httpx.AsyncClient(
-        timeout=300.0,
-        follow_redirects=True,  # Explicitly enable redirect following
-        headers=headers
-    ) as client:
-        try:
-            async with client.stream("GET", url) as response:
-                # Check for successful status codes (200, 206 for partial content, or redirects that were followed)
-                if response.status_code not in (200, 206):
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Failed to download video from URL: HTTP {response.status_code}"
-                    )
-
-                with open(output_path, "wb") as f:
-                    async for chunk in response.aiter_bytes():
-                        f.write(chunk)
-        except httpx.HTTPStatusError as e:
-            logger.error("HTTP error downloading video: %s", e)
-            raise HTTPException(
-                status_code=400,
-                detail=f"Failed to download video from URL: HTTP {e.response.status_code}"
-            )
-        except httpx.RequestError as e:
-            logger.error("Request error downloading video: %s", e)
-            raise HTTPException(
-                status_code=400,
-                detail=f"Failed to download video from URL: {str(e)}"
-            )
+# Headers for fetching videos, mimicking a browser request
+DOWNLOAD_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "*/*",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Referer": "https://www.youtube.com/",
+    "Accept-Encoding": "identity",  # Don't compress, we want raw video data
+}
 
-    logger.info("Successfully downloaded video to: %s", output_path)
-    return output_path
+# Summary fields sent to live clients by GET /videos/{video_id}/stream
+STREAM_SUMMARY_FIELDS = ("frame_number", "timestamp", "timestamp_seconds", "description")
 
 
-@app.post("/videos/upload", response_model=VideoResponse)
+async def process_and_store_summaries(
+    job: Job,
+    video_id: str,
+    gcp_bucket_name: str,
+    gcp_blob_path: str,
+    frame_interval: int,
+    sampling: str = "interval",
+    duration_seconds: Optional[float] = None,
+):
+    """
+    Run the inference backend on a video in GCS and store its summaries.
+
+    ``duration_seconds`` lets the backend split long videos into time
+    ranges that are processed in parallel.
+    """
+    if inference_backend is None:
+        raise RuntimeError(
+            "Inference backend not available. Please deploy the video processor first.")
+
+    job.update("processing", 0.3)
+    logger.info("Calling %s backend to process video...", inference_backend.name)
+    batches = await job_manager.run_blocking(
+        inference_backend.iter_video,
+        gcp_bucket_name=gcp_bucket_name,
+        gcp_blob_path=gcp_blob_path,
+        interval=frame_interval,
+        model_id=settings.MODEL_ID,
+        dedup_distance=settings.FRAME_DEDUP_DISTANCE,
+        sampling=sampling,
+        duration=duration_seconds,
+    )
+
+    # Store and publish each batch as it arrives, so results are visible
+    # (and kept) long before the whole video is done
+    total_frames = 0
+    frames_skipped = 0
+    first_summaries = []
+    try:
+        while True:
+            summaries = await job_manager.run_blocking(next, batches, None)
+            if summaries is None:
+                break
+            summary_records = [
+                {
+                    "video_id": video_id,
+                    "timestamp": summary["timestamp"],
+                    "timestamp_seconds": summary["timestamp_seconds"],
+                    "description": summary["description"],
+                    "frame_number": summary["frame_number"],
+                }
+                for summary in summaries
+            ]
+            await create_video_summaries(summary_records)
+
+            total_frames += len(summaries)
+            frames_skipped += sum(
+                1 for summary in summaries if summary.get("reused_from") is not None)
+            first_summaries = (first_summaries + summaries)[:5]
+            updates = {"total_frames": total_frames}
+            if duration_seconds:
+                progress = min(summaries[-1]["timestamp_seconds"] / duration_seconds, 0.99)
+                updates["progress"] = progress
+                job.update("processing", 0.3 + 0.6 * progress)
+            await update_video(video_id, updates)
+            video_events.publish(video_id, "summaries", [
+                {key: record[key] for key in STREAM_SUMMARY_FIELDS}
+                for record in summary_records
+            ])
+            video_events.publish(video_id, "progress", {
+                "total_frames": total_frames, "progress": updates.get("progress")})
+    finally:
+        await job_manager.run_blocking(batches.close)
+
+    # Aggregate key topics
+    job.update("saving", 0.9)
+    key_topics = aggregate_key_topics(first_summaries)
+
+    # Update video record with completed status
+    await update_video(
+        video_id,
+        {
+            "status": "completed",
+            "total_frames": total_frames,
+            "progress": 1.0,
+            "key_topics": key_topics,
+        }
+    )
+    video_events.publish(video_id, "status", {"status": "completed"})
+    job.result["total_frames"] = total_frames
+    job.result["frames_skipped"] = frames_skipped
+
+
+async def reuse_existing_results(
+    job: Job,
+    content_hash: str,
+    frame_interval: int,
+    sampling: str = "interval",
+) -> bool:
+    """
+    Copy results from an already processed video with identical content.
+
+    Returns:
+        True if results were reused and the video is now completed
+    """
+    source = await find_completed_video_by_hash(
+        content_hash, frame_interval, sampling, exclude_id=job.video_id)
+    if not source:
+        return False
+
+    logger.info("Reusing results of video %s (sha256 %s)",
+                source["id"], content_hash)
+    job.update("reusing results", 0.5)
+    copied = await clone_video_summaries(source["id"], job.video_id)
+    await update_video(
+        job.video_id,
+        {
+            "status": "completed",
+            "total_frames": copied,
+            "progress": 1.0,
+            "key_topics": source.get("key_topics"),
+        }
+    )
+    video_events.publish(job.video_id, "status", {"status": "completed"})
+    job.result["total_frames"] = copied
+    job.result["deduplicated_from"] = source["id"]
+    return True
+
+
+async def mark_video_failed(video_id: str):
+    """Set a video's status to failed, logging rather than raising on error."""
+    try:
+        await update_video(video_id, {"status": "failed"})
+    except Exception as e:
+        logger.error("Error marking video %s as failed: %s", video_id, e)
+    video_events.publish(video_id, "status", {"status": "failed"})
+
+
+async def run_upload_job(
+    job: Job,
+    video_path: Path,
+    frame_interval: int,
+    content_hash: str,
+    sampling: str = "interval",
+    duration_seconds: Optional[float] = None,
+):
+    """Background job: upload a saved video to GCP and process it."""
+    try:
+        # Identical bytes already processed with these settings: copy results
+        if await reuse_existing_results(job, content_hash, frame_interval, sampling):
+            return
+
+        # Upload video to GCP first (Modal function requires GCP path)
+        job.update("uploading", 0.1)
+        logger.info("Uploading video to GCP for processing...")
+        gcp_bucket_name, gcp_blob_path = await job_manager.run_blocking(
+            upload_file_to_gcp, video_path, content_hash=content_hash)
+
+        await process_and_store_summaries(
+            job, job.video_id, gcp_bucket_name, gcp_blob_path, frame_interval, sampling,
+            duration_seconds)
+    except Exception as e:
+        logger.error("Error processing video: %s", e)
+        await mark_video_failed(job.video_id)
+        raise
+    finally:
+        # Clean up temporary file
+        try:
+            if video_path.exists():
+                video_path.unlink()
+        except Exception as e:
+            logger.warning("Error deleting temporary file: %s", e)
+
+
+@app.post(
+    "/videos/upload",
+    response_model=JobResponse,
+    status_code=202,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                    }
+                }
+            },
+        }
+    },
+)
 async def upload_video(
-    file: UploadFile = File(...),
+    request: Request,
     frame_interval: int = Query(
         2, ge=1, le=60, description="Seconds between frames"),
+    sampling: SamplingMode = Query(
+        "interval", description="Frame sampling: fixed interval, or one frame per shot"),
     title: Optional[str] = Query(
         None, description="Optional title for the video"),
 ):
     """
-    Upload and process a video file.
+    Upload a video file and queue it for processing.
 
     - **file**: Video file to upload (mp4, avi, mov, etc.)
     - **frame_interval**: Seconds between frames to extract (default: 2)
+    - **sampling**: `interval` (default) or `scene` for one frame per shot
     - **title**: Optional title for the video
-    """
-    # Validate file
-    if not validate_video_file(file.filename):
-        raise HTTPException(
-            status_code=400,
-            detail=f"Unsupported video format. Allowed: {', '.join(settings.ALLOWED_VIDEO_EXTENSIONS)}"
-        )
-
-    # Save uploaded file
-    file_ext = Path(file.filename).suffix
-    temp_file = tempfile.NamedTemporaryFile(
-        delete=False,
-        suffix=file_ext,
-        dir=settings.UPLOAD_DIR
-    )
-
-    try:
-        # Read and save file
-        content = await file.read()
-        if len(content) > settings.MAX_VIDEO_SIZE * 1024 * 1024:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Maximum size: {settings.MAX_VIDEO_SIZE}MB"
-            )
 
-        temp_file.write(content)
-        temp_file.close()
+    The file is streamed to disk in fixed-size chunks as it arrives, so
+    memory use stays constant regardless of file size.
 
-        video_path = Path(temp_file.name)
+    Returns 202 with a job; poll `GET /jobs/{job_id}` for progress.
+    """
+    # Stream file to disk, validating format and size as it arrives
+    upload = await stream_upload_to_disk(
+        request, field_name="file", validate_filename=validate_video_file)
+    video_path = upload.path
 
+    try:
         # Get video duration
-        duration_seconds = get_video_duration(str(video_path))
+        duration_seconds = await run_in_threadpool(
+            get_video_duration, str(video_path), upload.sha256)
         duration_formatted = format_timestamp(duration_seconds)
 
         # Create video record with "processing" status
         video_data = {
-            "video_url": file.filename or "uploaded_video",
+            "video_url": upload.filename or "uploaded_video",
             "title": title,
             "duration": duration_formatted,
             "status": "processing",
             "frame_interval": frame_interval,
+            "sampling": sampling,
             "total_frames": 0,
+            "content_hash": upload.sha256,
         }
 
-        video_record = create_video(video_data)
-        video_id = video_record["id"]
-
-        try:
-            # Upload video to GCP first (Modal function requires GCP path)
-            logger.info("Uploading video to GCP for processing...")
-            gcp_bucket_name, gcp_blob_path = upload_file_to_gcp(video_path)
-
-            # Process video using Modal
-            if modal_app is None:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Modal function not available. Please deploy the video processor first."
-                )
-
-            logger.info("Calling Modal function to process video...")
-            summaries = modal_app.remote(
-                gcp_bucket_name=gcp_bucket_name,
-                gcp_blob_path=gcp_blob_path,
-                interval=frame_interval
-            )
-
-            # Create summary records
-            summary_records = []
-            for summary in summaries:
-                summary_records.append({
-                    "video_id": video_id,
-                    "timestamp": summary["timestamp"],
-                    "timestamp_seconds": summary["timestamp_seconds"],
-                    "description": summary["description"],
-                    "frame_number": summary["frame_number"],
-                })
-
-            if summary_records:
-                create_video_summaries(summary_records)
-
-            # Aggregate key topics
-            key_topics = aggregate_key_topics(summaries)
-
-            # Update video record with completed status
-            update_video(
-                video_id,
-                {
-                    "status": "completed",
-                    "total_frames": len(summaries),
-                    "key_topics": key_topics,
-                }
-            )
-
-            # Get updated video with summaries
-            video = get_video_with_summaries(UUID(video_id))
-
-            if not video:
-                raise HTTPException(
-                    status_code=404, detail="Video not found after processing")
-
-            # Convert to response model (handles camelCase conversion)
-            return VideoResponse(**video)
-
-        except Exception as e:
-            logger.error("Error processing video: %s", e)
-            # Update status to failed
-            update_video(video_id, {"status": "failed"})
-            raise HTTPException(
-                status_code=500, detail=f"Error processing video: {str(e)}")
-
-        finally:
-            # Clean up temporary file
-            try:
-                if video_path and video_path.exists():
-                    video_path.unlink()
-            except Exception as e:
-                logger.warning("Error deleting temporary file: %s", e)
-
-    except HTTPException:
-        raise
+        video_record = await create_video(video_data)
     except Exception as e:
+        if video_path.exists():
+            video_path.unlink()
         logger.error("Error uploading video: %s", e)
         raise HTTPException(
             status_code=500, detail=f"Error uploading video: {str(e)}")
 
+    job = job_manager.create("upload", video_record["id"])
+    job_manager.submit(
+        job, lambda j: run_upload_job(
+            j, video_path, frame_interval, upload.sha256, sampling, duration_seconds))
+    return JobResponse(**job.to_dict())
+
 
 @app.post("/videos/youtube-upload")
 async def upload_youtube_video(request: YouTubeUploadRequest):
@@ -364,19 +510,8 @@ async def upload_youtube_video(request: YouTubeUploadRequest):
             status_code=500, detail=f"Error uploading YouTube video: {str(e)}")
 
 
-@app.post("/videos/process-url", response_model=VideoResponse)
-async def process_video_url(request: ProcessUrlRequest):
-    """
-    Process a video from a URL.
-
-    - **url**: URL of the video to process
-    - **frame_interval**: Seconds between frames (default: 2)
-    - **title**: Optional title for the video
-    """
-    url = request.url
-    frame_interval = request.frameInterval or settings.DEFAULT_FRAME_INTERVAL
-    title = request.title
-
+async def run_url_job(job: Job, url: str, frame_interval: int, sampling: str = "interval"):
+    """Background job: fetch a video URL into GCP and process it."""
     # Check if URL is a GCP URL
     is_gcp_url = (
         url.startswith("gs://") or
@@ -384,180 +519,476 @@ async def process_video_url(request: ProcessUrlRequest):
         "storage.cloud.google.com" in url
     )
 
-    video_path = None
-    duration_formatted = "0:00"  # Placeholder, will be updated after processing
-
     try:
-        if not is_gcp_url:
-            # Download from regular URL and upload to GCP
-            file_ext = ".mp4"  # Default extension
-            temp_file = tempfile.NamedTemporaryFile(
-                delete=False,
-                suffix=file_ext,
-                dir=settings.UPLOAD_DIR
+        # If video is already in GCP, extract bucket and blob path
+        if is_gcp_url:
+            # Parse GCP URL to get bucket and blob path
+            logger.info("Parsing GCP URL: %s", url)
+            gcp_bucket_name, gcp_blob_path = parse_gcp_url(url)
+
+            # Probe the duration from the head of the object
+            duration_seconds = None
+            try:
+                head = await read_gcp_blob_head(
+                    gcp_bucket_name, gcp_blob_path, settings.STREAM_PROBE_BYTES)
+                duration_seconds = await job_manager.run_blocking(
+                    get_video_duration_from_head, head, Path(gcp_blob_path).suffix.lower())
+                await update_video(
+                    job.video_id, {"duration": format_timestamp(duration_seconds)})
+            except Exception as e:
+                logger.warning("Could not probe duration of %s: %s", url, e)
+        else:
+            # Stream from regular URL straight into GCP, hashing on the way
+            job.update("transferring", 0.05)
+            logger.info("Streaming video from URL to GCP: %s", url)
+            transfer = await stream_url_to_gcp(
+                url,
+                request_headers=DOWNLOAD_HEADERS,
+                max_bytes=settings.MAX_VIDEO_SIZE * 1024 * 1024,
             )
-            temp_file.close()
-            video_path = Path(temp_file.name)
-            await download_video_from_url(url, video_path)
+            gcp_bucket_name, gcp_blob_path = transfer.bucket_name, transfer.blob_name
 
-            # Get video duration for non-GCP URLs
-            duration_seconds = get_video_duration(str(video_path))
-            duration_formatted = format_timestamp(duration_seconds)
+            # Get video duration from the head of the stream
+            duration_seconds = await job_manager.run_blocking(
+                get_video_duration_from_head, transfer.head, Path(transfer.blob_name).suffix)
+            await update_video(
+                job.video_id,
+                {
+                    "duration": format_timestamp(duration_seconds),
+                    "content_hash": transfer.sha256,
+                })
 
-        # Create video record with "processing" status
+            # Identical bytes already processed with these settings: copy results
+            if await reuse_existing_results(job, transfer.sha256, frame_interval, sampling):
+                return
+
+        await process_and_store_summaries(
+            job, job.video_id, gcp_bucket_name, gcp_blob_path, frame_interval, sampling,
+            duration_seconds)
+    except Exception as e:
+        logger.error("Error processing video URL: %s", e)
+        await mark_video_failed(job.video_id)
+        raise
+
+
+@app.post("/videos/process-url", response_model=JobResponse, status_code=202)
+async def process_video_url(request: ProcessUrlRequest):
+    """
+    Queue a video from a URL for processing.
+
+    - **url**: URL of the video to process
+    - **frame_interval**: Seconds between frames (default: 2)
+    - **sampling**: `interval` (default) or `scene` for one frame per shot
+    - **title**: Optional title for the video
+
+    Returns 202 with a job; poll `GET /jobs/{job_id}` for progress.
+    """
+    url = request.url
+    frame_interval = request.frameInterval or settings.DEFAULT_FRAME_INTERVAL
+
+    try:
+        # Create video record with "processing" status; the duration is
+        # filled in by the job once the video has been downloaded
         video_data = {
             "video_url": url,
-            "title": title,
-            "duration": duration_formatted,
+            "title": request.title,
+            "duration": "0:00",
             "status": "processing",
             "frame_interval": frame_interval,
+            "sampling": request.sampling,
             "total_frames": 0,
         }
 
-        video_record = create_video(video_data)
-        video_id = video_record["id"]
+        video_record = await create_video(video_data)
+    except Exception as e:
+        logger.error("Error processing video URL: %s", e)
+        raise HTTPException(
+            status_code=500, detail=f"Error processing video URL: {str(e)}")
 
-        try:
-            # If video is already in GCP, extract bucket and blob path
-            if is_gcp_url:
-                # Parse GCP URL to get bucket and blob path
-                logger.info("Parsing GCP URL: %s", url)
-                gcp_bucket_name, gcp_blob_path = parse_gcp_url(url)
-            else:
-                # Upload video to GCP first (Modal function requires GCP path)
-                logger.info("Uploading video to GCP for processing...")
-                gcp_bucket_name, gcp_blob_path = upload_file_to_gcp(video_path)
-
-            # Process video using Modal
-            if modal_app is None:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Modal function not available. Please deploy the video processor first."
-                )
-
-            logger.info("Calling Modal function to process video...")
-            summaries = modal_app.remote(
-                gcp_bucket_name=gcp_bucket_name,
-                gcp_blob_path=gcp_blob_path,
-                interval=frame_interval
-            )
+    job = job_manager.create("process-url", video_record["id"])
+    job_manager.submit(job, lambda j: run_url_job(j, url, frame_interval, request.sampling))
+    return JobResponse(**job.to_dict())
 
-            # Create summary records
-            summary_records = []
-            for summary in summaries:
-                summary_records.append({
-                    "video_id": video_id,
-                    "timestamp": summary["timestamp"],
-                    "timestamp_seconds": summary["timestamp_seconds"],
-                    "description": summary["description"],
-                    "frame_number": summary["frame_number"],
-                })
 
-            if summary_records:
-                create_video_summaries(summary_records)
+@app.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """
+    Get the status and progress of a background processing job.
 
-            # Aggregate key topics
-            key_topics = aggregate_key_topics(summaries)
+    - **job_id**: ID returned by `/videos/upload` or `/videos/process-url`
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobResponse(**job.to_dict())
 
-            # Update video record with completed status
-            update_video(
-                video_id,
-                {
-                    "status": "completed",
-                    "total_frames": len(summaries),
-                    "key_topics": key_topics,
-                }
-            )
 
-            # Get updated video with summaries
-            video = get_video_with_summaries(UUID(video_id))
+def get_upload_session_or_404(upload_id: str) -> UploadSession:
+    """Look up a resumable upload session, raising 404 if it is unknown."""
+    session = upload_session_store.get(upload_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    return session
 
-            if not video:
-                raise HTTPException(
-                    status_code=404, detail="Video not found after processing")
 
-            # Convert to response model (handles camelCase conversion)
-            return VideoResponse(**video)
+@app.post("/uploads", response_model=UploadSessionResponse, status_code=201)
+async def create_upload_session(request: UploadSessionCreateRequest):
+    """
+    Start a resumable upload of a large video.
 
-        except Exception as e:
-            logger.error("Error processing video: %s", e)
-            # Update status to failed
-            update_video(video_id, {"status": "failed"})
-            raise HTTPException(
-                status_code=500, detail=f"Error processing video: {str(e)}")
+    - **filename**: Name of the video file (mp4, avi, mov, etc.)
+    - **size**: Total file size in bytes
+    - **chunkSize**: Bytes per chunk (optional)
+    - **frameInterval**: Seconds between frames to extract (default: 2)
+    - **sampling**: `interval` (default) or `scene` for one frame per shot
+    - **title**: Optional title for the video
+
+    Upload the chunks with `PUT /uploads/{upload_id}/chunks/{index}`, in any
+    order and in parallel, then call `POST /uploads/{upload_id}/complete`.
+    """
+    if not validate_video_file(request.filename):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported video format. Allowed: {', '.join(settings.ALLOWED_VIDEO_EXTENSIONS)}"
+        )
+    if request.size > settings.MAX_VIDEO_SIZE * 1024 * 1024:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Maximum size: {settings.MAX_VIDEO_SIZE}MB"
+        )
+
+    chunk_size = request.chunkSize or settings.RESUMABLE_CHUNK_SIZE
+    if chunk_size > settings.RESUMABLE_MAX_CHUNK_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Chunk size too large. Maximum: {settings.RESUMABLE_MAX_CHUNK_SIZE} bytes"
+        )
+
+    # Clean up chunks of abandoned sessions
+    for expired in upload_session_store.expire():
+        await delete_gcp_blobs(
+            [expired.chunk_blob_name(i) for i in expired.received])
+
+    session = upload_session_store.create(
+        request.filename,
+        request.size,
+        chunk_size,
+        request.frameInterval,
+        request.title,
+        request.sampling,
+    )
+    logger.info("Created upload session %s: %s (%d bytes, %d chunks)",
+                session.id, session.filename, session.size, session.chunk_count)
+    return UploadSessionResponse(**session.to_dict())
 
-        finally:
-            # Clean up temporary file (only if it's a temp file, not if it's from GCP)
-            try:
-                if video_path and video_path.exists() and not is_gcp_url:
-                    video_path.unlink()
-            except Exception as e:
-                logger.warning("Error deleting temporary file: %s", e)
 
+@app.get("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload_session(upload_id: str):
+    """
+    Get the state of a resumable upload, including the byte ranges received.
+
+    - **upload_id**: ID returned by `POST /uploads`
+    """
+    return UploadSessionResponse(**get_upload_session_or_404(upload_id).to_dict())
+
+
+@app.put("/uploads/{upload_id}/chunks/{index}", response_model=UploadSessionResponse)
+async def upload_chunk(upload_id: str, index: int, request: Request):
+    """
+    Upload one chunk of a resumable upload as the raw request body.
+
+    - **upload_id**: ID returned by `POST /uploads`
+    - **index**: Zero-based chunk number
+
+    Every chunk must be exactly `chunkSize` bytes, except the last one.
+    Re-sending a chunk replaces it.
+    """
+    session = get_upload_session_or_404(upload_id)
+    if session.completed or session.completing:
+        raise HTTPException(
+            status_code=409, detail="Upload session already completed")
+    if index < 0 or index >= session.chunk_count:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Chunk index must be between 0 and {session.chunk_count - 1}"
+        )
+
+    expected = session.expected_chunk_size(index)
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) != expected:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Chunk {index} must be {expected} bytes, got {content_length}"
+        )
+
+    # The next chunk in order is hashed on the way through
+    generation = session.hash_generation
+    hasher = session.hasher.copy() if index == session.hashed_chunks else None
+    head = bytearray()
+
+    async def body():
+        received = 0
+        async for piece in request.stream():
+            received += len(piece)
+            if received > expected:
+                raise HTTPException(
+                    status_code=400, detail=f"Chunk {index} must be {expected} bytes")
+            if hasher is not None:
+                hasher.update(piece)
+            if index == 0 and len(head) < settings.STREAM_PROBE_BYTES:
+                head.extend(piece[:settings.STREAM_PROBE_BYTES - len(head)])
+            yield piece
+        if received != expected:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Chunk {index} must be {expected} bytes, got {received}"
+            )
+
+    # Stream the body straight into the chunk's blob
+    session.active_chunks += 1
+    try:
+        await upload_stream_to_gcp(body(), session.chunk_blob_name(index), expected)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error("Error processing video URL: %s", e)
+        logger.error("Error storing chunk %d of upload %s: %s",
+                     index, upload_id, e)
         raise HTTPException(
-            status_code=500, detail=f"Error processing video URL: {str(e)}")
+            status_code=500, detail=f"Error storing chunk: {str(e)}")
+    finally:
+        session.active_chunks -= 1
+
+    if (hasher is not None and session.hash_generation == generation
+            and session.hashed_chunks == index):
+        session.hasher = hasher
+        session.hashed_chunks += 1
+    elif index < session.hashed_chunks:
+        # Replaced a chunk that was already hashed
+        session.reset_hash()
+    session.received.add(index)
+    if index == 0:
+        session.head = bytes(head)
+    session.updated_at = datetime.now(timezone.utc)
+    return UploadSessionResponse(**session.to_dict())
+
+
+async def run_gcs_job(
+    job: Job,
+    gcp_bucket_name: str,
+    gcp_blob_path: str,
+    frame_interval: int,
+    sampling: str = "interval",
+    duration_seconds: Optional[float] = None,
+    content_hash: Optional[str] = None,
+):
+    """Background job: process a video that is already in GCP."""
+    try:
+        # Identical bytes already processed with these settings: copy results
+        if content_hash and await reuse_existing_results(
+                job, content_hash, frame_interval, sampling):
+            return
+
+        await process_and_store_summaries(
+            job, job.video_id, gcp_bucket_name, gcp_blob_path, frame_interval, sampling,
+            duration_seconds)
+    except Exception as e:
+        logger.error("Error processing video: %s", e)
+        await mark_video_failed(job.video_id)
+        raise
+
+
+@app.post("/uploads/{upload_id}/complete", response_model=JobResponse, status_code=202)
+async def complete_upload_session(upload_id: str):
+    """
+    Finish a resumable upload and queue the video for processing.
+
+    - **upload_id**: ID returned by `POST /uploads`
+
+    The chunks are concatenated server-side with GCS compose, so no data is
+    uploaded again, into `videos/<sha256><ext>`; identical content already
+    processed with the same settings reuses its results. Returns 202 with a
+    job; poll `GET /jobs/{job_id}`.
+    """
+    session = get_upload_session_or_404(upload_id)
+    if session.completed:
+        raise HTTPException(
+            status_code=409, detail="Upload session already completed")
+    missing = session.missing_chunks
+    if missing:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload incomplete; missing chunks: {missing[:20]}"
+        )
+
+    if session.completing or session.active_chunks:
+        raise HTTPException(
+            status_code=409, detail="Upload session is busy; retry shortly")
+
+    # Guard against concurrent calls composing twice; cleared on failure
+    session.completing = True
+    chunk_names = [session.chunk_blob_name(i) for i in range(session.chunk_count)]
+    composed = False
+    try:
+        # Name the video after its content, as the other ingest paths do,
+        # and only compose it if those bytes are not stored yet
+        content_hash = await session.finish_hash(
+            lambda name: iter_gcp_blob(settings.GCP_BUCKET_NAME, name))
+        gcp_blob_path = f"videos/{content_hash}{Path(session.filename).suffix.lower()}"
+        gcp_bucket_name = settings.GCP_BUCKET_NAME
+        if await gcp_blob_exists(gcp_bucket_name, gcp_blob_path):
+            logger.info("Upload %s already in GCP: gs://%s/%s",
+                        upload_id, gcp_bucket_name, gcp_blob_path)
+        else:
+            await compose_gcp_blobs(chunk_names, gcp_blob_path)
+            composed = True
+
+        duration_seconds = await run_in_threadpool(
+            get_video_duration_from_head, session.head,
+            Path(session.filename).suffix.lower())
+
+        # Create video record with "processing" status
+        video_data = {
+            "video_url": session.filename,
+            "title": session.title,
+            "duration": format_timestamp(duration_seconds),
+            "status": "processing",
+            "frame_interval": session.frame_interval,
+            "sampling": session.sampling,
+            "total_frames": 0,
+            "content_hash": content_hash,
+        }
+
+        video_record = await create_video(video_data)
+    except Exception as e:
+        if composed:
+            await delete_gcp_blobs([gcp_blob_path])
+        logger.error("Error completing upload %s: %s", upload_id, e)
+        raise HTTPException(
+            status_code=500, detail=f"Error completing upload: {str(e)}")
+    finally:
+        session.completing = False
+
+    session.completed = True
+    await delete_gcp_blobs(chunk_names)
+
+    job = job_manager.create("resumable-upload", video_record["id"])
+    job_manager.submit(job, lambda j: run_gcs_job(
+        j, gcp_bucket_name, gcp_blob_path, session.frame_interval, session.sampling,
+        duration_seconds, content_hash))
+    session.job_id = job.id
+    session.head = b""
+    return JobResponse(**job.to_dict())
+
+
+async def list_videos_page(skip: int, limit: int, cursor: Optional[str]) -> VideoListResponse:
+    """Shared implementation of the video list endpoints."""
+    if cursor and skip:
+        raise HTTPException(status_code=400, detail="Use either cursor or skip, not both")
+    try:
+        videos_data, total, next_cursor = await list_videos(
+            skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing videos: {e}")
+        raise HTTPException(
+            status_code=500, detail=f"Error listing videos: {str(e)}")
+
+    # Convert to response models
+    videos = [VideoResponse(**video) for video in videos_data]
+
+    return VideoListResponse(
+        videos=videos,
+        total=total,
+        skip=skip,
+        limit=limit,
+        nextCursor=next_cursor,
+    )
 
 
 @app.get("/videos", response_model=VideoListResponse)
 async def list_all_videos(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    cursor: Optional[str] = Query(
+        None, description="nextCursor of the previous page (keyset pagination)"),
+    skip: int = Query(0, ge=0, description="Number of records to skip (prefer cursor)"),
     limit: int = Query(
         10, ge=1, le=100, description="Maximum number of records to return"),
 ):
     """
-    List all videos with pagination.
+    List all videos with pagination, newest first.
 
-    - **skip**: Number of records to skip (default: 0)
+    - **cursor**: ``nextCursor`` from the previous page; omit for the first page
+    - **skip**: Number of records to skip (default: 0); slower on deep pages
     - **limit**: Maximum number of records to return (default: 10, max: 100)
     """
-    try:
-        videos_data, total = list_videos(skip=skip, limit=limit)
+    return await list_videos_page(skip, limit, cursor)
 
-        # Convert to response models
-        videos = [VideoResponse(**video) for video in videos_data]
 
-        return VideoListResponse(
-            videos=videos,
-            total=total,
-            skip=skip,
-            limit=limit,
-        )
-    except Exception as e:
-        logger.error(f"Error listing videos: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Error listing videos: {str(e)}")
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
 
 
-@app.get("/videos/{video_id}", response_model=VideoResponse)
-async def get_video_by_id(video_id: UUID):
+async def video_detail_response(video_id: UUID, if_none_match: Optional[str]) -> Response:
     """
-    Get a single video by ID with all its summaries.
+    Shared implementation of the single-video endpoints.
 
-    - **video_id**: UUID of the video
+    The response body is serialized once and sent with a strong ETag, so
+    clients polling with If-None-Match get a 304 when nothing changed.
+    Completed videos no longer change, so their serialized responses are
+    kept in ``video_responses`` until update_video touches the row.
     """
-    try:
-        video = get_video_with_summaries(video_id)
+    key = str(video_id)
+    cached = video_responses.get(key)
+    if cached is None:
+        token = video_responses.token()
+        try:
+            video = await get_video_with_summaries(video_id)
+        except Exception as e:
+            logger.error(f"Error getting video {video_id}: {e}")
+            raise HTTPException(
+                status_code=500, detail=f"Error getting video: {str(e)}")
 
         if not video:
             raise HTTPException(status_code=404, detail="Video not found")
 
-        return VideoResponse(**video)
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting video {video_id}: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Error getting video: {str(e)}")
+        body = VideoResponse(**video).model_dump_json(by_alias=True).encode()
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        cached = (body, etag)
+        if video["status"] == "completed":
+            video_responses.set(key, cached, len(body), token=token)
+
+    body, etag = cached
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+
+@app.get("/videos/{video_id}", response_model=VideoResponse)
+async def get_video_by_id(
+    video_id: UUID,
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Get a single video by ID with all its summaries.
+
+    - **video_id**: UUID of the video
+    - **If-None-Match**: ETag of a previous response; answered with 304 if unchanged
+    """
+    return await video_detail_response(video_id, if_none_match)
 
 
 @app.get("/videos/{video_id}/summaries")
 async def get_video_summaries_endpoint(
     video_id: UUID,
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    cursor: Optional[str] = Query(
+        None, description="nextCursor of the previous page (keyset pagination)"),
+    skip: int = Query(0, ge=0, description="Number of records to skip (prefer cursor)"),
     limit: int = Query(100, ge=1, le=1000,
                        description="Maximum number of records to return"),
 ):
@@ -565,17 +996,31 @@ async def get_video_summaries_endpoint(
     Get summaries for a video with pagination.
 
     - **video_id**: UUID of the video
-    - **skip**: Number of records to skip (default: 0)
+    - **cursor**: ``nextCursor`` from the previous page; omit for the first page
+    - **skip**: Number of records to skip (default: 0); slower on deep pages
     - **limit**: Maximum number of records to return (default: 100, max: 1000)
     """
+    if cursor and skip:
+        raise HTTPException(status_code=400, detail="Use either cursor or skip, not both")
     try:
-        # Verify video exists
-        video = get_video(video_id)
-        if not video:
-            raise HTTPException(status_code=404, detail="Video not found")
-
-        summaries_data, total = get_video_summaries(
-            video_id, skip=skip, limit=limit)
+        if skip:
+            # Offset pagination: the database walks past every skipped row
+            video = await get_video(video_id)
+            if not video:
+                raise HTTPException(status_code=404, detail="Video not found")
+            summaries_data, total = await get_video_summaries(
+                video_id, skip=skip, limit=limit)
+            next_cursor = (summary_cursor(summaries_data[-1])
+                           if len(summaries_data) == limit else None)
+        else:
+            # Keyset pagination: same cost at any depth
+            try:
+                page = await get_video_summaries_page(video_id, cursor, limit)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if page is None:
+                raise HTTPException(status_code=404, detail="Video not found")
+            summaries_data, total, next_cursor = page
 
         # Convert to response models
         summaries = [VideoSummaryResponse(**summary)
@@ -586,6 +1031,7 @@ async def get_video_summaries_endpoint(
             "total": total,
             "skip": skip,
             "limit": limit,
+            "nextCursor": next_cursor,
         }
     except HTTPException:
         raise
@@ -595,63 +1041,159 @@ async def get_video_summaries_endpoint(
             status_code=500, detail=f"Error getting video summaries: {str(e)}")
 
 
+def format_sse(event: str, data: Any) -> str:
+    """Encode one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def video_event_stream(video_id: str, request: Request) -> AsyncIterator[str]:
+    """
+    Server-Sent Events for one video: stored summaries first, then new ones.
+
+    Events are ``summaries`` (a list of frames), ``progress`` and, last,
+    ``status`` once the video is completed or failed. Summaries from jobs
+    in this process arrive as soon as they are stored. If nothing arrives
+    for ``SSE_POLL_SECONDS``, the database is polled instead, which covers
+    jobs running in other processes. A comment line is sent on every poll
+    so proxies keep the connection open.
+    """
+    queue = video_events.subscribe(video_id)
+    last_frame_number = -1
+
+    async def stored_events() -> AsyncIterator[str]:
+        nonlocal last_frame_number
+        while True:
+            rows = await get_video_summaries_after(video_id, last_frame_number)
+            if not rows:
+                return
+            last_frame_number = rows[-1]["frame_number"]
+            yield format_sse("summaries", [
+                {key: row[key] for key in STREAM_SUMMARY_FIELDS} for row in rows])
+
+    try:
+        while True:
+            # Catch up from the database; subscribed first, so nothing is missed
+            async for event in stored_events():
+                yield event
+            video = await get_video(video_id)
+            if not video:
+                return
+            yield format_sse("progress", {
+                "total_frames": video.get("total_frames"), "progress": video.get("progress")})
+            if video["status"] != "processing":
+                yield format_sse("status", {"status": video["status"]})
+                return
+
+            # Relay live events until the job finishes or goes quiet
+            while True:
+                if await request.is_disconnected():
+                    return
+                try:
+                    event, data = await asyncio.wait_for(
+                        queue.get(), timeout=settings.SSE_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    break
+                if event == "summaries":
+                    data = [s for s in data if s["frame_number"] > last_frame_number]
+                    if not data:
+                        continue
+                    last_frame_number = data[-1]["frame_number"]
+                yield format_sse(event, data)
+                if event == "status":
+                    return
+    finally:
+        video_events.unsubscribe(video_id, queue)
+
+
+@app.get("/videos/{video_id}/stream")
+async def stream_video(video_id: UUID, request: Request):
+    """
+    Stream a video's summaries live as Server-Sent Events.
+
+    - **video_id**: UUID of the video
+
+    Sends the summaries stored so far, then each new batch as soon as it
+    is stored, as `summaries` events (lists of frames with frame_number,
+    timestamp, timestamp_seconds and description). `progress` events carry
+    total_frames and progress (0-1). The stream ends with a `status` event
+    once the video is completed or failed.
+    """
+    video = await get_video(video_id)
+    if not video:
+        raise HTTPException(status_code=404, detail="Video not found")
+    return StreamingResponse(
+        video_event_stream(str(video_id), request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/search", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200, description="Words to search for"),
+    skip: int = Query(0, ge=0, le=10000, description="Number of hits to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of hits to return"),
+):
+    """
+    Search frame descriptions across all videos, best matches first.
+
+    - **q**: Words to search for; all of them must appear (e.g. ``motorcycle highway``)
+    - **skip**: Number of hits to skip (default: 0)
+    - **limit**: Maximum number of hits to return (default: 20, max: 100)
+    """
+    try:
+        # One extra hit tells whether there is another page
+        hits = await search_summaries(q, skip=skip, limit=limit + 1)
+    except Exception as e:
+        logger.error(f"Error searching for {q!r}: {e}")
+        raise HTTPException(
+            status_code=500, detail=f"Error searching: {str(e)}")
+
+    return SearchResponse(
+        query=q,
+        results=[SearchHit(**hit) for hit in hits[:limit]],
+        skip=skip,
+        limit=limit,
+        hasMore=len(hits) > limit,
+    )
+
+
 # API endpoints with API key authentication
 @app.get("/api/videos", response_model=VideoListResponse)
 async def api_list_all_videos(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    cursor: Optional[str] = Query(
+        None, description="nextCursor of the previous page (keyset pagination)"),
+    skip: int = Query(0, ge=0, description="Number of records to skip (prefer cursor)"),
     limit: int = Query(
         10, ge=1, le=100, description="Maximum number of records to return"),
     _api_key: str = Depends(verify_api_key),
 ):
     """
-    List all videos with pagination (requires API key).
+    List all videos with pagination, newest first (requires API key).
 
-    - **skip**: Number of records to skip (default: 0)
+    - **cursor**: ``nextCursor`` from the previous page; omit for the first page
+    - **skip**: Number of records to skip (default: 0); slower on deep pages
     - **limit**: Maximum number of records to return (default: 10, max: 100)
     - **X-API-Key**: API key in header (required)
     """
-    try:
-        videos_data, total = list_videos(skip=skip, limit=limit)
-
-        # Convert to response models
-        videos = [VideoResponse(**video) for video in videos_data]
-
-        return VideoListResponse(
-            videos=videos,
-            total=total,
-            skip=skip,
-            limit=limit,
-        )
-    except Exception as e:
-        logger.error(f"Error listing videos: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Error listing videos: {str(e)}")
+    return await list_videos_page(skip, limit, cursor)
 
 
 @app.get("/api/videos/{video_id}", response_model=VideoResponse)
 async def api_get_video_by_id(
     video_id: UUID,
+    if_none_match: Optional[str] = Header(None),
     _api_key: str = Depends(verify_api_key),
 ):
     """
     Get a single video by ID with all its summaries (requires API key).
 
     - **video_id**: UUID of the video
+    - **If-None-Match**: ETag of a previous response; answered with 304 if unchanged
     - **X-API-Key**: API key in header (required)
     """
-    try:
-        video = get_video_with_summaries(video_id)
-
-        if not video:
-            raise HTTPException(status_code=404, detail="Video not found")
-
-        return VideoResponse(**video)
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error getting video {video_id}: {e}")
-        raise HTTPException(
-            status_code=500, detail=f"Error getting video: {str(e)}")
+    return await video_detail_response(video_id, if_none_match)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,14 @@
 """Pydantic models for API request/response validation."""
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Literal, Optional, List
 from datetime import datetime
 from uuid import UUID
 
 from config import settings
 
+# Frame sampling modes: one frame every frameInterval seconds, or one per shot
+SamplingMode = Literal["interval", "scene"]
+
 
 class VideoSummaryResponse(BaseModel):
     """Response model for a single video summary."""
@@ -31,7 +34,9 @@ class VideoResponse(BaseModel):
     status: str
     keyTopics: Optional[str] = Field(None, alias="key_topics")
     frameInterval: int = Field(alias="frame_interval")
+    sampling: SamplingMode = "interval"
     totalFrames: int = Field(alias="total_frames")
+    progress: float = 0.0
     createdAt: datetime = Field(alias="created_at")
     updatedAt: datetime = Field(alias="updated_at")
     summaries: Optional[List[VideoSummaryResponse]] = None
@@ -41,12 +46,36 @@ class VideoResponse(BaseModel):
         from_attributes = True
 
 
+class SearchHit(BaseModel):
+    """A summary matching a search query."""
+    videoId: str = Field(alias="video_id")
+    frameNumber: int = Field(alias="frame_number")
+    timestamp: str
+    timestampSeconds: float = Field(alias="timestamp_seconds")
+    description: str
+    rank: float
+
+    class Config:
+        populate_by_name = True
+        from_attributes = True
+
+
+class SearchResponse(BaseModel):
+    """Response model for a page of search hits."""
+    query: str
+    results: List[SearchHit]
+    skip: int
+    limit: int
+    hasMore: bool
+
+
 class VideoListResponse(BaseModel):
     """Response model for a list of videos."""
     videos: List[VideoResponse]
     total: int
     skip: int
     limit: int
+    nextCursor: Optional[str] = None  # None on the last page
 
 
 class ProcessUrlRequest(BaseModel):
@@ -54,6 +83,8 @@ class ProcessUrlRequest(BaseModel):
     url: str = Field(..., description="URL of the video to process")
     frameInterval: Optional[int] = Field(
         settings.DEFAULT_FRAME_INTERVAL, description="Seconds between frames", ge=1, le=60)
+    sampling: SamplingMode = Field(
+        "interval", description="Frame sampling: fixed interval, or one frame per shot")
     title: Optional[str] = Field(
         None, description="Optional title for the video")
 
@@ -96,3 +127,55 @@ class ApiKeyResponse(BaseModel):
     class Config:
         populate_by_name = True
         from_attributes = True
+
+
+class JobResponse(BaseModel):
+    """Response model for a background processing job."""
+    id: str
+    kind: str
+    videoId: Optional[str] = Field(None, alias="video_id")
+    status: str
+    stage: str
+    progress: float
+    error: Optional[str] = None
+    result: dict = {}
+    createdAt: datetime = Field(alias="created_at")
+    updatedAt: datetime = Field(alias="updated_at")
+
+    class Config:
+        populate_by_name = True
+        from_attributes = True
+
+
+class UploadSessionCreateRequest(BaseModel):
+    """Request model for starting a resumable upload."""
+    filename: str = Field(..., description="Name of the video file")
+    size: int = Field(..., description="Total file size in bytes", gt=0)
+    chunkSize: Optional[int] = Field(
+        None, description="Bytes per chunk (default: server setting)", gt=0)
+    frameInterval: int = Field(
+        2, description="Seconds between frames", ge=1, le=60)
+    sampling: SamplingMode = Field(
+        "interval", description="Frame sampling: fixed interval, or one frame per shot")
+    title: Optional[str] = Field(
+        None, description="Optional title for the video")
+
+
+class UploadSessionResponse(BaseModel):
+    """Response model for a resumable upload session."""
+    id: str
+    filename: str
+    size: int
+    chunkSize: int = Field(alias="chunk_size")
+    chunkCount: int = Field(alias="chunk_count")
+    receivedChunks: List[int] = Field(alias="received_chunks")
+    receivedRanges: List[List[int]] = Field(alias="received_ranges")
+    missingChunks: List[int] = Field(alias="missing_chunks")
+    completed: bool
+    jobId: Optional[str] = Field(None, alias="job_id")
+    createdAt: datetime = Field(alias="created_at")
+    updatedAt: datetime = Field(alias="updated_at")
+
+    class Config:
+        populate_by_name = True
+        from_attributes = True
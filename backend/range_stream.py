@@ -0,0 +1,305 @@
+"""Reading remote videos with HTTP range requests instead of downloading them.
+
+``RangeReader`` reads an HTTP(S) URL, such as a GCS signed URL, as a
+seekable file, fetching only the blocks that are read. ``RangeServer``
+serves such a source on a loopback port with range support, so that
+OpenCV's FFmpeg backend can decode a remote video while seeking. Only the
+byte ranges around the sampled frames are then transferred.
+
+Only the standard library is imported so this module can also be used by
+the Modal worker.
+"""
+import io
+import logging
+import re
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Bytes per cached block; also the smallest range fetched
+DEFAULT_BLOCK_SIZE = 256 * 1024
+# Blocks kept in memory (least recently used are dropped)
+DEFAULT_CACHE_BLOCKS = 128
+# Most blocks fetched in one request while reading sequentially
+MAX_READ_AHEAD_BLOCKS = 8
+
+# Bytes written per chunk by RangeServer
+_SERVE_CHUNK_SIZE = 256 * 1024
+_RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+
+# Returns the headers to send with a request
+HeaderProvider = Callable[[], Dict[str, str]]
+
+
+class RangeReader(io.RawIOBase):
+    """
+    Seekable, read-only file over an HTTP URL that supports range requests.
+
+    Data is fetched in blocks of ``block_size`` and kept in an LRU cache of
+    ``cache_blocks`` blocks. While reads are sequential, each request
+    fetches twice as many blocks as the last, up to
+    ``MAX_READ_AHEAD_BLOCKS``; a seek starts again at one block. This keeps
+    the request count low for linear decoding without over-fetching around
+    seeks. ``read_at`` is thread-safe and does not move the file position.
+
+    ``headers`` may be a callable returning the headers, which is then
+    called for every request, so that short-lived access tokens can be
+    refreshed during a long read.
+
+    ``bytes_fetched`` and ``requests`` count the network traffic.
+    """
+
+    def __init__(self, url: str, headers: Union[Dict[str, str], HeaderProvider, None] = None,
+                 block_size: int = DEFAULT_BLOCK_SIZE,
+                 cache_blocks: int = DEFAULT_CACHE_BLOCKS,
+                 timeout: float = 60.0, retries: int = 3):
+        super().__init__()
+        self.url = url
+        self.headers = headers if callable(headers) else dict(headers or {})
+        self.block_size = block_size
+        self.cache_blocks = max(cache_blocks, MAX_READ_AHEAD_BLOCKS)
+        self.timeout = timeout
+        self.retries = retries
+        self.bytes_fetched = 0
+        self.requests = 0
+        self._blocks: "OrderedDict[int, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._position = 0
+        self._next_block: Optional[int] = None  # block a sequential reader needs next
+        self._read_ahead = 1
+        self.size = -1
+
+        # The first request also tells us the size
+        with self._lock:
+            start, end = self._plan_fetch(0)
+        data, size = self._fetch(start, end)
+        with self._lock:
+            self._store(start, data, size)
+
+    def _fetch(self, start: int, end: int) -> Tuple[bytes, int]:
+        """Fetch bytes ``[start, end)``; returns the data and the total size."""
+        for attempt in range(self.retries + 1):
+            headers = self.headers() if callable(self.headers) else self.headers
+            request = urllib.request.Request(
+                self.url, headers={**headers, "Range": f"bytes={start}-{end - 1}"})
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    data = response.read()
+                    if response.status == 206:
+                        total = int(response.headers["Content-Range"].rsplit("/", 1)[1])
+                    else:
+                        # Server ignored the range and sent the whole file
+                        total = len(data)
+                        data = data[start:end]
+                return data, total
+            except urllib.error.HTTPError as e:
+                if e.code == 416:
+                    return b"", start
+                if e.code < 500 or attempt == self.retries:
+                    raise
+            except (urllib.error.URLError, ConnectionError, TimeoutError):
+                if attempt == self.retries:
+                    raise
+            time.sleep(0.5 * 2 ** attempt)
+        raise AssertionError("unreachable")
+
+    def _plan_fetch(self, index: int) -> Tuple[int, int]:
+        """
+        Choose the blocks to fetch for a miss on block ``index``: the block
+        itself, plus read-ahead blocks when reading sequentially. Returns
+        the byte range ``[start, end)``. Call with ``_lock`` held.
+        """
+        if index == self._next_block:
+            self._read_ahead = min(self._read_ahead * 2, MAX_READ_AHEAD_BLOCKS)
+        else:
+            self._read_ahead = 1
+        count = 1
+        while count < self._read_ahead and index + count not in self._blocks:
+            count += 1
+        if self.size >= 0:
+            count = max(1, min(count, -(-self.size // self.block_size) - index))
+        self._next_block = index + count
+        start = index * self.block_size
+        return start, start + count * self.block_size
+
+    def _store(self, start: int, data: bytes, size: int):
+        """Cache the blocks fetched from ``start``. Call with ``_lock`` held."""
+        self.size = size
+        self.requests += 1
+        self.bytes_fetched += len(data)
+        index = start // self.block_size
+        for i in range(0, len(data), self.block_size):
+            self._blocks[index] = data[i:i + self.block_size]
+            self._blocks.move_to_end(index)
+            index += 1
+        while len(self._blocks) > self.cache_blocks:
+            self._blocks.popitem(last=False)
+
+    def read_at(self, offset: int, length: int) -> bytes:
+        """Read up to ``length`` bytes at ``offset`` without moving the position."""
+        parts = []
+        end = offset + length
+        while True:
+            # The lock covers only the cache; fetches run without it, so
+            # concurrent readers of cached blocks do not wait on the network
+            with self._lock:
+                end = min(end, self.size)
+                missing = None
+                while offset < end:
+                    index, skip = divmod(offset, self.block_size)
+                    block = self._blocks.get(index)
+                    if block is None:
+                        missing = self._plan_fetch(index)
+                        break
+                    self._blocks.move_to_end(index)
+                    part = block[skip:skip + end - offset]
+                    parts.append(part)
+                    offset += len(part)
+            if missing is None:
+                return b"".join(parts)
+            data, size = self._fetch(*missing)
+            with self._lock:
+                self._store(missing[0], data, size)
+            if not data:
+                return b"".join(parts)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        self._position = max(0, offset)
+        return self._position
+
+    def readinto(self, buffer) -> int:
+        data = self.read_at(self._position, len(buffer))
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": self.size, "bytes_fetched": self.bytes_fetched, "requests": self.requests}
+
+
+class RangeServer:
+    """
+    Serves ``source`` over HTTP on 127.0.0.1, honouring ``Range`` headers.
+
+    ``source`` needs a ``size`` and a ``read_at(offset, length)`` method,
+    as ``RangeReader`` has. With a ``RangeReader`` this is a loopback proxy
+    that OpenCV can open as a URL. Serving a local file (see
+    ``tests.file_source``), it stands in for GCS in tests and benchmarks;
+    ``latency`` then adds a delay to every request to mimic a network round
+    trip, and ``bandwidth`` (bytes per second, per connection) limits
+    throughput.
+
+    Use as a context manager; ``url`` is valid while it is open.
+    """
+
+    def __init__(self, source, filename: str = "video", latency: float = 0.0,
+                 bandwidth: Optional[float] = None):
+        self.source = source
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests = 0
+        self.bytes_served = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # A small send buffer stops the server from reading far past
+                # what the client consumes before it disconnects to seek
+                self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _SERVE_CHUNK_SIZE)
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_HEAD(self):
+                self._respond(send_body=False)
+
+            def do_GET(self):
+                self._respond(send_body=True)
+
+            def _respond(self, send_body: bool):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                size = server.source.size
+                start, end = 0, size
+                match = _RANGE_PATTERN.match(self.headers.get("Range", ""))
+                if match and (match.group(1) or match.group(2)):
+                    if match.group(1):
+                        start = int(match.group(1))
+                        if match.group(2):
+                            end = min(int(match.group(2)) + 1, size)
+                    else:
+                        start = max(0, size - int(match.group(2)))
+                    if start >= size:
+                        self.send_response(416)
+                        self.send_header("Content-Range", f"bytes */{size}")
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    self.send_response(206)
+                    self.send_header("Content-Range", f"bytes {start}-{end - 1}/{size}")
+                else:
+                    self.send_response(200)
+                self.send_header("Accept-Ranges", "bytes")
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(end - start))
+                # FFmpeg reuses connections that are not explicitly closed
+                self.send_header("Connection", "close")
+                self.close_connection = True
+                self.end_headers()
+                if not send_body:
+                    return
+                try:
+                    offset = start
+                    while offset < end:
+                        data = server.source.read_at(offset, min(_SERVE_CHUNK_SIZE, end - offset))
+                        if not data:
+                            break
+                        self.wfile.write(data)
+                        server.bytes_served += len(data)
+                        if server.bandwidth:
+                            time.sleep(len(data) / server.bandwidth)
+                        offset += len(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # FFmpeg drops the connection when it seeks elsewhere
+                    pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/{filename}"
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="range-server", daemon=True)
+
+    def __enter__(self) -> "RangeServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
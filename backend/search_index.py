@@ -0,0 +1,200 @@
+"""In-process full-text index over frame descriptions.
+
+Used by ``GET /search`` when ``SEARCH_BACKEND=memory``, for local and test
+deployments without the Postgres search function. Queries match summaries
+that contain every query term (after lowercasing, dropping stop words and
+light stemming) and are ranked with BM25, scored with numpy.
+
+Postings are kept in compact arrays: per term, the ascending ids of the
+documents containing it and the term's count in each. Re-adding a summary
+with the same (video_id, frame_number) replaces it.
+
+To benchmark the index, see ``bench/search.py``.
+"""
+import logging
+import math
+import re
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset("""
+    a an and are as at be been but by for from has have in into is it its of
+    on or that the their there these this to was were which while with
+""".split())
+
+
+def _stem(word: str) -> str:
+    """Strip common English suffixes so that e.g. plurals match."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 5 and word.endswith("ing"):
+        return word[:-3]
+    if len(word) > 4 and word.endswith("ed"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Search terms of ``text``, in order, with repeats."""
+    return [_stem(word) for word in _TOKEN_PATTERN.findall(text.lower())
+            if word not in STOP_WORDS]
+
+
+class SearchIndex:
+    """
+    Inverted index of video summaries, safe to use from several threads.
+
+    Documents are summaries with ``video_id``, ``frame_number``,
+    ``timestamp``, ``timestamp_seconds`` and ``description``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # term -> (ascending document ids, term count per document)
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._documents: List[Optional[Tuple[str, int, str, float, str]]] = []
+        self._lengths = array("I")
+        self._ids: Dict[Tuple[str, int], int] = {}
+        self._video_ids: Dict[str, str] = {}  # interned video id strings
+        self._removed = set()  # ids of replaced or discarded documents
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def add(self, summary: Dict[str, Any]):
+        """Index a summary, replacing any earlier one for the same frame."""
+        self.add_many([summary])
+
+    def add_many(self, summaries: Iterable[Dict[str, Any]]):
+        """Index several summaries."""
+        with self._lock:
+            for summary in summaries:
+                video_id = str(summary["video_id"])
+                video_id = self._video_ids.setdefault(video_id, video_id)
+                key = (video_id, int(summary["frame_number"]))
+                self._discard(key)
+
+                document_id = len(self._documents)
+                terms = tokenize(summary["description"])
+                counts: Dict[str, int] = {}
+                for term in terms:
+                    counts[term] = counts.get(term, 0) + 1
+                for term, count in counts.items():
+                    postings = self._postings.get(term)
+                    if postings is None:
+                        postings = self._postings[term] = (array("I"), array("H"))
+                    postings[0].append(document_id)
+                    postings[1].append(min(count, 0xFFFF))
+
+                self._documents.append((
+                    video_id, key[1], summary["timestamp"],
+                    float(summary["timestamp_seconds"]), summary["description"]))
+                self._lengths.append(len(terms))
+                self._ids[key] = document_id
+                self._total_length += len(terms)
+
+    def discard(self, video_id: str, frame_number: int) -> bool:
+        """Remove a summary; returns whether it was indexed."""
+        with self._lock:
+            return self._discard((str(video_id), frame_number))
+
+    def _discard(self, key: Tuple[str, int]) -> bool:
+        # The document stays in the postings; search skips removed ones
+        document_id = self._ids.pop(key, None)
+        if document_id is None:
+            return False
+        self._documents[document_id] = None
+        self._removed.add(document_id)
+        self._total_length -= self._lengths[document_id]
+        return True
+
+    def search(self, query: str, skip: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Find the summaries containing every term of ``query``.
+
+        Args:
+            query: Words to search for
+            skip: Number of hits to skip
+            limit: Maximum number of hits to return
+
+        Returns:
+            Hits ordered by descending ``rank``, each with ``video_id``,
+            ``frame_number``, ``timestamp``, ``timestamp_seconds``,
+            ``description`` and ``rank``
+        """
+        terms = sorted(set(tokenize(query)))
+        with self._lock:
+            if not terms or not self._ids:
+                return []
+            postings = [self._postings.get(term) for term in terms]
+            if any(p is None for p in postings):
+                return []
+            postings.sort(key=lambda p: len(p[0]))
+            document_count = len(self._ids)
+            average_length = self._total_length / document_count
+
+            # Intersect the posting lists, rarest first, keeping each term's
+            # counts aligned with the surviving document ids. Arrays are
+            # copied out of the postings: a numpy view of an ``array`` that
+            # outlives the lock would make add_many fail to append to it.
+            ids = np.array(postings[0][0], dtype=np.uint32)
+            counts = [np.array(postings[0][1], dtype=np.uint16)]
+            for term_ids, term_counts in postings[1:]:
+                ids, kept, matched = np.intersect1d(
+                    ids, np.array(term_ids, dtype=np.uint32),
+                    assume_unique=True, return_indices=True)
+                counts = [c[kept] for c in counts]
+                counts.append(np.array(term_counts, dtype=np.uint16)[matched])
+            if self._removed:
+                alive = ~np.isin(ids, np.fromiter(self._removed, dtype=np.uint32))
+                ids, counts = ids[alive], [c[alive] for c in counts]
+            if not len(ids):
+                return []
+
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32)[ids]  # a copy
+            norm = K1 * (1 - B + B * lengths / average_length)
+            scores = np.zeros(len(ids))
+            for (term_ids, _), term_counts in zip(postings, counts):
+                idf = math.log(1 + (document_count - len(term_ids) + 0.5) / (len(term_ids) + 0.5))
+                scores += idf * term_counts * (K1 + 1) / (term_counts + norm)
+
+            # Highest scores first; ties in the order summaries were added,
+            # so that pages are stable
+            wanted = skip + limit
+            if wanted < len(scores):
+                threshold = np.partition(scores, len(scores) - wanted)[len(scores) - wanted]
+                candidates = np.flatnonzero(scores >= threshold)
+            else:
+                candidates = np.arange(len(scores))
+            order = candidates[np.lexsort((ids[candidates], -scores[candidates]))]
+
+            hits = []
+            for position in order[skip:wanted]:
+                video_id, frame_number, timestamp, seconds, description = \
+                    self._documents[ids[position]]
+                hits.append({
+                    "video_id": video_id,
+                    "frame_number": frame_number,
+                    "timestamp": timestamp,
+                    "timestamp_seconds": seconds,
+                    "description": description,
+                    "rank": float(scores[position]),
+                })
+            return hits
+
+    def stats(self) -> Dict[str, int]:
+        return {"documents": len(self._ids), "terms": len(self._postings),
+                "postings": sum(len(ids) for ids, _ in self._postings.values())}
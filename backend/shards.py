@@ -0,0 +1,101 @@
+"""Splitting long videos into time ranges and merging the per-range results.
+
+Only the standard library is imported so this module can also be used by
+the Modal worker.
+"""
+import math
+import queue
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# (start, end) in seconds; end is None for the range that runs to the end
+TimeRange = Tuple[float, Optional[float]]
+
+
+def plan_shards(duration: float, shard_seconds: float, max_shards: int) -> List[TimeRange]:
+    """
+    Split ``[0, duration)`` into equal time ranges for parallel processing.
+
+    One range is used per ``shard_seconds`` of video, but never more than
+    ``max_shards`` (the ranges just get longer). Videos with an unknown
+    (zero) duration are not split.
+
+    Args:
+        duration: Video duration in seconds
+        shard_seconds: Target length of each range
+        max_shards: Largest number of ranges to return
+
+    Returns:
+        Consecutive ``(start, end)`` ranges covering the whole video
+    """
+    count = 1
+    if duration > 0 and shard_seconds > 0:
+        count = max(1, min(max_shards, math.ceil(duration / shard_seconds)))
+    length = duration / count
+    return [(i * length, (i + 1) * length if i < count - 1 else None) for i in range(count)]
+
+
+def merge_shard_streams(streams: List[Iterator[List[Dict]]]) -> Iterator[List[Dict]]:
+    """
+    Merge per-range streams of summaries into one stream in timestamp order.
+
+    Each stream yields batches of summaries for one range. The ranges do
+    not overlap and each numbers its frames from 0, so ``frame_number`` and
+    ``reused_from`` are offset to be consistent across the video.
+
+    All streams are consumed at once on background threads, but batches
+    are yielded in range order: those of the first range as they arrive,
+    those of later ranges once every earlier range has finished (buffered
+    until then). Errors raised by a stream are re-raised here.
+    """
+    if len(streams) == 1:
+        yield from streams[0]
+        return
+
+    stop = threading.Event()
+    queues = [queue.Queue() for _ in streams]
+
+    def consume(stream: Iterator[List[Dict]], out: "queue.Queue"):
+        try:
+            for batch in stream:
+                if stop.is_set():
+                    break
+                out.put(("batch", batch))
+            out.put(("done", None))
+        except Exception as e:
+            out.put(("error", e))
+        finally:
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+
+    threads = [threading.Thread(target=consume, args=(stream, out),
+                                name=f"shard-{i}", daemon=True)
+               for i, (stream, out) in enumerate(zip(streams, queues))]
+    for thread in threads:
+        thread.start()
+
+    offset = 0
+    try:
+        for out in queues:
+            while True:
+                kind, payload = out.get()
+                if kind == "error":
+                    raise payload
+                if kind == "done":
+                    break
+                yield _renumber(payload, offset)
+                offset += len(payload)
+    finally:
+        stop.set()
+
+
+def _renumber(summaries: List[Dict], offset: int) -> List[Dict]:
+    """Copy summaries with ``frame_number`` and ``reused_from`` shifted by ``offset``."""
+    renumbered = []
+    for summary in summaries:
+        summary = dict(summary, frame_number=summary["frame_number"] + offset)
+        if summary.get("reused_from") is not None:
+            summary["reused_from"] += offset
+        renumbered.append(summary)
+    return renumbered
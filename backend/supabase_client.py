@@ -1,29 +1,206 @@
-"""Supabase client for database operations."""
-from supabase import create_client, Client
-from typing import List, Optional, Dict, Any
-from uuid import UUID
+"""Async Supabase (PostgREST) client for database operations."""
+import asyncio
+import base64
+import json
 import logging
+import secrets
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Dict, Any, Sequence, Tuple
+from uuid import UUID
+
+import httpx
+from starlette.concurrency import run_in_threadpool
 
+from cache import ByteLRUCache, TTLCache
 from config import settings
+from search_index import SearchIndex
 
 logger = logging.getLogger(__name__)
 
-# Global Supabase client
-_supabase: Optional[Client] = None
+# Shared HTTP client, bound to the event loop it was created on
+_http_client: Optional[httpx.AsyncClient] = None
+_http_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+class DatabaseError(Exception):
+    """Raised when a PostgREST request fails."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Get or create the pooled PostgREST HTTP client (singleton per event loop).
+
+    Connections are kept alive and shared by every query, so a call only
+    pays for a round trip, not for a new TCP/TLS handshake.
+    """
+    global _http_client, _http_loop
+
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            base_url=f"{settings.SUPABASE_URL.rstrip('/')}/rest/v1",
+            headers={
+                "apikey": settings.SUPABASE_KEY,
+                "Authorization": f"Bearer {settings.SUPABASE_KEY}",
+            },
+            timeout=settings.DB_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.DB_POOL_SIZE,
+                max_keepalive_connections=settings.DB_POOL_SIZE,
+            ),
+        )
+        _http_loop = loop
+        logger.info("Supabase HTTP client initialized")
+
+    return _http_client
+
+
+async def close_http_client():
+    """Close the pooled HTTP client."""
+    global _http_client, _http_loop
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+        _http_loop = None
+
+
+async def _request(
+    method: str,
+    table: str,
+    params: Optional[Dict[str, Any]] = None,
+    json: Any = None,
+    prefer: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+) -> httpx.Response:
+    """Send a request to a PostgREST table endpoint, raising on errors."""
+    request_headers = dict(headers or {})
+    if prefer:
+        request_headers["Prefer"] = prefer
 
+    response = await get_http_client().request(
+        method, f"/{table}", params=params, json=json, headers=request_headers)
+    if response.status_code >= 400:
+        raise DatabaseError(
+            f"{method} {table} failed: HTTP {response.status_code}: {response.text}",
+            status_code=response.status_code)
+    return response
 
-def get_supabase_client() -> Client:
-    """Get or create Supabase client (singleton pattern)."""
-    global _supabase
 
-    if _supabase is None:
-        _supabase = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-        logger.info("Supabase client initialized")
+def _parse_count(response: httpx.Response) -> int:
+    """Read the total from a Content-Range header such as ``0-9/42``."""
+    content_range = response.headers.get("content-range", "")
+    total = content_range.rsplit("/", 1)[-1]
+    return int(total) if total.isdigit() else 0
 
-    return _supabase
 
+async def _count(table: str, params: Dict[str, Any]) -> int:
+    """Count rows matching ``params`` without transferring them."""
+    response = await _request(
+        "HEAD", table, params={**params, "select": "id"}, prefer="count=exact")
+    return _parse_count(response)
 
-def create_video(video_data: Dict[str, Any]) -> Dict[str, Any]:
+
+# Summary order, and the key of keyset pagination over it (see
+# idx_video_summaries_video_timestamp); frame_number breaks timestamp ties
+SUMMARY_KEYSET = ("timestamp_seconds", "frame_number")
+SUMMARY_ORDER = ",".join(f"{column}.asc" for column in SUMMARY_KEYSET)
+# Summaries fetched per request when reading a whole video
+SUMMARY_PAGE_SIZE = 1000
+# Summary columns returned to clients (leaves out the description_tsv
+# search column)
+SUMMARY_COLUMNS = "id,video_id,timestamp,timestamp_seconds,description,frame_number,created_at"
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the keyset values of a page's last row as an opaque cursor."""
+    return base64.urlsafe_b64encode(
+        json.dumps(list(values), default=str).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> List[Any]:
+    """
+    Decode a cursor made by ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed or has the wrong number of values
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    if not isinstance(values, list) or len(values) != length:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
+
+
+def _keyset_filter(columns: Sequence[str], values: Sequence[Any], descending: bool = False) -> str:
+    """
+    PostgREST ``or`` filter selecting rows after ``values`` in the order
+    given by ``columns``, e.g. ``(a.gt."1",and(a.eq."1",b.gt."2"))``.
+
+    With an index on the columns this is an index range scan, so every page
+    costs the same however deep it is, unlike ``offset``.
+    """
+    op = "lt" if descending else "gt"
+    terms = []
+    for i, column in enumerate(columns):
+        equal = [f'{c}.eq."{v}"' for c, v in zip(columns[:i], values[:i])]
+        term = f'{column}.{op}."{values[i]}"'
+        terms.append(f"and({','.join(equal + [term])})" if equal else term)
+    return f"({','.join(terms)})"
+
+
+# Video list order, and the key of keyset pagination over it (see
+# idx_videos_created_at_id)
+VIDEO_KEYSET = ("created_at", "id")
+VIDEO_ORDER = ",".join(f"{column}.desc" for column in VIDEO_KEYSET)
+
+
+class CountCache:
+    """
+    Row count of a table, cached for ``ttl`` seconds.
+
+    An exact count scans the whole table, so it is only run when the cached
+    value has expired. Inserts and deletes made through this client adjust
+    the cached value in place; changes made elsewhere show up after at most
+    ``ttl`` seconds.
+    """
+
+    def __init__(self, table: str, ttl: float):
+        self.table = table
+        self.ttl = ttl
+        self._value: Optional[int] = None
+        self._expires_at = 0.0
+
+    async def get(self) -> int:
+        if self._value is None or time.monotonic() >= self._expires_at:
+            value = await _count(self.table, {})
+            self._value, self._expires_at = value, time.monotonic() + self.ttl
+        return self._value
+
+    def adjust(self, delta: int):
+        """Account for rows inserted (positive) or deleted (negative)."""
+        if self._value is not None:
+            self._value = max(0, self._value + delta)
+
+    def invalidate(self):
+        self._value = None
+
+
+video_count = CountCache("videos", settings.VIDEO_COUNT_TTL)
+
+# Serialized GET /videos/{id} responses of completed videos, keyed by video
+# id string. Filled by the API; update_video evicts the row it touches.
+video_responses = ByteLRUCache(settings.VIDEO_RESPONSE_CACHE_BYTES)
+
+
+async def create_video(video_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Create a new video record in the database.
 
@@ -33,13 +210,14 @@ def create_video(video_data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Created video record
     """
-    client = get_supabase_client()
-
     try:
-        response = client.table("videos").insert(video_data).execute()
-        if response.data:
-            logger.info("Created video record: %s", response.data[0].get('id'))
-            return response.data[0]
+        response = await _request(
+            "POST", "videos", json=video_data, prefer="return=representation")
+        data = response.json()
+        if data:
+            logger.info("Created video record: %s", data[0].get('id'))
+            video_count.adjust(len(data))
+            return data[0]
         else:
             raise ValueError("No data returned from insert")
     except Exception as e:
@@ -47,7 +225,7 @@ def create_video(video_data: Dict[str, Any]) -> Dict[str, Any]:
         raise
 
 
-def get_video(video_id: UUID) -> Optional[Dict[str, Any]]:
+async def get_video(video_id: UUID) -> Optional[Dict[str, Any]]:
     """
     Get a video by ID.
 
@@ -57,20 +235,19 @@ def get_video(video_id: UUID) -> Optional[Dict[str, Any]]:
     Returns:
         Video record or None if not found
     """
-    client = get_supabase_client()
-
     try:
-        response = client.table("videos").select(
-            "*").eq("id", str(video_id)).execute()
-        if response.data:
-            return response.data[0]
+        response = await _request(
+            "GET", "videos", params={"select": "*", "id": f"eq.{video_id}"})
+        data = response.json()
+        if data:
+            return data[0]
         return None
     except Exception as e:
         logger.error(f"Error getting video {video_id}: {e}")
         raise
 
 
-def update_video(video_id: UUID, updates: Dict[str, Any]) -> Dict[str, Any]:
+async def update_video(video_id: UUID, updates: Dict[str, Any]) -> Dict[str, Any]:
     """
     Update a video record.
 
@@ -81,83 +258,219 @@ def update_video(video_id: UUID, updates: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Updated video record
     """
-    client = get_supabase_client()
-
     try:
         # Add updated_at timestamp
         updates["updated_at"] = "now()"
 
-        response = client.table("videos").update(
-            updates).eq("id", str(video_id)).execute()
-        if response.data:
+        response = await _request(
+            "PATCH", "videos",
+            params={"id": f"eq.{video_id}"},
+            json=updates,
+            prefer="return=representation",
+        )
+        data = response.json()
+        if data:
             logger.info("Updated video record: %s", video_id)
-            return response.data[0]
+            return data[0]
         else:
             raise ValueError("No data returned from update")
     except Exception as e:
         logger.error(f"Error updating video {video_id}: {e}")
         raise
+    finally:
+        video_responses.pop(str(video_id))
 
 
-def list_videos(skip: int = 0, limit: int = 10) -> tuple[List[Dict[str, Any]], int]:
+async def list_videos(
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], int, Optional[str]]:
     """
-    List videos with pagination.
+    List videos, newest first, with pagination.
+
+    With a ``cursor`` the page continues after the last video of the
+    previous one (keyset pagination on ``(created_at, id)``), which costs
+    the same at any depth; ``skip`` is an offset and gets slower the deeper
+    it goes. The total comes from ``video_count`` and is fetched
+    concurrently with the page when it has expired.
 
     Args:
-        skip: Number of records to skip
+        skip: Number of records to skip (ignored with a cursor)
         limit: Maximum number of records to return
+        cursor: ``next_cursor`` of the previous page
 
     Returns:
-        Tuple of (list of videos, total count)
-    """
-    client = get_supabase_client()
+        Tuple of (list of videos, total count, next cursor or None on the
+        last page)
 
+    Raises:
+        ValueError: If ``cursor`` is invalid
+    """
+    params = {"select": "*", "order": VIDEO_ORDER, "limit": limit}
+    if cursor:
+        params["or"] = _keyset_filter(
+            VIDEO_KEYSET, decode_cursor(cursor, len(VIDEO_KEYSET)), descending=True)
+    elif skip:
+        params["offset"] = skip
     try:
-        # Get total count
-        count_response = client.table("videos").select(
-            "id", count="exact").execute()
-        total = count_response.count if count_response.count is not None else 0
-
-        # Get paginated results
-        response = (
-            client.table("videos")
-            .select("*")
-            .order("created_at", desc=True)
-            .range(skip, skip + limit - 1)
-            .execute()
+        total, response = await asyncio.gather(
+            video_count.get(),
+            _request("GET", "videos", params=params),
         )
 
-        return response.data, total
+        videos = response.json()
+        next_cursor = None
+        if len(videos) == limit:
+            next_cursor = encode_cursor([videos[-1][column] for column in VIDEO_KEYSET])
+        return videos, total, next_cursor
     except Exception as e:
         logger.error(f"Error listing videos: {e}")
         raise
 
 
-def create_video_summaries(summaries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+# Unique key of video_summaries; re-sending a summary overwrites it, so
+# retried inserts are idempotent
+SUMMARY_CONFLICT_KEY = "video_id,frame_number"
+# HTTP statuses worth retrying (timeouts, rate limits, server errors)
+_RETRYABLE_STATUS = {408, 429}
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.TransportError):
+        return True
+    status = getattr(error, "status_code", None)
+    return status is not None and (status >= 500 or status in _RETRYABLE_STATUS)
+
+
+async def _upsert_summaries(chunk: List[Dict[str, Any]]):
+    """Upsert one chunk of summaries, retrying transient failures."""
+    for attempt in range(settings.DB_RETRIES + 1):
+        try:
+            await _request(
+                "POST", "video_summaries", params={"on_conflict": SUMMARY_CONFLICT_KEY},
+                json=chunk, prefer="resolution=merge-duplicates,return=minimal")
+            return
+        except Exception as e:
+            if attempt == settings.DB_RETRIES or not _is_retryable(e):
+                raise
+            delay = 0.5 * 2 ** attempt
+            logger.warning("Inserting %d summaries failed (%s); retrying in %.1fs",
+                           len(chunk), e, delay)
+            await asyncio.sleep(delay)
+
+
+async def create_video_summaries(summaries: List[Dict[str, Any]]) -> int:
     """
     Create multiple video summary records.
 
+    Rows are sent in chunks of ``SUMMARY_INSERT_CHUNK_SIZE``, at most
+    ``SUMMARY_INSERT_CONCURRENCY`` at a time, without asking for them back.
+    Chunks that fail transiently are retried; rows are upserted on
+    (video_id, frame_number), so a retry never duplicates a summary.
+
     Args:
         summaries: List of summary dictionaries with video_id, timestamp, description, etc.
 
     Returns:
-        List of created summary records
+        Number of summaries written
     """
-    client = get_supabase_client()
+    if not summaries:
+        return 0
+    chunk_size = max(1, settings.SUMMARY_INSERT_CHUNK_SIZE)
+    chunks = [summaries[i:i + chunk_size] for i in range(0, len(summaries), chunk_size)]
+    semaphore = asyncio.Semaphore(max(1, settings.SUMMARY_INSERT_CONCURRENCY))
 
+    async def insert(chunk: List[Dict[str, Any]]):
+        async with semaphore:
+            await _upsert_summaries(chunk)
+
+    started = time.perf_counter()
     try:
-        response = client.table("video_summaries").insert(summaries).execute()
-        if response.data:
-            logger.info("Created %d video summary records", len(response.data))
-            return response.data
-        else:
-            raise ValueError("No data returned from insert")
+        await asyncio.gather(*(insert(chunk) for chunk in chunks))
     except Exception as e:
         logger.error(f"Error creating video summaries: {e}")
         raise
+    elapsed = time.perf_counter() - started
+    if summary_index is not None:
+        summary_index.add_many(summaries)
+    logger.info("Created %d video summary records in %d chunks (%.0f rows/s)",
+                len(summaries), len(chunks), len(summaries) / max(elapsed, 1e-6))
+    return len(summaries)
+
+
+# In-process search index used by search_summaries instead of Postgres
+# when SEARCH_BACKEND=memory; built by load_summary_index
+summary_index: Optional[SearchIndex] = None
+# Summary columns used for search hits
+SEARCH_COLUMNS = "video_id,frame_number,timestamp,timestamp_seconds,description"
+SEARCH_KEYSET = ("video_id", "frame_number")
+
+
+async def load_summary_index() -> SearchIndex:
+    """
+    Build the in-process search index from all stored summaries.
+
+    Summaries written by this process afterwards are added as they are
+    created.
+
+    Returns:
+        The index, also stored in ``summary_index``
+    """
+    global summary_index
+    index = SearchIndex()
+    after = None
+    started = time.perf_counter()
+    while True:
+        params = {
+            "select": SEARCH_COLUMNS,
+            "order": ",".join(f"{column}.asc" for column in SEARCH_KEYSET),
+            "limit": SUMMARY_PAGE_SIZE,
+        }
+        if after is not None:
+            params["or"] = _keyset_filter(SEARCH_KEYSET, after)
+        response = await _request("GET", "video_summaries", params=params)
+        rows = response.json()
+        index.add_many(rows)
+        if len(rows) < SUMMARY_PAGE_SIZE:
+            break
+        after = [rows[-1][column] for column in SEARCH_KEYSET]
+    summary_index = index
+    logger.info("Indexed %d summaries for search in %.1fs",
+                len(index), time.perf_counter() - started)
+    return index
+
+
+async def search_summaries(query: str, skip: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Full-text search over summary descriptions.
+
+    Uses the ``search_video_summaries`` database function (a GIN-indexed
+    tsvector), or ``summary_index`` when it has been loaded. The in-process
+    index is searched on a worker thread, as large queries take a while.
+
+    Args:
+        query: Search text; words are matched in stemmed form
+        skip: Number of hits to skip
+        limit: Maximum number of hits to return
+
+    Returns:
+        Hits ordered by descending rank, each with video_id, frame_number,
+        timestamp, timestamp_seconds, description and rank
+    """
+    if summary_index is not None:
+        return await run_in_threadpool(summary_index.search, query, skip=skip, limit=limit)
+    try:
+        response = await _request(
+            "POST", "rpc/search_video_summaries",
+            json={"query": query, "result_offset": skip, "result_limit": limit})
+        return response.json()
+    except Exception as e:
+        logger.error(f"Error searching summaries for {query!r}: {e}")
+        raise
 
 
-def get_video_summaries(
+async def get_video_summaries(
     video_id: UUID,
     skip: int = 0,
     limit: int = 100
@@ -165,6 +478,8 @@ def get_video_summaries(
     """
     Get summaries for a video with pagination.
 
+    The total count and the page are fetched concurrently.
+
     Args:
         video_id: UUID of the video
         skip: Number of records to skip
@@ -173,52 +488,251 @@ def get_video_summaries(
     Returns:
         Tuple of (list of summaries, total count)
     """
-    client = get_supabase_client()
-
     try:
-        # Get total count
-        count_response = (
-            client.table("video_summaries")
-            .select("id", count="exact")
-            .eq("video_id", str(video_id))
-            .execute()
-        )
-        total = count_response.count if count_response.count is not None else 0
-
-        # Get paginated results
-        response = (
-            client.table("video_summaries")
-            .select("*")
-            .eq("video_id", str(video_id))
-            .order("timestamp_seconds", desc=False)
-            .range(skip, skip + limit - 1)
-            .execute()
+        video_filter = {"video_id": f"eq.{video_id}"}
+        total, response = await asyncio.gather(
+            _count("video_summaries", video_filter),
+            _request("GET", "video_summaries", params={
+                **video_filter,
+                "select": SUMMARY_COLUMNS,
+                "order": SUMMARY_ORDER,
+                "offset": skip,
+                "limit": limit,
+            }),
         )
 
-        return response.data, total
+        return response.json(), total
+    except Exception as e:
+        logger.error(f"Error getting video summaries for {video_id}: {e}")
+        raise
+
+
+async def get_video_summaries_after(
+    video_id: UUID,
+    after_frame_number: int = -1,
+    limit: int = 1000
+) -> List[Dict[str, Any]]:
+    """
+    Get the summaries of a video that follow a given frame, in frame order.
+
+    Args:
+        video_id: UUID of the video
+        after_frame_number: Only return frames numbered above this
+        limit: Maximum number of records to return
+
+    Returns:
+        List of summaries ordered by frame_number
+    """
+    try:
+        response = await _request("GET", "video_summaries", params={
+            "video_id": f"eq.{video_id}",
+            "frame_number": f"gt.{after_frame_number}",
+            "select": SUMMARY_COLUMNS,
+            "order": "frame_number.asc",
+            "limit": limit,
+        })
+        return response.json()
     except Exception as e:
         logger.error(f"Error getting video summaries for {video_id}: {e}")
         raise
 
 
-def get_video_with_summaries(video_id: UUID) -> Optional[Dict[str, Any]]:
+async def get_video_summaries_page(
+    video_id: UUID,
+    cursor: Optional[str] = None,
+    limit: int = 100
+) -> Optional[Tuple[List[Dict[str, Any]], int, Optional[str]]]:
+    """
+    Get one page of a video's summaries with keyset pagination.
+
+    The page comes from a query embedded in the video row, which also tells
+    whether the video exists. The video's summaries are counted
+    concurrently; ``total_frames`` is not used, as it lags behind the
+    stored summaries while a video is processed.
+
+    Args:
+        video_id: UUID of the video
+        cursor: ``next_cursor`` of the previous page; None for the first page
+        limit: Maximum number of records to return
+
+    Returns:
+        Tuple of (list of summaries, total count, next cursor or None on the
+        last page), or None if the video does not exist
+
+    Raises:
+        ValueError: If ``cursor`` is invalid
+    """
+    params = {
+        "select": f"id,video_summaries({SUMMARY_COLUMNS})",
+        "id": f"eq.{video_id}",
+        "video_summaries.order": SUMMARY_ORDER,
+        "video_summaries.limit": limit,
+    }
+    if cursor:
+        params["video_summaries.or"] = _keyset_filter(
+            SUMMARY_KEYSET, decode_cursor(cursor, len(SUMMARY_KEYSET)))
+    try:
+        total, response = await asyncio.gather(
+            _count("video_summaries", {"video_id": f"eq.{video_id}"}),
+            _request("GET", "videos", params=params),
+        )
+        data = response.json()
+    except Exception as e:
+        logger.error(f"Error getting video summaries for {video_id}: {e}")
+        raise
+    if not data:
+        return None
+
+    summaries = data[0]["video_summaries"]
+    next_cursor = None
+    if len(summaries) == limit:
+        next_cursor = summary_cursor(summaries[-1])
+    return summaries, total, next_cursor
+
+
+def _summary_key(summary: Dict[str, Any]) -> List[Any]:
+    return [summary[column] for column in SUMMARY_KEYSET]
+
+
+def summary_cursor(summary: Dict[str, Any]) -> str:
+    """Cursor for the page of summaries that follows ``summary``."""
+    return encode_cursor(_summary_key(summary))
+
+
+async def _get_summaries_after(
+    video_id: UUID,
+    after: Optional[Sequence[Any]] = None,
+    limit: int = SUMMARY_PAGE_SIZE
+) -> List[Dict[str, Any]]:
+    """Get the summaries that follow the keyset values ``after`` (or the first ones), in order."""
+    params = {
+        "video_id": f"eq.{video_id}",
+        "select": SUMMARY_COLUMNS,
+        "order": SUMMARY_ORDER,
+        "limit": limit,
+    }
+    if after is not None:
+        params["or"] = _keyset_filter(SUMMARY_KEYSET, after)
+    response = await _request("GET", "video_summaries", params=params)
+    return response.json()
+
+
+async def get_video_with_summaries(video_id: UUID) -> Optional[Dict[str, Any]]:
     """
     Get a video with all its summaries.
 
+    The video and its first ``SUMMARY_PAGE_SIZE`` summaries come from one
+    embedded-resource query, which covers almost every video in a single
+    round trip. Longer videos are completed page by page with keyset
+    pagination, so no summaries are dropped.
+
     Args:
         video_id: UUID of the video
 
     Returns:
         Video record with summaries list, or None if not found
     """
-    video = get_video(video_id)
-    if not video:
+    try:
+        response = await _request("GET", "videos", params={
+            "select": f"*,video_summaries({SUMMARY_COLUMNS})",
+            "id": f"eq.{video_id}",
+            "video_summaries.order": SUMMARY_ORDER,
+            "video_summaries.limit": SUMMARY_PAGE_SIZE,
+        })
+        data = response.json()
+        if not data:
+            return None
+
+        video = data[0]
+        summaries = video.pop("video_summaries")
+        page = summaries
+        while len(page) == SUMMARY_PAGE_SIZE:
+            page = await _get_summaries_after(video_id, _summary_key(page[-1]))
+            summaries.extend(page)
+        video["summaries"] = summaries
+        return video
+    except Exception as e:
+        logger.error(f"Error getting video {video_id}: {e}")
+        raise
+
+
+async def find_completed_video_by_hash(
+    content_hash: str,
+    frame_interval: int,
+    sampling: str = "interval",
+    exclude_id: Optional[UUID] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Find a completed video with the same content hash and sampling settings.
+
+    Args:
+        content_hash: SHA-256 hex digest of the video bytes
+        frame_interval: Seconds between extracted frames
+        sampling: Frame sampling mode ("interval" or "scene")
+        exclude_id: Optional video ID to ignore (usually the caller's own record)
+
+    Returns:
+        Most recent matching video record, or None if there is none
+    """
+    try:
+        params = {
+            "select": "*",
+            "content_hash": f"eq.{content_hash}",
+            "frame_interval": f"eq.{frame_interval}",
+            "sampling": f"eq.{sampling}",
+            "status": "eq.completed",
+            "order": "created_at.desc",
+            "limit": 1,
+        }
+        if exclude_id is not None:
+            params["id"] = f"neq.{exclude_id}"
+        response = await _request("GET", "videos", params=params)
+        data = response.json()
+        if data:
+            return data[0]
         return None
+    except Exception as e:
+        logger.error(f"Error finding video by hash {content_hash}: {e}")
+        raise
 
-    summaries, _ = get_video_summaries(video_id, skip=0, limit=1000)
-    video["summaries"] = summaries
 
-    return video
+async def clone_video_summaries(source_video_id: UUID, target_video_id: UUID) -> int:
+    """
+    Copy all summaries of one video onto another video.
+
+    Args:
+        source_video_id: UUID of the video to copy summaries from
+        target_video_id: UUID of the video to copy summaries to
+
+    Returns:
+        Number of summaries copied
+    """
+    copied = 0
+    after = None
+
+    while True:
+        summaries = await _get_summaries_after(source_video_id, after)
+        if not summaries:
+            break
+
+        await create_video_summaries([
+            {
+                "video_id": str(target_video_id),
+                "timestamp": summary["timestamp"],
+                "timestamp_seconds": summary["timestamp_seconds"],
+                "description": summary["description"],
+                "frame_number": summary["frame_number"],
+            }
+            for summary in summaries
+        ])
+        copied += len(summaries)
+        if len(summaries) < SUMMARY_PAGE_SIZE:
+            break
+        after = _summary_key(summaries[-1])
+
+    logger.info("Cloned %d summaries from video %s to %s",
+                copied, source_video_id, target_video_id)
+    return copied
 
 
 def aggregate_key_topics(summaries: List[Dict[str, Any]]) -> str:
@@ -247,17 +761,13 @@ def aggregate_key_topics(summaries: List[Dict[str, Any]]) -> str:
     return combined
 
 
-def create_api_key() -> Dict[str, Any]:
+async def create_api_key() -> Dict[str, Any]:
     """
     Create a new API key in the database.
 
     Returns:
         Created API key record with the generated key
     """
-    import secrets
-
-    client = get_supabase_client()
-
     try:
         # Generate a secure random API key
         api_key = f"frame_{secrets.token_urlsafe(32)}"
@@ -266,10 +776,12 @@ def create_api_key() -> Dict[str, Any]:
             "api_key": api_key
         }
 
-        response = client.table("api_keys").insert(api_key_data).execute()
-        if response.data:
-            logger.info("Created API key: %s", response.data[0].get('id'))
-            return response.data[0]
+        response = await _request(
+            "POST", "api_keys", json=api_key_data, prefer="return=representation")
+        data = response.json()
+        if data:
+            logger.info("Created API key: %s", data[0].get('id'))
+            return data[0]
         else:
             raise ValueError("No data returned from insert")
     except Exception as e:
@@ -277,63 +789,115 @@ def create_api_key() -> Dict[str, Any]:
         raise
 
 
-def validate_api_key(api_key: str) -> bool:
+# Validated API keys, cached until the earlier of API_KEY_CACHE_TTL and the
+# key's expiry. Unknown and expired keys are cached separately, for
+# API_KEY_NEGATIVE_TTL, so a flood of bad keys cannot evict good ones.
+valid_api_keys = TTLCache(settings.API_KEY_CACHE_SIZE, settings.API_KEY_CACHE_TTL)
+invalid_api_keys = TTLCache(settings.API_KEY_CACHE_SIZE, settings.API_KEY_NEGATIVE_TTL)
+
+
+def _parse_expires_at(expires_at_str: str) -> datetime:
+    """Parse an ``expires_at`` value; naive values are taken as UTC."""
+    # Handle ISO format with or without timezone
+    expires_at = datetime.fromisoformat(expires_at_str.replace("Z", "+00:00"))
+    if expires_at.tzinfo is None:
+        expires_at = expires_at.replace(tzinfo=timezone.utc)
+    return expires_at
+
+
+async def validate_api_key(api_key: str) -> bool:
     """
     Validate an API key exists and is not expired.
 
+    Results are cached in memory (see ``valid_api_keys`` and
+    ``invalid_api_keys``), so repeated requests with the same key do not
+    reach the database. Lookups that fail are not cached.
+
     Args:
         api_key: The API key to validate
 
     Returns:
         True if valid, False otherwise
     """
-    client = get_supabase_client()
+    if valid_api_keys.get(api_key):
+        return True
+    if invalid_api_keys.get(api_key):
+        return False
 
     try:
-        from datetime import datetime, timezone
+        key_record = await _fetch_api_key(api_key)
+    except Exception as e:
+        logger.error(f"Error validating API key: {e}")
+        return False
+    if not key_record:
+        invalid_api_keys.set(api_key, True)
+        return False
 
-        response = (
-            client.table("api_keys")
-            .select("*")
-            .eq("api_key", api_key)
-            .execute()
-        )
+    ttl = settings.API_KEY_CACHE_TTL
+    # Check if expired
+    if key_record.get("expires_at"):
+        try:
+            remaining = (_parse_expires_at(key_record["expires_at"])
+                         - datetime.now(timezone.utc)).total_seconds()
+            if remaining <= 0:
+                invalid_api_keys.set(api_key, True)
+                return False
+            ttl = min(ttl, remaining)
+        except (ValueError, AttributeError, TypeError) as e:
+            logger.warning(f"Error parsing expires_at for API key: {e}")
+            # If we can't parse the date, assume it's valid (don't block access)
+
+    valid_api_keys.set(api_key, True, ttl)
+    return True
+
+
+def evict_api_key(api_key: str):
+    """
+    Drop an API key from this process's validation cache.
 
-        if not response.data or len(response.data) == 0:
-            return False
-
-        key_record = response.data[0]
-
-        # Check if expired
-        if key_record.get("expires_at"):
-            expires_at_str = key_record["expires_at"]
-            try:
-                # Handle ISO format with or without timezone
-                if expires_at_str.endswith("Z"):
-                    expires_at = datetime.fromisoformat(
-                        expires_at_str.replace("Z", "+00:00"))
-                else:
-                    expires_at = datetime.fromisoformat(expires_at_str)
-
-                # Get current time in same timezone as expires_at
-                if expires_at.tzinfo:
-                    now = datetime.now(timezone.utc)
-                else:
-                    now = datetime.now()
-
-                if now > expires_at:
-                    return False
-            except (ValueError, AttributeError) as e:
-                logger.warning(f"Error parsing expires_at for API key: {e}")
-                # If we can't parse the date, assume it's valid (don't block access)
+    Call this when a key is revoked or its expiry is changed so the change
+    applies immediately. Other processes pick it up after at most
+    ``API_KEY_CACHE_TTL`` seconds.
+    """
+    valid_api_keys.pop(api_key)
+    invalid_api_keys.pop(api_key)
 
-        return True
+
+async def revoke_api_key(api_key: str) -> bool:
+    """
+    Expire an API key now and evict it from the validation cache.
+
+    Args:
+        api_key: The API key to revoke
+
+    Returns:
+        True if the key existed
+    """
+    try:
+        response = await _request(
+            "PATCH", "api_keys", params={"api_key": f"eq.{api_key}"},
+            json={"expires_at": datetime.now(timezone.utc).isoformat()},
+            prefer="return=representation")
+        revoked = bool(response.json())
     except Exception as e:
-        logger.error(f"Error validating API key: {e}")
-        return False
+        logger.error(f"Error revoking API key: {e}")
+        raise
+    finally:
+        evict_api_key(api_key)
+    if revoked:
+        logger.info("Revoked API key")
+    return revoked
+
 
+async def _fetch_api_key(api_key: str) -> Optional[Dict[str, Any]]:
+    """Get an API key record, raising on database errors."""
+    response = await _request(
+        "GET", "api_keys", params={"select": "*", "api_key": f"eq.{api_key}"})
+    data = response.json()
+    return data[0] if data else None
 
-def get_api_key_by_key(api_key: str) -> Optional[Dict[str, Any]]:
+
+async def get_api_key_by_key(api_key: str) -> Optional[Dict[str, Any]]:
     """
     Get an API key record by the API key string.
 
@@ -343,19 +907,8 @@ def get_api_key_by_key(api_key: str) -> Optional[Dict[str, Any]]:
     Returns:
         API key record or None if not found
     """
-    client = get_supabase_client()
-
     try:
-        response = (
-            client.table("api_keys")
-            .select("*")
-            .eq("api_key", api_key)
-            .execute()
-        )
-
-        if response.data and len(response.data) > 0:
-            return response.data[0]
-        return None
+        return await _fetch_api_key(api_key)
     except Exception as e:
         logger.error(f"Error getting API key: {e}")
         return None
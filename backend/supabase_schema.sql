@@ -10,11 +10,23 @@ CREATE TABLE IF NOT EXISTS videos (
     status TEXT NOT NULL DEFAULT 'processing',
     key_topics TEXT,
     frame_interval INTEGER NOT NULL DEFAULT 2,
+    sampling TEXT NOT NULL DEFAULT 'interval',
     total_frames INTEGER NOT NULL DEFAULT 0,
+    progress REAL NOT NULL DEFAULT 0,
+    content_hash TEXT,
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
     updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
+-- Add content hash to existing videos tables
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- Add frame sampling mode to existing videos tables
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS sampling TEXT NOT NULL DEFAULT 'interval';
+
+-- Add processing progress to existing videos tables
+ALTER TABLE videos ADD COLUMN IF NOT EXISTS progress REAL NOT NULL DEFAULT 0;
+
 -- Create video_summaries table
 CREATE TABLE IF NOT EXISTS video_summaries (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -28,9 +40,54 @@ CREATE TABLE IF NOT EXISTS video_summaries (
 
 -- Create indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_video_summaries_video_id ON video_summaries(video_id);
+-- One summary per frame: summary inserts upsert on (video_id, frame_number),
+-- so retried inserts do not duplicate rows. On existing databases, remove
+-- any duplicate (video_id, frame_number) rows before creating this index.
+CREATE UNIQUE INDEX IF NOT EXISTS idx_video_summaries_video_frame
+    ON video_summaries(video_id, frame_number);
+-- Summary order and keyset pagination key: (video_id, timestamp_seconds),
+-- with frame_number as tie-breaker
+CREATE INDEX IF NOT EXISTS idx_video_summaries_video_timestamp
+    ON video_summaries(video_id, timestamp_seconds, frame_number);
 CREATE INDEX IF NOT EXISTS idx_video_summaries_timestamp_seconds ON video_summaries(timestamp_seconds);
 CREATE INDEX IF NOT EXISTS idx_videos_status ON videos(status);
 CREATE INDEX IF NOT EXISTS idx_videos_created_at ON videos(created_at DESC);
+-- Video list order and keyset pagination key
+CREATE INDEX IF NOT EXISTS idx_videos_created_at_id ON videos(created_at DESC, id DESC);
+-- Lookup of reusable results (find_completed_video_by_hash)
+CREATE INDEX IF NOT EXISTS idx_videos_content_hash
+    ON videos(content_hash, frame_interval, sampling) WHERE status = 'completed';
+
+-- Full-text search over frame descriptions (GET /search)
+ALTER TABLE video_summaries ADD COLUMN IF NOT EXISTS description_tsv tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', description)) STORED;
+CREATE INDEX IF NOT EXISTS idx_video_summaries_description_tsv
+    ON video_summaries USING GIN (description_tsv);
+
+-- Ranked, paginated search hits; called through PostgREST at
+-- /rest/v1/rpc/search_video_summaries
+CREATE OR REPLACE FUNCTION search_video_summaries(
+    query TEXT,
+    result_offset INTEGER DEFAULT 0,
+    result_limit INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    video_id UUID,
+    frame_number INTEGER,
+    "timestamp" TEXT,
+    timestamp_seconds NUMERIC,
+    description TEXT,
+    rank REAL
+)
+LANGUAGE sql STABLE AS $$
+    SELECT s.video_id, s.frame_number, s.timestamp, s.timestamp_seconds, s.description,
+           ts_rank(s.description_tsv, q) AS rank
+    FROM video_summaries s, websearch_to_tsquery('english', query) q
+    WHERE s.description_tsv @@ q
+    ORDER BY rank DESC, s.video_id, s.frame_number
+    OFFSET result_offset
+    LIMIT result_limit;
+$$;
 
 -- Create function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
@@ -64,6 +121,10 @@ COMMENT ON TABLE api_keys IS 'Stores API keys for accessing video data';
 COMMENT ON COLUMN videos.video_url IS 'Original URL or file path of the video';
 COMMENT ON COLUMN videos.status IS 'Processing status: processing, completed, or failed';
 COMMENT ON COLUMN videos.frame_interval IS 'Seconds between extracted frames';
+COMMENT ON COLUMN videos.sampling IS 'Frame sampling mode: interval (every frame_interval seconds) or scene (one frame per shot)';
+COMMENT ON COLUMN videos.progress IS 'Share of the video processed so far (0-1), updated as summaries are stored';
+COMMENT ON COLUMN videos.content_hash IS 'SHA-256 of the video bytes, used to reuse results for identical videos';
 COMMENT ON COLUMN video_summaries.timestamp IS 'Human-readable timestamp (e.g., "0:02", "1:30")';
 COMMENT ON COLUMN video_summaries.timestamp_seconds IS 'Timestamp in seconds for sorting and calculations';
+COMMENT ON COLUMN video_summaries.description_tsv IS 'Search vector of description, maintained by Postgres';
 COMMENT ON COLUMN api_keys.api_key IS 'Unique API key for authentication';
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""Shared pytest setup: test configuration and fake services."""
+import os
+import tempfile
+
+# Settings are read from the environment at import time and require a
+# database URL; point everything at local, throwaway locations first
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
+os.environ.setdefault("UPLOAD_DIR", tempfile.mkdtemp(prefix="frame-test-uploads-"))
+os.environ.setdefault("FRAME_CACHE_PATH", "")
+os.environ.setdefault("INFERENCE_BACKEND", "fake")
+
+import pytest  # noqa: E402
+
+from config import settings  # noqa: E402
+from tests.fake_gcs import FakeGCS  # noqa: E402
+from tests.fake_postgrest import FakePostgREST  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def fake_gcs(monkeypatch):
+    """A running FakeGCS that gcp_uploader talks to instead of GCS."""
+    from gcp_uploader import gcs_clients
+
+    with FakeGCS() as server:
+        monkeypatch.setattr(settings, "STORAGE_EMULATOR_HOST", server.url)
+        monkeypatch.setattr(settings, "GCP_BUCKET_NAME", "test-bucket")
+        # The storage client is bound to an endpoint; build one for this server
+        monkeypatch.setattr(gcs_clients, "_storage_client", None)
+        yield server
+
+
+@pytest.fixture
+async def fake_db(monkeypatch):
+    """A running FakePostgREST that supabase_client talks to, with empty caches."""
+    import supabase_client
+
+    with FakePostgREST() as server:
+        monkeypatch.setattr(settings, "SUPABASE_URL", server.url)
+        await supabase_client.close_http_client()
+        supabase_client.video_count.invalidate()
+        supabase_client.video_responses.clear()
+        supabase_client.valid_api_keys.clear()
+        supabase_client.invalid_api_keys.clear()
+        yield server
+        await supabase_client.close_http_client()
@@ -0,0 +1,247 @@
+"""In-process stand-in for the parts of the GCS JSON API the backend uses.
+
+Supports media, multipart and resumable uploads, object metadata, downloads with
+``Range``, compose, rewrite and delete, for a single bucket. Files put in
+``sources`` are served under ``/source/<name>``, standing in for the remote
+server behind a video URL. Point STORAGE_EMULATOR_HOST at ``url``.
+"""
+import email.parser
+import email.policy
+import json
+import re
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# Non-final chunks of a resumable upload must be multiples of this
+UPLOAD_ALIGNMENT = 256 * 1024
+
+_OBJECT_PATH = re.compile(r"/storage/v1/b/[^/]+/o/([^/]+)$")
+_COMPOSE_PATH = re.compile(r"/storage/v1/b/[^/]+/o/([^/]+)/compose$")
+_REWRITE_PATH = re.compile(r"/storage/v1/b/[^/]+/o/([^/]+)/rewriteTo/b/[^/]+/o/([^/]+)$")
+_CONTENT_RANGE = re.compile(r"bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)$")
+_RANGE = re.compile(r"bytes=(\d+)-(\d*)$")
+
+
+class ResumableSession:
+    """State of one resumable upload session."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.data = bytearray()
+        self.chunks: List[int] = []  # sizes of the chunks received
+        self.cancelled = False
+        self.finalized = False
+
+
+class FakeGCS:
+    """
+    Fake GCS server on 127.0.0.1; use as a context manager.
+
+    ``objects`` holds the stored objects by name. Set ``short_persists`` to
+    make the next that many resumable chunks persist ``UPLOAD_ALIGNMENT``
+    bytes less than was sent, as GCS may, and ``source_fail_after`` to drop
+    source downloads after that many bytes.
+    """
+
+    def __init__(self):
+        self.objects: Dict[str, bytes] = {}
+        self.sessions: Dict[str, ResumableSession] = {}
+        self.sources: Dict[str, bytes] = {}
+        self.short_persists = 0
+        self.source_fail_after: Optional[int] = None
+        self.errors: List[str] = []  # protocol violations by the client
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                fake._get(self)
+
+            def do_POST(self):
+                fake._post(self)
+
+            def do_PUT(self):
+                fake._put(self)
+
+            def do_DELETE(self):
+                fake._delete(self)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "FakeGCS":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    # Helpers
+
+    @staticmethod
+    def _body(handler) -> bytes:
+        if handler.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            data = bytearray()
+            while True:
+                size = int(handler.rfile.readline().split(b";")[0], 16)
+                if size == 0:
+                    handler.rfile.readline()
+                    return bytes(data)
+                data += handler.rfile.read(size)
+                handler.rfile.readline()
+        return handler.rfile.read(int(handler.headers.get("Content-Length") or 0))
+
+    @staticmethod
+    def _send(handler, status: int, body: bytes = b"", headers: Optional[Dict[str, str]] = None):
+        handler.send_response(status)
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _send_json(self, handler, status: int, payload: dict):
+        self._send(handler, status, json.dumps(payload).encode(),
+                   {"Content-Type": "application/json"})
+
+    def _metadata(self, name: str) -> dict:
+        return {"name": name, "bucket": "test-bucket", "size": str(len(self.objects[name]))}
+
+    def _send_error(self, handler, status: int, message: str):
+        # GCS's JSON error shape, which google-cloud-storage parses
+        self._send_json(handler, status, {"error": {"code": status, "message": message}})
+
+    def _error(self, handler, message: str):
+        self.errors.append(message)
+        self._send_error(handler, 400, message)
+
+    # Handlers
+
+    def _get(self, handler):
+        url = urllib.parse.urlparse(handler.path)
+        if url.path.startswith("/source/"):
+            return self._serve_source(handler, urllib.parse.unquote(url.path[len("/source/"):]))
+        match = _OBJECT_PATH.match(url.path)
+        name = urllib.parse.unquote(match.group(1)) if match else None
+        if name not in self.objects:
+            return self._send_error(handler, 404, "Not Found")
+        if "alt=media" not in url.query:
+            return self._send_json(handler, 200, self._metadata(name))
+
+        data = self.objects[name]
+        byte_range = _RANGE.match(handler.headers.get("Range", ""))
+        if not byte_range:
+            return self._send(handler, 200, data)
+        start = int(byte_range.group(1))
+        end = min(int(byte_range.group(2)) + 1 if byte_range.group(2) else len(data), len(data))
+        self._send(handler, 206, data[start:end],
+                   {"Content-Range": f"bytes {start}-{end - 1}/{len(data)}"})
+
+    def _serve_source(self, handler, name: str):
+        data = self.sources.get(name)
+        if data is None:
+            return self._send(handler, 404)
+        handler.send_response(200)
+        handler.send_header("Content-Length", str(len(data)))
+        handler.send_header("Content-Type", "application/octet-stream")
+        handler.end_headers()
+        if self.source_fail_after is None:
+            handler.wfile.write(data)
+        else:
+            handler.wfile.write(data[:self.source_fail_after])
+            handler.close_connection = True
+
+    def _post(self, handler):
+        url = urllib.parse.urlparse(handler.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        body = self._body(handler)
+
+        if url.path.startswith("/upload/storage/v1/b/"):
+            if query.get("uploadType") == "media":
+                self.objects[query["name"]] = body
+                return self._send_json(handler, 200, self._metadata(query["name"]))
+            if query.get("uploadType") == "multipart":
+                # multipart/related: JSON metadata, then the object's bytes
+                message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+                    f"Content-Type: {handler.headers['Content-Type']}\r\n\r\n".encode() + body)
+                metadata, media = (part.get_payload(decode=True) for part in message.iter_parts())
+                name = json.loads(metadata)["name"]
+                self.objects[name] = media
+                return self._send_json(handler, 200, self._metadata(name))
+            if query.get("uploadType") == "resumable":
+                with self._lock:
+                    session_id = str(len(self.sessions))
+                    self.sessions[session_id] = ResumableSession(query["name"])
+                return self._send(handler, 200, headers={
+                    "Location": f"{self.url}/session/{session_id}"})
+
+        match = _COMPOSE_PATH.match(url.path)
+        if match:
+            sources = [item["name"] for item in json.loads(body)["sourceObjects"]]
+            if len(sources) > 32 or any(name not in self.objects for name in sources):
+                return self._error(handler, f"bad compose sources: {sources}")
+            name = urllib.parse.unquote(match.group(1))
+            self.objects[name] = b"".join(self.objects[source] for source in sources)
+            return self._send_json(handler, 200, self._metadata(name))
+
+        match = _REWRITE_PATH.match(url.path)
+        if match:
+            source, destination = (urllib.parse.unquote(g) for g in match.groups())
+            self.objects[destination] = self.objects[source]
+            return self._send_json(handler, 200, {"done": True, "resource": self._metadata(destination)})
+
+        self._send_error(handler, 404, "Not Found")
+
+    def _put(self, handler):
+        session = self.sessions.get(handler.path.rsplit("/", 1)[-1])
+        data = self._body(handler)
+        content_range = _CONTENT_RANGE.match(handler.headers.get("Content-Range", ""))
+        if session is None or session.cancelled or not content_range:
+            return self._send_error(handler, 404, "No such upload")
+
+        total = content_range.group(3)
+        if data:
+            start = int(content_range.group(1))
+            if start != len(session.data):
+                return self._error(handler, f"chunk starts at {start}, expected {len(session.data)}")
+            if total == "*" and len(data) % UPLOAD_ALIGNMENT:
+                return self._error(handler, f"unaligned chunk of {len(data)} bytes")
+        session.chunks.append(len(data))
+
+        if total != "*":
+            session.data += data
+            if len(session.data) != int(total):
+                return self._error(handler, f"final size {len(session.data)} != {total}")
+            session.finalized = True
+            self.objects[session.name] = bytes(session.data)
+            return self._send_json(handler, 200, self._metadata(session.name))
+
+        if self.short_persists and len(data) > UPLOAD_ALIGNMENT:
+            self.short_persists -= 1
+            data = data[:-UPLOAD_ALIGNMENT]
+        session.data += data
+        headers = {"Range": f"bytes=0-{len(session.data) - 1}"} if session.data else {}
+        self._send(handler, 308, headers=headers)
+
+    def _delete(self, handler):
+        url = urllib.parse.urlparse(handler.path)
+        if url.path.startswith("/session/"):
+            session = self.sessions.get(url.path.rsplit("/", 1)[-1])
+            if session is not None:
+                session.cancelled = True
+            return self._send(handler, 499)
+        match = _OBJECT_PATH.match(url.path)
+        name = urllib.parse.unquote(match.group(1)) if match else None
+        if self.objects.pop(name, None) is None:
+            return self._send_error(handler, 404, "Not Found")
+        self._send(handler, 204)
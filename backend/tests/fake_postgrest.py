@@ -0,0 +1,281 @@
+"""In-process stand-in for the parts of PostgREST the backend uses.
+
+Tables are lists of dicts in ``tables``. Supports the filters ``eq``,
+``neq``, ``gt``, ``gte``, ``lt``, ``lte``, ``in`` and nested ``or``/``and``
+groups, ``select`` with one level of embedded ``video_summaries``,
+``order``, ``limit``, ``offset``, ``Prefer: count=exact``, inserts with
+``on_conflict`` upserts, ``PATCH`` and ``DELETE``. Point SUPABASE_URL at
+``url``.
+"""
+import json
+import threading
+import urllib.parse
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+# Unique keys enforced on insert, as in supabase_schema.sql
+UNIQUE_KEYS = {
+    "video_summaries": ("video_id", "frame_number"),
+    "api_keys": ("api_key",),
+}
+# Embedded resources: table -> (parent column, child column)
+FOREIGN_KEYS = {"video_summaries": ("id", "video_id")}
+
+
+class Request(NamedTuple):
+    """A request received by the fake."""
+    method: str
+    table: str
+    params: Dict[str, str]
+    prefer: str
+    body: Any
+
+
+def split_top_level(text: str) -> List[str]:
+    """Split on commas that are outside parentheses and double quotes."""
+    parts, depth, quoted, current = [], 0, False, ""
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char in "()":
+            depth += 1 if char == "(" else -1
+        if char == "," and depth == 0 and not quoted:
+            parts.append(current)
+            current = ""
+        else:
+            current += char
+    parts.append(current)
+    return parts
+
+
+def _compare(value: Any, operator: str, operand: str) -> bool:
+    if operator == "in":
+        return str(value) in [v.strip('"') for v in split_top_level(operand.strip("()"))]
+    if operand == "null" and operator in ("eq", "is"):
+        return value is None
+    if value is None:
+        return False
+    operand = operand.strip('"')
+    if isinstance(value, bool):
+        value, operand = str(value).lower(), operand.lower()
+    elif isinstance(value, (int, float)):
+        operand = float(operand)
+    else:
+        value = str(value)
+    return {
+        "eq": value == operand, "neq": value != operand,
+        "gt": value > operand, "gte": value >= operand,
+        "lt": value < operand, "lte": value <= operand,
+    }[operator]
+
+
+def _condition(column: str, expression: str) -> Callable[[Dict[str, Any]], bool]:
+    """Predicate for a query parameter such as ``frame_number=gt.3``."""
+    if column in ("or", "and"):
+        return _group(column, expression)
+    operator, _, operand = expression.partition(".")
+    if operator == "not":
+        inner = _condition(column, operand)
+        return lambda row: not inner(row)
+    return lambda row: _compare(row.get(column), operator, operand)
+
+
+def _group(conjunction: str, expression: str) -> Callable[[Dict[str, Any]], bool]:
+    """Predicate for an ``or``/``and`` group such as ``(a.gt.1,and(a.eq.1,b.gt.2))``."""
+    predicates = []
+    for term in split_top_level(expression[1:-1]):
+        if term.startswith(("or(", "and(")):
+            name, _, rest = term.partition("(")
+            predicates.append(_group(name, "(" + rest))
+        else:
+            column, _, rest = term.partition(".")
+            predicates.append(_condition(column, rest))
+    combine = any if conjunction == "or" else all
+    return lambda row: combine(p(row) for p in predicates)
+
+
+def _ordered(rows: List[Dict[str, Any]], order: str) -> List[Dict[str, Any]]:
+    for part in reversed(order.split(",")):
+        column, _, direction = part.partition(".")
+        rows = sorted(rows, key=lambda r: (r.get(column) is None, r.get(column)),
+                      reverse=direction.startswith("desc"))
+    return rows
+
+
+class FakePostgREST:
+    """
+    Fake PostgREST server on 127.0.0.1; use as a context manager.
+
+    ``requests`` records every ``Request`` received. Statuses appended to
+    ``fail_inserts[table]`` are returned, in order, by the next inserts
+    into that table instead of running them.
+    """
+
+    def __init__(self):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {
+            "videos": [], "video_summaries": [], "api_keys": []}
+        self.requests: List[Request] = []
+        self.fail_inserts: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                fake._handle(self, fake._select)
+
+            do_HEAD = do_GET
+
+            def do_POST(self):
+                fake._handle(self, fake._insert)
+
+            def do_PATCH(self):
+                fake._handle(self, fake._update)
+
+            def do_DELETE(self):
+                fake._handle(self, fake._delete)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self) -> "FakePostgREST":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _handle(self, handler, action):
+        url = urllib.parse.urlparse(handler.path)
+        table = url.path.rsplit("/", 1)[-1]
+        params = urllib.parse.parse_qsl(url.query)
+        prefer = handler.headers.get("Prefer", "")
+        length = int(handler.headers.get("Content-Length") or 0)
+        body = json.loads(handler.rfile.read(length)) if length else None
+        self.requests.append(Request(handler.command, table, dict(params), prefer, body))
+
+        with self._lock:
+            status, payload, headers = action(table, params, prefer, body)
+        data = b"" if payload is None else json.dumps(payload, default=str).encode()
+        handler.send_response(status)
+        for key, value in headers.items():
+            handler.send_header(key, value)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        if handler.command != "HEAD":
+            handler.wfile.write(data)
+
+    @staticmethod
+    def _split_params(params) -> Tuple[List[Callable], Dict[str, str], Dict[str, List]]:
+        """Split query parameters into row filters, options and embedded ones."""
+        filters, options, embedded = [], {}, {}
+        for key, value in params:
+            if key in ("select", "order", "limit", "offset", "on_conflict", "columns"):
+                options[key] = value
+            elif "." in key:
+                resource, _, key = key.partition(".")
+                embedded.setdefault(resource, []).append((key, value))
+            else:
+                filters.append(_condition(key, value))
+        return filters, options, embedded
+
+    def _matching(self, table: str, filters) -> List[Dict[str, Any]]:
+        return [row for row in self.tables[table] if all(f(row) for f in filters)]
+
+    def _project(self, row: Dict[str, Any], select: str, embedded) -> Dict[str, Any]:
+        result = {}
+        for part in split_top_level(select):
+            if "(" in part:
+                resource, _, columns = part.partition("(")
+                parent_column, child_column = FOREIGN_KEYS[resource]
+                children = [child for child in self.tables[resource]
+                            if child[child_column] == row[parent_column]]
+                filters, options, _ = self._split_params(embedded.get(resource, []))
+                children = [child for child in children if all(f(child) for f in filters)]
+                children = _ordered(children, options["order"]) if "order" in options else children
+                if "limit" in options:
+                    children = children[:int(options["limit"])]
+                result[resource] = [self._project(child, columns[:-1], {}) for child in children]
+            elif part == "*":
+                result.update(row)
+            else:
+                result[part] = row.get(part)
+        return result
+
+    def _select(self, table, params, prefer, body):
+        filters, options, embedded = self._split_params(params)
+        rows = self._matching(table, filters)
+        total = len(rows)
+        if "order" in options:
+            rows = _ordered(rows, options["order"])
+        offset = int(options.get("offset", 0))
+        rows = rows[offset:]
+        if "limit" in options:
+            rows = rows[:int(options["limit"])]
+        rows = [self._project(row, options.get("select", "*"), embedded) for row in rows]
+        content_range = f"{offset}-{offset + len(rows) - 1}/" + (
+            str(total) if "count=exact" in prefer else "*")
+        return 200, rows, {"Content-Range": content_range}
+
+    def _insert(self, table, params, prefer, body):
+        if self.fail_inserts.get(table):
+            return self.fail_inserts[table].pop(0), {"message": "injected failure"}, {}
+        options = dict(params)
+        rows = body if isinstance(body, list) else [body]
+        key = UNIQUE_KEYS.get(table, ())
+        if "on_conflict" in options:
+            assert tuple(options["on_conflict"].split(",")) == key, options["on_conflict"]
+        merge = "resolution=merge-duplicates" in prefer
+        now = datetime.now(timezone.utc).isoformat()
+
+        existing = {tuple(str(r.get(c)) for c in key): r for r in self.tables[table]} if key else {}
+        inserted = []
+        for row in rows:
+            row = {"id": str(uuid.uuid4()), "created_at": now, **row}
+            conflict = existing.get(tuple(str(row.get(c)) for c in key)) if key else None
+            if conflict is not None:
+                if not merge:
+                    return 409, {"code": "23505", "message": "duplicate key value"}, {}
+                conflict.update({k: v for k, v in row.items() if k not in ("id", "created_at")})
+                inserted.append(conflict)
+                continue
+            self.tables[table].append(row)
+            if key:
+                existing[tuple(str(row.get(c)) for c in key)] = row
+            inserted.append(row)
+        return 201, inserted if "return=representation" in prefer else None, {}
+
+    def _update(self, table, params, prefer, body):
+        filters, _, _ = self._split_params(params)
+        rows = self._matching(table, filters)
+        for row in rows:
+            row.update({k: v for k, v in body.items() if v != "now()"})
+        return 200, rows if "return=representation" in prefer else None, {}
+
+    def _delete(self, table, params, prefer, body):
+        filters, _, _ = self._split_params(params)
+        rows = self._matching(table, filters)
+        deleted = {id(row) for row in rows}
+        self.tables[table] = [row for row in self.tables[table] if id(row) not in deleted]
+        return 200, rows if "return=representation" in prefer else None, {}
+
+    def add(self, table: str, **row) -> Dict[str, Any]:
+        """Insert a row directly, filling in ``id`` and ``created_at``."""
+        row = {"id": str(uuid.uuid4()),
+               "created_at": datetime.now(timezone.utc).isoformat(), **row}
+        self.tables[table].append(row)
+        return row
+
+    def rows(self, table: str, **where) -> List[Dict[str, Any]]:
+        return [row for row in self.tables[table]
+                if all(row.get(k) == v for k, v in where.items())]
@@ -0,0 +1,17 @@
+"""Local file source for ``RangeServer``, standing in for a video in GCS."""
+import os
+
+
+class FileSource:
+    """Local file with the ``size`` / ``read_at`` interface ``RangeServer`` serves."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self._fd = os.open(path, os.O_RDONLY)
+
+    def read_at(self, offset: int, length: int) -> bytes:
+        return os.pread(self._fd, length, offset)
+
+    def close(self):
+        os.close(self._fd)
@@ -0,0 +1,191 @@
+"""Synthetic videos and models, and reference pipelines, shared by the tests
+and the bench/ scripts."""
+from typing import Dict, List, Optional
+
+
+def make_synthetic_video(path: str, duration: float = 60.0, fps: int = 25,
+                         width: int = 1920, height: int = 1080) -> str:
+    """Write a synthetic test video with moving content (MPEG-4 Part 2)."""
+    import cv2
+    import numpy as np
+
+    writer = cv2.VideoWriter(
+        path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for i in range(int(duration * fps)):
+        frame = np.roll(noise, i * 8, axis=1)
+        cv2.putText(frame, str(i), (50, 150), cv2.FONT_HERSHEY_SIMPLEX,
+                    4, (255, 255, 255), 8)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def make_slide_video(path: str, slides: int = 8, seconds_per_slide: float = 20.0,
+                     fps: int = 25, width: int = 1280, height: int = 720) -> str:
+    """Write a synthetic slide-deck recording: static slides plus sensor noise."""
+    import cv2
+    import numpy as np
+
+    writer = cv2.VideoWriter(
+        path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    rng = np.random.default_rng(0)
+    for slide in range(slides):
+        base = np.full((height, width, 3), 245, np.uint8)
+        for line in range(6):
+            x0, y0 = int(rng.integers(40, width // 3)), 120 + line * 90
+            cv2.rectangle(base, (x0, y0), (x0 + int(rng.integers(200, width - 2 * x0)), y0 + 40),
+                          tuple(int(c) for c in rng.integers(0, 200, 3)), -1)
+        cv2.putText(base, f"Slide {slide + 1}", (40, 80), cv2.FONT_HERSHEY_SIMPLEX,
+                    2, (20, 20, 20), 4)
+        for _ in range(int(seconds_per_slide * fps)):
+            noise = rng.integers(-3, 4, base.shape, dtype=np.int16)
+            writer.write(np.clip(base + noise, 0, 255).astype(np.uint8))
+    writer.release()
+    return path
+
+
+def make_shot_video(path: str, shot_seconds=None, fps: int = 25,
+                    width: int = 640, height: int = 360) -> List[float]:
+    """
+    Write a synthetic edit with hard cuts between shots of the given lengths.
+
+    The default is a fast-cut ad (twelve shots under 1.5s, one with a white
+    flash) followed by three long, slowly panning shots. Returns the start
+    time of each shot.
+    """
+    import cv2
+    import numpy as np
+
+    if shot_seconds is None:
+        shot_seconds = [0.8, 1.2, 0.6, 1.0, 1.4, 0.7, 0.9, 1.3, 0.6, 1.1, 0.8, 1.5,
+                        45.0, 60.0, 40.0]
+    writer = cv2.VideoWriter(
+        path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    rng = np.random.default_rng(0)
+    starts = []
+    frame_index = 0
+    for shot, seconds in enumerate(shot_seconds):
+        starts.append(frame_index / fps)
+        base = np.empty((height, width * 2, 3), np.uint8)
+        base[:] = rng.integers(0, 256, 3)
+        for _ in range(12):
+            x, y = int(rng.integers(0, width * 2 - 80)), int(rng.integers(0, height - 60))
+            cv2.rectangle(base, (x, y), (x + int(rng.integers(40, 200)), y + int(rng.integers(30, 120))),
+                          tuple(int(c) for c in rng.integers(0, 256, 3)), -1)
+        count = int(seconds * fps)
+        for i in range(count):
+            offset = i * width // count
+            frame = np.ascontiguousarray(base[:, offset:offset + width])
+            if shot == 4 and count // 2 <= i < count // 2 + 4:
+                frame = np.full_like(frame, 255)
+            writer.write(frame)
+            frame_index += 1
+    writer.release()
+    return starts
+
+
+def make_tiny_smolvlm(seed: int = 0):
+    """
+    Build a randomly initialised, tiny Idefics3 (SmolVLM) model and processor.
+
+    Uses a byte-level BPE tokenizer trained on the prompt and the SmolVLM
+    chat template, so batching can be checked on CPU without downloads.
+    """
+    import torch
+    from tokenizers import Tokenizer, decoders, models, pre_tokenizers, trainers
+    from transformers import (AutoModelForVision2Seq, Idefics3Config,
+                              Idefics3ImageProcessor, Idefics3Processor,
+                              PreTrainedTokenizerFast)
+
+    special_tokens = ["<|endoftext|>", "<|im_start|>", "<|im_end|>",
+                      "<fake_token_around_image>", "<image>", "<end_of_utterance>",
+                      "<global-img>"] + [f"<row_{r}_col_{c}>" for r in range(1, 7) for c in range(1, 7)]
+    bpe = Tokenizer(models.BPE())
+    bpe.pre_tokenizer = pre_tokenizers.ByteLevel(add_prefix_space=False)
+    bpe.decoder = decoders.ByteLevel()
+    bpe.train_from_iterator(
+        ["User: Describe what's happening in this video.\nAssistant: A person walks a dog."] * 10,
+        trainers.BpeTrainer(vocab_size=400, special_tokens=special_tokens,
+                            initial_alphabet=pre_tokenizers.ByteLevel.alphabet()))
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=bpe, bos_token="<|im_start|>", eos_token="<end_of_utterance>",
+        pad_token="<|im_end|>", unk_token="<|endoftext|>",
+        additional_special_tokens=special_tokens[3:],
+        model_input_names=["input_ids", "attention_mask"])
+
+    chat_template = (
+        "<|im_start|>{% for message in messages %}{{message['role'] | capitalize}}"
+        "{% if message['content'][0]['type'] == 'image' %}{{':'}}{% else %}{{': '}}{% endif %}"
+        "{% for line in message['content'] %}{% if line['type'] == 'text' %}{{line['text']}}"
+        "{% elif line['type'] == 'image' %}{{ '<image>' }}{% endif %}{% endfor %}"
+        "<end_of_utterance>\n{% endfor %}{% if add_generation_prompt %}{{ 'Assistant:' }}{% endif %}")
+    image_processor = Idefics3ImageProcessor(
+        size={"longest_edge": 64}, max_image_size={"longest_edge": 32})
+    processor = Idefics3Processor(
+        image_processor, tokenizer, image_seq_len=4, chat_template=chat_template)
+
+    config = Idefics3Config(
+        vision_config={"hidden_size": 32, "intermediate_size": 64, "num_hidden_layers": 2,
+                       "num_attention_heads": 2, "image_size": 32, "patch_size": 8},
+        text_config={"vocab_size": len(processor.tokenizer), "hidden_size": 64,
+                     "intermediate_size": 128, "num_hidden_layers": 2,
+                     "num_attention_heads": 4, "num_key_value_heads": 4,
+                     "pad_token_id": processor.tokenizer.pad_token_id},
+        scale_factor=2,
+        image_token_id=processor.tokenizer.convert_tokens_to_ids("<image>"),
+    )
+    torch.manual_seed(seed)
+    model = AutoModelForVision2Seq.from_config(config).eval()
+    return model, processor
+
+
+def extract_frames(video_path: str, interval: int = 2, max_edge: Optional[int] = None):
+    """Collect the frames ``iter_frames`` samples into ``(frames, timestamps)`` lists."""
+    from video_processor import iter_frames
+
+    frames, timestamps = [], []
+    for frame, timestamp, _ in iter_frames(video_path, interval, max_edge):
+        frames.append(frame)
+        timestamps.append(timestamp)
+    return frames, timestamps
+
+
+def extract_frames_sequential(video_path: str, interval: int = 2):
+    """Decode every frame and keep one per interval (reference for the seeking sampler)."""
+    import cv2
+    from PIL import Image
+
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_interval = max(1, int(fps * interval))
+    frames, timestamps = [], []
+    frame_count = 0
+
+    while cap.isOpened():
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if frame_count % frame_interval == 0:
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            frames.append(Image.fromarray(rgb_frame))
+            timestamps.append(frame_count / fps)
+        frame_count += 1
+
+    cap.release()
+    return frames, timestamps
+
+
+def describe_batches(batches, describe_batch, dedup_distance: Optional[int] = None) -> List[Dict]:
+    """
+    Run ``iter_summary_batches`` to completion and return all summaries.
+
+    ``dedup_distance`` defaults to the worker's ``DEDUP_DISTANCE``.
+    """
+    from video_processor import DEDUP_DISTANCE, iter_summary_batches
+
+    if dedup_distance is None:
+        dedup_distance = DEDUP_DISTANCE
+    return [summary for summaries in iter_summary_batches(batches, describe_batch, dedup_distance)
+            for summary in summaries]
@@ -0,0 +1,109 @@
+"""Tests for the SQLite frame description cache."""
+import itertools
+import sqlite3
+import threading
+
+import pytest
+
+import frame_cache
+from frame_cache import FrameDescriptionCache
+
+MODEL = "model"
+PROMPT = "prompt"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Make every call to time.time() in frame_cache return a later time."""
+    ticks = itertools.count(1)
+    monkeypatch.setattr(frame_cache.time, "time", lambda: float(next(ticks)))
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return FrameDescriptionCache(tmp_path / "frames.sqlite3", max_entries=3)
+
+
+def test_hit_and_miss(cache):
+    # Hashes at and above 2**63 do not fit SQLite's signed integers
+    cache.put_many(MODEL, PROMPT, {1: "one", 2**63: "big", 2**64 - 1: "max"})
+
+    assert cache.get_many(MODEL, PROMPT, [1, 2**63, 2**64 - 1, 7]) == \
+        {1: "one", 2**63: "big", 2**64 - 1: "max"}
+    assert cache.get_many("other-model", PROMPT, [1]) == {}
+    assert cache.get_many(MODEL, "other prompt", [1]) == {}
+    assert (cache.hits, cache.misses) == (3, 3)
+    assert cache.stats() == {"entries": 3, "hits": 3, "misses": 3, "hit_rate": 0.5}
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    cache.put_many(MODEL, PROMPT, {1: "one", 2: "two"})
+    cache.put_many(MODEL, PROMPT, {3: "three"})
+    cache.get_many(MODEL, PROMPT, [1])  # 2 is now the least recently used
+
+    cache.put_many(MODEL, PROMPT, {4: "four"})
+
+    assert set(cache.get_many(MODEL, PROMPT, [1, 2, 3, 4])) == {1, 3, 4}
+    assert cache.stats()["entries"] == 3
+
+
+def test_replacing_an_entry_does_not_count_it_twice(cache):
+    cache.put_many(MODEL, PROMPT, {1: "one", 2: "two"})
+    cache.put_many(MODEL, PROMPT, {2: "second two", 3: "three"})
+
+    assert cache.get_many(MODEL, PROMPT, [1, 2, 3]) == {1: "one", 2: "second two", 3: "three"}
+    assert cache.stats()["entries"] == 3
+
+
+def test_entry_count_is_initialised_for_an_existing_file(tmp_path, clock):
+    path = tmp_path / "frames.sqlite3"
+    FrameDescriptionCache(path).put_many(MODEL, PROMPT, {1: "one"})
+    FrameDescriptionCache(path).put_many(MODEL, PROMPT, {2: "two"})
+    # A file written before the count was kept in cache_stats
+    with sqlite3.connect(path) as conn:
+        conn.execute("DELETE FROM cache_stats WHERE name = 'entries'")
+
+    cache = FrameDescriptionCache(path, max_entries=2)
+    assert cache.stats()["entries"] == 2
+    cache.put_many(MODEL, PROMPT, {3: "three"})
+    assert cache.stats()["entries"] == 2
+    assert set(cache.get_many(MODEL, PROMPT, [1, 2, 3])) == {2, 3}
+
+
+def test_stats_are_shared_through_the_file(tmp_path):
+    path = tmp_path / "frames.sqlite3"
+    FrameDescriptionCache(path).put_many(MODEL, PROMPT, {1: "one"})
+
+    other = FrameDescriptionCache(path)
+    assert other.get_many(MODEL, PROMPT, [1, 2]) == {1: "one"}
+    assert FrameDescriptionCache(path).stats()["hits"] == 1
+
+
+def test_concurrent_writers_do_not_lose_updates(tmp_path):
+    path = tmp_path / "frames.sqlite3"
+    FrameDescriptionCache(path)
+    writers, rounds = 8, 25
+    errors = []
+    start = threading.Barrier(writers)
+
+    def write(worker: int):
+        # Each worker uses its own cache object, as separate processes do
+        cache = FrameDescriptionCache(path)
+        start.wait()
+        try:
+            for i in range(rounds):
+                cache.put_many(MODEL, PROMPT, {worker * 1000 + i: f"{worker}:{i}"})
+                cache.get_many(MODEL, PROMPT, [worker * 1000 + i, 2**64 - 1])
+        except Exception as e:  # surfaced below; a thread cannot fail the test
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(w,)) for w in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    stats = FrameDescriptionCache(path).stats()
+    assert stats["entries"] == writers * rounds
+    assert (stats["hits"], stats["misses"]) == (writers * rounds, writers * rounds)
@@ -0,0 +1,92 @@
+"""Tests for streaming URLs into GCS, against the fake GCS server."""
+import hashlib
+import os
+
+import pytest
+
+from config import settings
+from gcp_uploader import gcs_clients, stream_url_to_gcp, video_suffix
+from tests.fake_gcs import UPLOAD_ALIGNMENT
+
+pytestmark = pytest.mark.anyio
+
+MiB = 1024 * 1024
+
+
+@pytest.fixture
+async def gcs(fake_gcs, monkeypatch):
+    """Fake GCS with small stream chunks, so uploads take several requests."""
+    monkeypatch.setattr(settings, "GCS_STREAM_CHUNK_SIZE", 4 * UPLOAD_ALIGNMENT)
+    yield fake_gcs
+    await gcs_clients.aclose()
+
+
+async def test_streamed_chunks_are_aligned(gcs):
+    data = os.urandom(5 * MiB + 12345)
+    gcs.sources["clip.mp4"] = data
+
+    transfer = await stream_url_to_gcp(f"{gcs.url}/source/clip.mp4")
+
+    assert gcs.errors == []
+    (session,) = gcs.sessions.values()
+    assert session.finalized
+    assert all(size % UPLOAD_ALIGNMENT == 0 for size in session.chunks[:-1])
+    assert transfer.size == len(data)
+    assert transfer.head == data[:settings.STREAM_PROBE_BYTES]
+
+
+async def test_unpersisted_bytes_are_resent(gcs):
+    data = os.urandom(3 * MiB + 1)
+    gcs.sources["clip.mp4"] = data
+    gcs.short_persists = 2
+
+    transfer = await stream_url_to_gcp(f"{gcs.url}/source/clip.mp4")
+
+    assert gcs.errors == []
+    assert gcs.short_persists == 0
+    assert gcs.objects[transfer.blob_name] == data
+
+
+async def test_blob_is_promoted_to_content_hash(gcs):
+    data = os.urandom(MiB)
+    gcs.sources["clip.webm"] = data
+    gcs.sources["copy.webm"] = data
+    content_hash = hashlib.sha256(data).hexdigest()
+
+    first = await stream_url_to_gcp(f"{gcs.url}/source/clip.webm")
+    second = await stream_url_to_gcp(f"{gcs.url}/source/copy.webm")
+
+    assert first.sha256 == second.sha256 == content_hash
+    assert first.blob_name == second.blob_name == f"videos/{content_hash}.webm"
+    assert list(gcs.objects) == [first.blob_name]
+    assert gcs.objects[first.blob_name] == data
+
+
+async def test_source_error_cancels_session(gcs):
+    gcs.sources["clip.mp4"] = os.urandom(3 * MiB)
+    gcs.source_fail_after = 2 * MiB
+
+    with pytest.raises(RuntimeError):
+        await stream_url_to_gcp(f"{gcs.url}/source/clip.mp4")
+
+    (session,) = gcs.sessions.values()
+    assert session.cancelled and not session.finalized
+    assert gcs.objects == {}
+
+
+async def test_oversized_source_cancels_session(gcs):
+    gcs.sources["clip.mp4"] = os.urandom(3 * MiB)
+
+    with pytest.raises(ValueError, match="too large"):
+        await stream_url_to_gcp(f"{gcs.url}/source/clip.mp4", max_bytes=2 * MiB)
+
+    (session,) = gcs.sessions.values()
+    assert session.cancelled
+    assert gcs.objects == {}
+
+
+def test_video_suffix():
+    assert video_suffix("https://example.com/a/clip.MOV?x=1") == ".mov"
+    assert video_suffix("https://example.com/watch?v=1", "video/webm; codecs=vp9") == ".webm"
+    assert video_suffix("https://example.com/clip.php", "video/quicktime") == ".mov"
+    assert video_suffix("https://example.com/clip", "application/octet-stream") == ".mp4"
@@ -0,0 +1,120 @@
+"""Tests for VLM generation in the video worker, with a tiny random SmolVLM."""
+import numpy as np
+import pytest
+from PIL import Image
+
+import video_processor
+from frame_cache import FrameDescriptionCache
+from tests.synthetic import make_tiny_smolvlm
+
+MAX_NEW_TOKENS = 12
+
+
+@pytest.fixture(scope="module")
+def tiny_model():
+    return make_tiny_smolvlm()
+
+
+@pytest.fixture(scope="module")
+def images():
+    # Mixed aspect ratios give prompts of different lengths, which need padding
+    rng = np.random.default_rng(0)
+    sizes = [(64, 16), (16, 64), (48, 32), (64, 64), (32, 48), (64, 24)]
+    return [Image.fromarray(rng.integers(0, 255, (h, w, 3), dtype=np.uint8))
+            for w, h in sizes]
+
+
+def test_batched_prompts_are_left_padded(tiny_model, images):
+    model, processor = tiny_model
+    processor.tokenizer.padding_side = "left"
+    prompt = processor.apply_chat_template(
+        [{"role": "user", "content": [{"type": "image"}, {"type": "text", "text": "x"}]}],
+        add_generation_prompt=True)
+    inputs = processor(text=[prompt] * len(images), images=[[i] for i in images],
+                       return_tensors="pt", padding=True)
+
+    mask = inputs["attention_mask"]
+    assert not mask.all(), "expected prompts of different lengths"
+    assert mask[:, -1].all()
+
+
+def test_batched_generation_matches_one_frame_at_a_time(tiny_model, images):
+    model, processor = tiny_model
+
+    batched = video_processor._generate_descriptions(
+        images, model, processor, MAX_NEW_TOKENS)
+    single = [video_processor._generate_descriptions([image], model, processor, MAX_NEW_TOKENS)[0]
+              for image in images]
+
+    assert len(batched) == len(images)
+    assert batched == single
+    assert all(batched)
+
+
+@pytest.fixture(scope="module")
+def int8_model():
+    model, processor = make_tiny_smolvlm()
+    return video_processor.quantize_language_model(model), processor
+
+
+def test_quantized_model_only_quantizes_the_language_model(int8_model):
+    import torch
+
+    model, _ = int8_model
+    dynamic_linear = torch.ao.nn.quantized.dynamic.Linear
+
+    assert model.quantization == "int8"
+    assert isinstance(model.lm_head, dynamic_linear)
+    text_linears = [m for m in model.model.text_model.modules()
+                    if isinstance(m, (torch.nn.Linear, dynamic_linear))]
+    assert text_linears and all(isinstance(m, dynamic_linear) for m in text_linears)
+    assert not any(isinstance(m, dynamic_linear) for m in model.model.vision_model.modules())
+
+
+def test_quantized_model_still_generates(int8_model, images):
+    model, processor = int8_model
+
+    descriptions = video_processor._generate_descriptions(
+        images, model, processor, MAX_NEW_TOKENS)
+
+    # Activations are quantized per batch, so only repeat runs must agree
+    assert len(descriptions) == len(images) and all(descriptions)
+    assert video_processor._generate_descriptions(
+        images, model, processor, MAX_NEW_TOKENS) == descriptions
+
+
+def test_quantized_descriptions_are_cached_separately(int8_model, images, tmp_path):
+    model, processor = int8_model
+    cache = FrameDescriptionCache(tmp_path / "frames.sqlite3")
+    hashes = list(range(len(images)))
+
+    descriptions = video_processor.process_batch(
+        images, model, processor, MAX_NEW_TOKENS, hashes=hashes, cache=cache,
+        model_id="tiny")
+
+    key = f"max_new_tokens={MAX_NEW_TOKENS}"
+    assert cache.get_many(f"tiny:int8:{key}", video_processor.PROMPT, hashes) == \
+        dict(zip(hashes, descriptions))
+    assert cache.get_many(f"tiny:{key}", video_processor.PROMPT, hashes) == {}
+
+
+def test_each_token_cap_is_cached_separately(tmp_path, monkeypatch):
+    calls = []
+
+    def generate(images, model, processor, max_new_tokens):
+        calls.append(max_new_tokens)
+        return [f"{max_new_tokens} tokens about {image}" for image in images]
+
+    monkeypatch.setattr(video_processor, "_generate_descriptions", generate)
+    cache = FrameDescriptionCache(tmp_path / "frames.sqlite3")
+
+    def describe(max_new_tokens):
+        return video_processor.process_batch(
+            ["a", "b"], None, None, max_new_tokens, hashes=[1, 2], cache=cache,
+            model_id="tiny")
+
+    assert describe(20) == ["20 tokens about a", "20 tokens about b"]
+    # A longer cap must not be served the shorter, truncated descriptions
+    assert describe(100) == ["100 tokens about a", "100 tokens about b"]
+    assert describe(20) == ["20 tokens about a", "20 tokens about b"]
+    assert calls == [20, 100]
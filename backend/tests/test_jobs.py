@@ -0,0 +1,191 @@
+"""End-to-end tests of processing jobs, with the fake backend, GCS and database."""
+import asyncio
+import hashlib
+import json
+
+import anyio
+import httpx
+import pytest
+
+import main
+from config import settings
+from gcp_uploader import gcs_clients
+from inference_backend import FakeBackend
+from jobs import JobManager
+from tests.synthetic import make_synthetic_video
+
+pytestmark = pytest.mark.anyio
+
+DURATION = 40
+INTERVAL = 2
+
+
+@pytest.fixture
+async def api(fake_gcs, fake_db, monkeypatch, tmp_path):
+    """Client for the app, with a fresh job manager and the fake backend."""
+    video = make_synthetic_video(
+        str(tmp_path / "clip.mp4"), duration=DURATION, width=160, height=90)
+    with open(video, "rb") as f:
+        fake_gcs.objects["videos/clip.mp4"] = f.read()
+
+    monkeypatch.setattr(settings, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(main, "job_manager", JobManager(2))
+    monkeypatch.setattr(main, "inference_backend", FakeBackend(duration_seconds=DURATION))
+    # Split the video into time ranges, as for a long video
+    monkeypatch.setattr(settings, "SHARD_SECONDS", 15)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    main.job_manager.shutdown()
+    await gcs_clients.aclose()
+
+
+async def wait_for_job(api, job_id: str) -> dict:
+    for _ in range(500):
+        job = (await api.get(f"/jobs/{job_id}")).json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+async def test_url_job_stores_summaries_and_progress(api, fake_db):
+    response = await api.post("/videos/process-url", json={
+        "url": "gs://test-bucket/videos/clip.mp4", "frameInterval": INTERVAL})
+    assert response.status_code == 202
+    queued = response.json()
+
+    job = await wait_for_job(api, queued["id"])
+
+    assert job["status"] == "completed", job["error"]
+    assert job["progress"] == 1.0
+    frame_count = DURATION // INTERVAL
+    assert job["result"]["total_frames"] == frame_count
+
+    video_id = job["video_id"]
+    summaries = sorted(fake_db.rows("video_summaries", video_id=video_id),
+                       key=lambda s: s["frame_number"])
+    assert [s["frame_number"] for s in summaries] == list(range(frame_count))
+    assert [s["timestamp_seconds"] for s in summaries] == \
+        list(range(0, DURATION, INTERVAL))
+    assert summaries[1]["timestamp"] == "0:02"
+
+    (video,) = fake_db.rows("videos", id=video_id)
+    assert video["status"] == "completed"
+    assert video["total_frames"] == frame_count
+    assert video["duration"] == "0:40"
+
+    # Stored progress rises with each batch, then the video is completed
+    updates = [r.body for r in fake_db.requests
+               if r.method == "PATCH" and r.table == "videos"]
+    progress = [u["progress"] for u in updates if "progress" in u]
+    assert progress == sorted(progress)
+    assert 0 < progress[0] and progress[-2] < 1.0 and progress[-1] == 1.0
+    totals = [u["total_frames"] for u in updates if "total_frames" in u]
+    assert totals == sorted(totals) and totals[-1] == frame_count
+
+
+async def test_failed_job_marks_video_failed(api, fake_db):
+    fake_db.fail_inserts["video_summaries"] = [400]
+
+    response = await api.post("/videos/process-url", json={
+        "url": "gs://test-bucket/videos/clip.mp4", "frameInterval": INTERVAL})
+    job = await wait_for_job(api, response.json()["id"])
+
+    assert job["status"] == "failed"
+    (video,) = fake_db.rows("videos", id=job["video_id"])
+    assert video["status"] == "failed"
+
+
+async def test_second_upload_of_the_same_bytes_reuses_the_results(api, fake_gcs, fake_db,
+                                                                  monkeypatch):
+    processed = []
+    stream_ranges = main.inference_backend.stream_ranges
+
+    def counting_stream_ranges(gcp_bucket_name, gcp_blob_path, *args):
+        processed.append(gcp_blob_path)
+        return stream_ranges(gcp_bucket_name, gcp_blob_path, *args)
+
+    monkeypatch.setattr(main.inference_backend, "stream_ranges", counting_stream_ranges)
+    data = fake_gcs.objects["videos/clip.mp4"]
+
+    jobs = []
+    for _ in range(2):
+        response = await api.post("/videos/upload", params={"frame_interval": INTERVAL},
+                                  files={"file": ("clip.mp4", data, "video/mp4")})
+        assert response.status_code == 202
+        jobs.append(await wait_for_job(api, response.json()["id"]))
+
+    first, second = jobs
+    assert first["status"] == second["status"] == "completed"
+    assert "deduplicated_from" not in first["result"]
+    assert second["result"]["deduplicated_from"] == first["video_id"]
+    assert second["result"]["total_frames"] == DURATION // INTERVAL
+    assert len(processed) == 1
+
+    def stored(video_id):
+        return sorted((s["frame_number"], s["timestamp_seconds"], s["description"])
+                      for s in fake_db.rows("video_summaries", video_id=video_id))
+
+    assert stored(second["video_id"]) == stored(first["video_id"])
+    (video,) = fake_db.rows("videos", id=second["video_id"])
+    assert video["status"] == "completed"
+    assert video["total_frames"] == DURATION // INTERVAL
+    assert video["content_hash"] == hashlib.sha256(data).hexdigest()
+
+
+async def read_events(api, video_id: str) -> list:
+    """Read a video's SSE stream until the server closes it."""
+    events = []
+    with anyio.fail_after(30):
+        async with api.stream("GET", f"/videos/{video_id}/stream") as response:
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("text/event-stream")
+            event = None
+            async for line in response.aiter_lines():
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    events.append((event, json.loads(line[len("data: "):])))
+    return events
+
+
+async def start_job_and_stream(api) -> list:
+    """Start a URL job and return its video's SSE events, subscribing mid-job."""
+    response = await api.post("/videos/process-url", json={
+        "url": "gs://test-bucket/videos/clip.mp4", "frameInterval": INTERVAL})
+    job_id = response.json()["id"]
+    for _ in range(500):
+        job = (await api.get(f"/jobs/{job_id}")).json()
+        if job["video_id"]:
+            return await read_events(api, job["video_id"])
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} created no video")
+
+
+async def test_progress_stream_sends_summaries_in_order_then_closes(api, monkeypatch):
+    monkeypatch.setattr(main.inference_backend, "delay_per_frame", 0.02)
+
+    events = await start_job_and_stream(api)
+
+    # Summaries and progress, then exactly one final status event
+    assert events[-1] == ("status", {"status": "completed"})
+    assert {name for name, _ in events[:-1]} == {"summaries", "progress"}
+    frames = [s["frame_number"] for name, data in events if name == "summaries" for s in data]
+    assert frames == list(range(DURATION // INTERVAL))
+    progress = [data for name, data in events if name == "progress"]
+    totals = [p["total_frames"] for p in progress]
+    assert totals == sorted(totals) and totals[-1] == DURATION // INTERVAL
+    fractions = [p["progress"] for p in progress if p["progress"] is not None]
+    assert fractions == sorted(fractions) and 0 < fractions[-1] < 1
+
+
+async def test_progress_stream_closes_when_the_job_fails(api, fake_db, monkeypatch):
+    monkeypatch.setattr(main.inference_backend, "delay_per_frame", 0.02)
+    fake_db.fail_inserts["video_summaries"] = [400]
+
+    events = await start_job_and_stream(api)
+
+    assert events[-1] == ("status", {"status": "failed"})
+    assert not [data for name, data in events if name == "summaries"]
@@ -0,0 +1,117 @@
+"""Tests for the local inference backend's scheduling of model calls."""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import video_processor
+from config import settings
+from gcp_uploader import gcs_clients
+from inference_backend import LocalBackend
+
+
+@pytest.fixture
+def backend(monkeypatch, tmp_path):
+    def download_blob(storage_client, gcp_bucket_name, gcp_blob_path):
+        path = tmp_path / gcp_blob_path.replace("/", "_")
+        path.write_text(f"video {path.stem[-1]}")
+        return str(path)
+
+    monkeypatch.setattr(settings, "STREAM_GCS_VIDEOS", False)
+    monkeypatch.setattr(gcs_clients, "get_storage_client", lambda: None)
+    monkeypatch.setattr(video_processor, "download_blob", download_blob)
+
+    calls = {"threads": set(), "decode_threads": set(), "active": 0, "overlaps": 0}
+    lock = threading.Lock()
+
+    def sample_frames(video_path, interval, sampling, start=0.0, end=None):
+        # Stand-in for the decoder: three "frames" made from the file contents
+        with open(video_path, "rb") as f:
+            content = f.read().decode()
+        for i in range(3):
+            with lock:
+                calls["decode_threads"].add(threading.current_thread().name)
+            yield f"{content} {i}", float(i), None
+
+    def generate_descriptions(images, model, processor, max_new_tokens):
+        # Stand-in for the model: record which thread runs each batch
+        with lock:
+            calls["active"] += 1
+            calls["overlaps"] += calls["active"] > 1
+            calls["threads"].add(threading.current_thread().name)
+        time.sleep(0.01)
+        with lock:
+            calls["active"] -= 1
+        return list(images)
+
+    def describe_shard(video_path, interval, batch_size, model_id, dedup_distance,
+                       sampling, start, end, max_new_tokens):
+        with open(video_path, "rb") as f:
+            content = f.read().decode()
+        return [{"description": f"{content} from {start:g}s", "frame_number": 0,
+                 "timestamp_seconds": start}]
+
+    monkeypatch.setattr(video_processor, "sample_frames", sample_frames)
+    monkeypatch.setattr(video_processor, "_generate_descriptions", generate_descriptions)
+    monkeypatch.setattr(video_processor, "describe_shard", describe_shard)
+    monkeypatch.setattr(video_processor, "needs_transcode", lambda path: False)
+    backend = LocalBackend(frame_cache_path="", shard_workers=2,
+                           loader=lambda model_id: (None, None))
+    # Threads stand in for the spawned worker processes
+    backend._pool = ThreadPoolExecutor(2)
+    backend.calls = calls
+    yield backend
+    backend.close()
+
+
+def run_with_timeout(fn, timeout: float = 30.0):
+    """Run ``fn`` on a daemon thread, failing instead of hanging on a deadlock."""
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault("value", fn()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "timed out, jobs are blocking each other"
+    return result["value"]
+
+
+def test_interleaved_jobs_take_turns_on_the_model_thread(backend):
+    def interleave():
+        a = backend.iter_video("test-bucket", "videos/a.mp4", batch_size=1)
+        b = backend.iter_video("test-bucket", "videos/b.mp4", batch_size=1)
+        return [batch[0]["description"] for pair in zip(a, b) for batch in pair]
+
+    descriptions = run_with_timeout(interleave)
+
+    assert descriptions == ["video a 0", "video b 0", "video a 1", "video b 1",
+                            "video a 2", "video b 2"]
+    assert backend.calls["overlaps"] == 0
+    assert backend.calls["threads"] == {"local-model_0"}
+    # Frames are decoded off the model thread
+    assert not backend.calls["decode_threads"] & backend.calls["threads"]
+
+
+def test_abandoned_job_does_not_block_the_next(backend):
+    def abandon_then_run():
+        abandoned = backend.iter_video("test-bucket", "videos/a.mp4", batch_size=1)
+        next(abandoned)
+        return list(backend.iter_video("test-bucket", "videos/b.mp4", batch_size=1))
+
+    batches = run_with_timeout(abandon_then_run)
+
+    assert [batch[0]["description"] for batch in batches] == \
+        ["video b 0", "video b 1", "video b 2"]
+
+
+def test_interleaved_sharded_jobs_share_the_pool(backend, monkeypatch):
+    monkeypatch.setattr(settings, "SHARD_SECONDS", 10)
+
+    def interleave():
+        a = backend.iter_video("test-bucket", "videos/a.mp4", duration=20)
+        b = backend.iter_video("test-bucket", "videos/b.mp4", duration=20)
+        return [batch[0]["description"] for pair in zip(a, b) for batch in pair]
+
+    descriptions = run_with_timeout(interleave)
+
+    assert descriptions == ["video a from 0s", "video b from 0s",
+                            "video a from 10s", "video b from 10s"]
@@ -0,0 +1,108 @@
+"""Tests for streaming multipart video uploads to disk (POST /videos/upload)."""
+import hashlib
+import os
+
+import httpx
+import pytest
+
+import main
+from config import settings
+
+pytestmark = pytest.mark.anyio
+
+MAX_MB = 1
+
+
+@pytest.fixture
+async def api(monkeypatch, tmp_path):
+    """Client for the app, with the database and job queue stubbed out."""
+    videos = []
+    jobs = []
+
+    async def create_video(video_data):
+        videos.append(video_data)
+        return {"id": f"video-{len(videos)}", **video_data}
+
+    monkeypatch.setattr(settings, "UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(settings, "MAX_VIDEO_SIZE", MAX_MB)
+    # Several write blocks per upload
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 64 * 1024)
+    monkeypatch.setattr(main, "create_video", create_video)
+    monkeypatch.setattr(main, "get_video_duration", lambda path, content_hash=None: 12.0)
+    monkeypatch.setattr(main.job_manager, "submit", lambda job, fn: jobs.append(job) or job)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        client.videos, client.jobs, client.upload_dir = videos, jobs, tmp_path
+        yield client
+
+
+async def upload(api, data: bytes, filename: str = "talk.mp4", field: str = "file"):
+    return await api.post("/videos/upload", params={"frame_interval": 5},
+                          data={"note": "form fields before the file are skipped"},
+                          files={field: (filename, data, "video/mp4")})
+
+
+async def test_file_is_streamed_to_disk_with_its_hash(api):
+    data = os.urandom(300 * 1024 + 7)
+
+    response = await upload(api, data)
+
+    assert response.status_code == 202
+    (path,) = api.upload_dir.iterdir()
+    assert path.suffix == ".mp4"
+    assert path.read_bytes() == data
+    (video,) = api.videos
+    assert video["content_hash"] == hashlib.sha256(data).hexdigest()
+    assert video["video_url"] == "talk.mp4"
+    assert video["frame_interval"] == 5
+    assert len(api.jobs) == 1
+
+
+@pytest.mark.parametrize("size", [
+    MAX_MB * 1024 * 1024 + 1,  # caught while streaming the file part
+    MAX_MB * 1024 * 1024 + 1024 * 1024,  # caught from Content-Length up front
+])
+async def test_oversized_upload_is_rejected(api, size):
+    response = await upload(api, b"\0" * size)
+
+    assert response.status_code == 400
+    assert "too large" in response.json()["detail"]
+    assert list(api.upload_dir.iterdir()) == []
+    assert api.videos == []
+
+
+async def test_unsupported_extension_is_rejected(api):
+    response = await upload(api, b"not a video", filename="notes.txt")
+
+    assert response.status_code == 400
+    assert "Unsupported video format" in response.json()["detail"]
+    assert list(api.upload_dir.iterdir()) == []
+
+
+async def test_missing_file_field_is_rejected(api):
+    response = await upload(api, b"video bytes", field="video")
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Missing 'file' file in upload"
+    assert list(api.upload_dir.iterdir()) == []
+
+
+async def test_non_multipart_body_is_rejected(api):
+    response = await api.post("/videos/upload", content=b"video bytes",
+                              headers={"Content-Type": "video/mp4"})
+
+    assert response.status_code == 400
+
+
+async def test_temp_file_is_removed_when_the_video_cannot_be_created(api, monkeypatch):
+    async def create_video(video_data):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(main, "create_video", create_video)
+
+    response = await upload(api, os.urandom(1000))
+
+    assert response.status_code == 500
+    assert list(api.upload_dir.iterdir()) == []
+    assert api.jobs == []
@@ -0,0 +1,99 @@
+"""Tests for decoding videos through range requests instead of downloading them."""
+import itertools
+import shutil
+import threading
+import time
+import urllib.request
+
+import pytest
+
+import video_processor
+from range_stream import RangeReader, RangeServer
+from tests.file_source import FileSource
+from tests.synthetic import make_synthetic_video
+from video_probe import probe_header
+
+INTERVAL = 3
+
+
+@pytest.fixture(scope="module")
+def origin(tmp_path_factory):
+    """A range server standing in for GCS, serving a synthetic video."""
+    path = tmp_path_factory.mktemp("videos") / "synthetic.mp4"
+    make_synthetic_video(str(path), duration=20, width=320, height=180)
+    source = FileSource(str(path))
+    with RangeServer(source) as server:
+        yield server
+    source.close()
+
+
+@pytest.fixture
+def downloaded(origin, tmp_path):
+    path = tmp_path / "downloaded.mp4"
+    with urllib.request.urlopen(origin.url) as response, open(path, "wb") as f:
+        shutil.copyfileobj(response, f)
+    return str(path)
+
+
+def describe(video_path, monkeypatch):
+    """Run the worker pipeline with a stub model that reports each frame's brightness."""
+    def process_batch(images, model, processor, max_new_tokens, hashes=None, **kwargs):
+        return [f"brightness {sum(image.convert('L').getdata())}" for image in images]
+
+    monkeypatch.setattr(video_processor, "process_batch", process_batch)
+    models = video_processor.ModelCache(loader=lambda model_id: (None, None))
+    return video_processor.describe_video(
+        video_path, INTERVAL, 4, "stub", models, dedup_distance=-1)
+
+
+def test_streamed_header_matches_downloaded_header(origin, downloaded):
+    with video_processor.stream_video(origin.url) as url:
+        streamed = probe_header(url)
+    expected = probe_header(downloaded)
+
+    assert expected is not None and expected.keyframes
+    assert streamed.to_dict() == expected.to_dict()
+
+
+def test_streamed_video_gives_the_same_summaries(origin, downloaded, monkeypatch):
+    expected = describe(downloaded, monkeypatch)
+    requests_before = origin.requests
+
+    with video_processor.stream_video(origin.url) as url:
+        streamed = describe(url, monkeypatch)
+
+    assert [s["frame_number"] for s in expected] == list(range(20 // INTERVAL + 1))
+    assert streamed == expected
+    assert origin.requests > requests_before
+
+
+def test_cached_reads_do_not_wait_for_a_fetch(origin):
+    reader = RangeReader(origin.url)
+    first_block = reader.read_at(0, 100)
+    origin.latency = 1.0
+    try:
+        slow = threading.Thread(target=reader.read_at, args=(reader.size - 100, 100))
+        slow.start()
+        time.sleep(0.1)  # the slow read is now waiting on the server
+        started = time.perf_counter()
+        assert reader.read_at(0, 100) == first_block
+        assert time.perf_counter() - started < 0.5
+        slow.join()
+    finally:
+        origin.latency = 0.0
+
+
+def test_header_callable_is_called_for_every_request(origin):
+    tokens = itertools.count()
+    sent = []
+
+    def headers():
+        sent.append(f"Bearer {next(tokens)}")
+        return {"Authorization": sent[-1]}
+
+    reader = RangeReader(origin.url, headers, block_size=64 * 1024)
+    reader.read_at(reader.size // 2, 100)
+    reader.read_at(reader.size - 100, 100)
+
+    assert reader.requests == 3
+    assert sent == ["Bearer 0", "Bearer 1", "Bearer 2"]
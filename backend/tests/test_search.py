@@ -0,0 +1,138 @@
+"""Tests for full-text search with the in-process index."""
+import sys
+import threading
+
+import httpx
+import pytest
+
+import main
+import supabase_client
+from search_index import SearchIndex
+
+pytestmark = pytest.mark.anyio
+
+VIDEO_ID = "00000000-0000-0000-0000-000000000001"
+DESCRIPTIONS = [
+    "A man riding a motorcycle on a highway.",
+    "A red car parked on a city street at night.",
+    "Two motorcycles parked next to a building.",
+    "A chef cooking in a kitchen.",
+    "A motorcycle on a highway, then another motorcycle on the highway.",
+]
+
+
+@pytest.fixture
+def index(monkeypatch):
+    index = SearchIndex()
+    index.add_many({
+        "video_id": VIDEO_ID,
+        "frame_number": i,
+        "timestamp": f"0:{i * 2:02d}",
+        "timestamp_seconds": i * 2.0,
+        "description": description,
+    } for i, description in enumerate(DESCRIPTIONS))
+    monkeypatch.setattr(supabase_client, "summary_index", index)
+    return index
+
+
+@pytest.fixture
+async def api():
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+def test_hits_contain_every_term_ranked_by_bm25(index):
+    hits = index.search("motorcycles highway")
+
+    # Stemming matches "motorcycle"; repeated terms rank higher
+    assert [hit["frame_number"] for hit in hits] == [4, 0]
+    assert hits[0]["rank"] > hits[1]["rank"]
+    assert index.search("motorcycle kitchen") == []
+    assert index.search("the of") == []
+
+
+def test_readding_a_frame_replaces_it(index):
+    index.add({"video_id": VIDEO_ID, "frame_number": 3, "timestamp": "0:06",
+               "timestamp_seconds": 6.0, "description": "A dog in a park."})
+
+    assert index.search("chef") == []
+    assert [hit["frame_number"] for hit in index.search("dog")] == [3]
+    assert len(index) == len(DESCRIPTIONS)
+
+
+async def test_search_endpoint_pages_hits_off_the_event_loop(api, index, monkeypatch):
+    search_threads = []
+    search = index.search
+
+    def recording_search(*args, **kwargs):
+        search_threads.append(threading.current_thread())
+        return search(*args, **kwargs)
+
+    monkeypatch.setattr(index, "search", recording_search)
+
+    first = (await api.get("/search", params={"q": "motorcycle", "limit": 2})).json()
+    second = (await api.get("/search", params={"q": "motorcycle", "skip": 2, "limit": 2})).json()
+
+    assert [hit["frame_number"] for hit in first["results"]] == [4, 0]
+    assert first["hasMore"] is True
+    assert [hit["frame_number"] for hit in second["results"]] == [2]
+    assert second["hasMore"] is False
+    assert threading.main_thread() not in search_threads
+
+
+def test_search_while_adding_from_other_threads(index):
+    # Searches must not leave buffers of the postings exported once they
+    # release the lock, or appending to those postings raises BufferError
+    errors = []
+    stop = threading.Event()
+
+    def add():
+        try:
+            for i in range(2000):
+                index.add({"video_id": VIDEO_ID, "frame_number": 100 + i,
+                           "timestamp": "0:00", "timestamp_seconds": 0.0,
+                           "description": "A motorcycle on a highway."})
+        except Exception as e:
+            errors.append(e)
+        finally:
+            stop.set()
+
+    def search():
+        try:
+            while not stop.is_set():
+                index.search("motorcycle")
+                index.search("motorcycle highway")
+                index.search("motorcycle kitchen")
+        except Exception as e:
+            errors.append(e)
+
+    # Switch threads often, so that adds land right after a search's lock
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    threads = [threading.Thread(target=add)] + [threading.Thread(target=search) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    try:
+        for thread in threads:
+            thread.join(60)
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert errors == []
+    assert len(index.search("motorcycle", limit=10_000)) == 2000 + 3
+
+
+def test_failed_search_leaves_postings_appendable(index, monkeypatch):
+    # The traceback keeps the search's locals alive after the lock is released
+    def fail(*args, **kwargs):
+        raise RuntimeError("scoring failed")
+
+    with monkeypatch.context() as patch, pytest.raises(RuntimeError) as failure:
+        patch.setattr("search_index.np.lexsort", fail)
+        index.search("motorcycle")
+
+    index.add({"video_id": VIDEO_ID, "frame_number": 9, "timestamp": "0:18",
+               "timestamp_seconds": 18.0, "description": "A motorcycle."})
+    assert failure.traceback
+    assert 9 in [hit["frame_number"] for hit in index.search("motorcycle")]
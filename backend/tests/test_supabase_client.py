@@ -0,0 +1,168 @@
+"""Tests for the PostgREST data layer, against the fake PostgREST server."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from config import settings
+from supabase_client import (
+    DatabaseError,
+    _keyset_filter,
+    create_video_summaries,
+    evict_api_key,
+    get_video_summaries_page,
+    get_video_with_summaries,
+    list_videos,
+    revoke_api_key,
+    validate_api_key,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def make_summaries(video_id: str, count: int, description: str = "frame"):
+    # Three frames share each timestamp, so the keyset needs frame_number
+    return [{
+        "video_id": video_id,
+        "frame_number": i,
+        "timestamp": f"0:{i // 3:02d}",
+        "timestamp_seconds": float(i // 3),
+        "description": f"{description} {i}",
+    } for i in range(count)]
+
+
+def test_keyset_filter():
+    assert _keyset_filter(["a", "b"], [1, "x"]) == '(a.gt."1",and(a.eq."1",b.gt."x"))'
+    assert _keyset_filter(["a", "b"], [1, "x"], descending=True) == \
+        '(a.lt."1",and(a.eq."1",b.lt."x"))'
+
+
+async def test_list_videos_cursor_walks_every_video_once(fake_db):
+    # Several videos share a created_at, so the id decides their order
+    for i in range(25):
+        fake_db.add("videos", created_at=f"2026-01-01T00:00:{i // 4:02d}+00:00")
+    expected = sorted(fake_db.tables["videos"],
+                      key=lambda v: (v["created_at"], v["id"]), reverse=True)
+
+    seen, cursor = [], None
+    while True:
+        videos, total, cursor = await list_videos(limit=10, cursor=cursor)
+        seen.extend(video["id"] for video in videos)
+        assert total == 25
+        if cursor is None:
+            break
+
+    assert seen == [video["id"] for video in expected]
+    keyset_requests = [r.params for r in fake_db.requests
+                       if r.method == "GET" and "or" in r.params]
+    assert len(keyset_requests) == 2
+    assert all("offset" not in params for params in keyset_requests)
+
+
+async def test_long_video_summaries_are_fetched_by_keyset(fake_db):
+    video = fake_db.add("videos", status="completed")
+    for summary in make_summaries(video["id"], 2500):
+        fake_db.add("video_summaries", **summary)
+
+    result = await get_video_with_summaries(video["id"])
+
+    assert [s["frame_number"] for s in result["summaries"]] == list(range(2500))
+    pages = [r.params for r in fake_db.requests if r.table == "video_summaries"]
+    assert len(pages) == 2
+    assert all(params["or"].startswith("(timestamp_seconds.gt.") for params in pages)
+
+
+async def test_summary_pages_count_the_stored_summaries(fake_db):
+    # While a video is processed, total_frames lags behind the summaries
+    video = fake_db.add("videos", status="processing", total_frames=4)
+    for summary in make_summaries(video["id"], 12):
+        fake_db.add("video_summaries", **summary)
+
+    seen, cursor = [], None
+    while True:
+        summaries, total, cursor = await get_video_summaries_page(video["id"], cursor, limit=5)
+        seen.extend(s["frame_number"] for s in summaries)
+        assert total == 12
+        if cursor is None:
+            break
+
+    assert seen == list(range(12))
+    assert await get_video_summaries_page(fake_db.add("videos")["id"]) == ([], 0, None)
+
+
+async def test_summary_page_of_a_missing_video_is_none(fake_db):
+    assert await get_video_summaries_page("00000000-0000-0000-0000-000000000000") is None
+
+
+async def test_summaries_are_upserted_on_video_and_frame(fake_db, monkeypatch):
+    monkeypatch.setattr(settings, "SUMMARY_INSERT_CHUNK_SIZE", 500)
+    video = fake_db.add("videos")
+
+    assert await create_video_summaries(make_summaries(video["id"], 1200)) == 1200
+    assert await create_video_summaries(make_summaries(video["id"], 1200, "again")) == 1200
+
+    rows = fake_db.rows("video_summaries", video_id=video["id"])
+    assert len(rows) == 1200
+    assert all(row["description"].startswith("again") for row in rows)
+    inserts = [r for r in fake_db.requests if r.method == "POST"]
+    assert len(inserts) == 6
+    for request in inserts:
+        assert request.params["on_conflict"] == "video_id,frame_number"
+        assert "resolution=merge-duplicates" in request.prefer
+
+
+async def test_transient_insert_failure_is_retried(fake_db, monkeypatch):
+    monkeypatch.setattr(settings, "SUMMARY_INSERT_CHUNK_SIZE", 100)
+    video = fake_db.add("videos")
+    fake_db.fail_inserts["video_summaries"] = [503]
+
+    assert await create_video_summaries(make_summaries(video["id"], 300)) == 300
+    assert len(fake_db.rows("video_summaries", video_id=video["id"])) == 300
+
+
+async def test_client_error_is_not_retried(fake_db):
+    video = fake_db.add("videos")
+    fake_db.fail_inserts["video_summaries"] = [400]
+
+    with pytest.raises(DatabaseError) as error:
+        await create_video_summaries(make_summaries(video["id"], 10))
+
+    assert error.value.status_code == 400
+    assert fake_db.rows("video_summaries") == []
+
+
+def api_key_lookups(fake_db) -> int:
+    return sum(1 for r in fake_db.requests if r.method == "GET" and r.table == "api_keys")
+
+
+async def test_cached_api_key_lookups_skip_postgrest(fake_db):
+    fake_db.add("api_keys", api_key="good", expires_at=None)
+
+    assert [await validate_api_key("good") for _ in range(3)] == [True] * 3
+    assert [await validate_api_key("unknown") for _ in range(3)] == [False] * 3
+    assert api_key_lookups(fake_db) == 2
+
+
+async def test_revoked_api_key_stops_validating_once_evicted(fake_db):
+    row = fake_db.add("api_keys", api_key="good", expires_at=None)
+    assert await validate_api_key("good")
+
+    # Revoked by another process: this one still has the key cached
+    row["expires_at"] = (datetime.now(timezone.utc) - timedelta(seconds=1)).isoformat()
+    assert await validate_api_key("good")
+    assert api_key_lookups(fake_db) == 1
+
+    evict_api_key("good")
+    assert not await validate_api_key("good")
+    assert api_key_lookups(fake_db) == 2
+
+
+async def test_revoking_an_api_key_applies_immediately(fake_db):
+    fake_db.add("api_keys", api_key="good", expires_at=None)
+    assert await validate_api_key("good")
+
+    assert await revoke_api_key("good")
+
+    assert not await validate_api_key("good")
+    (row,) = fake_db.rows("api_keys", api_key="good")
+    assert row["expires_at"] is not None
+    assert not await revoke_api_key("unknown")
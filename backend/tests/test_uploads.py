@@ -0,0 +1,106 @@
+"""Tests for resumable upload sessions, against the fake GCS server."""
+import hashlib
+import os
+
+import httpx
+import pytest
+
+import main
+from gcp_uploader import gcs_clients
+
+pytestmark = pytest.mark.anyio
+
+CHUNK_SIZE = 64 * 1024
+
+
+@pytest.fixture
+async def api(fake_gcs, monkeypatch):
+    """Client for the app, with the database and job queue stubbed out."""
+    videos = []
+    jobs = []
+
+    async def create_video(video_data):
+        videos.append(video_data)
+        return {"id": f"video-{len(videos)}", **video_data}
+
+    monkeypatch.setattr(main, "create_video", create_video)
+    monkeypatch.setattr(main.job_manager, "submit", lambda job, fn: jobs.append(job) or job)
+    monkeypatch.setattr(main, "get_video_duration_from_head", lambda head, suffix: 12.0)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        client.gcs, client.videos, client.jobs = fake_gcs, videos, jobs
+        yield client
+    await gcs_clients.aclose()
+
+
+async def start_upload(api, data: bytes) -> str:
+    response = await api.post("/uploads", json={
+        "filename": "talk.mp4", "size": len(data), "chunkSize": CHUNK_SIZE})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+async def put_chunk(api, upload_id: str, data: bytes, index: int) -> httpx.Response:
+    return await api.put(f"/uploads/{upload_id}/chunks/{index}",
+                         content=data[index * CHUNK_SIZE:(index + 1) * CHUNK_SIZE])
+
+
+@pytest.mark.parametrize("order", [[0, 1, 2, 3], [3, 1, 0, 2]])
+async def test_completed_upload_is_named_by_content_hash(api, order):
+    data = os.urandom(3 * CHUNK_SIZE + 100)
+    content_hash = hashlib.sha256(data).hexdigest()
+    upload_id = await start_upload(api, data)
+    for index in order:
+        assert (await put_chunk(api, upload_id, data, index)).status_code == 200
+
+    response = await api.post(f"/uploads/{upload_id}/complete")
+
+    assert response.status_code == 202
+    assert api.gcs.objects == {f"videos/{content_hash}.mp4": data}
+    assert api.videos[0]["content_hash"] == content_hash
+
+
+async def test_replaced_chunk_is_rehashed(api):
+    data = os.urandom(2 * CHUNK_SIZE)
+    upload_id = await start_upload(api, data)
+    await put_chunk(api, upload_id, os.urandom(len(data)), 0)
+    await put_chunk(api, upload_id, data, 1)
+    await put_chunk(api, upload_id, data, 0)
+
+    assert (await api.post(f"/uploads/{upload_id}/complete")).status_code == 202
+    assert api.videos[0]["content_hash"] == hashlib.sha256(data).hexdigest()
+
+
+async def test_short_chunk_is_rejected(api):
+    data = os.urandom(2 * CHUNK_SIZE)
+    upload_id = await start_upload(api, data)
+
+    response = await api.put(f"/uploads/{upload_id}/chunks/0", content=data[:100])
+
+    assert response.status_code == 400
+    assert api.gcs.objects == {}
+
+
+async def test_failed_completion_can_be_retried(api, monkeypatch):
+    data = os.urandom(2 * CHUNK_SIZE)
+    upload_id = await start_upload(api, data)
+    await put_chunk(api, upload_id, data, 0)
+    await put_chunk(api, upload_id, data, 1)
+    create_video = main.create_video
+
+    async def failing_create_video(video_data):
+        raise RuntimeError("database unavailable")
+
+    monkeypatch.setattr(main, "create_video", failing_create_video)
+    response = await api.post(f"/uploads/{upload_id}/complete")
+    assert response.status_code == 500
+    # The composed video is removed; the chunks are kept for the retry
+    assert not any(name.startswith("videos/") for name in api.gcs.objects)
+    assert (await api.get(f"/uploads/{upload_id}")).json()["completed"] is False
+
+    monkeypatch.setattr(main, "create_video", create_video)
+    response = await api.post(f"/uploads/{upload_id}/complete")
+    assert response.status_code == 202
+    assert list(api.gcs.objects) == [f"videos/{hashlib.sha256(data).hexdigest()}.mp4"]
+    assert (await api.post(f"/uploads/{upload_id}/complete")).status_code == 409
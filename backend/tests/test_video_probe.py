@@ -0,0 +1,171 @@
+"""Tests for reading video metadata from container headers."""
+import struct
+
+import pytest
+
+import video_probe
+from range_stream import RangeServer
+from tests.file_source import FileSource
+from tests.synthetic import make_synthetic_video
+from video_probe import probe_bytes, probe_header, probe_video
+from video_utils import get_video_duration_from_head
+
+DURATION = 4
+FPS = 25
+WIDTH, HEIGHT = 320, 240
+
+# Boxes whose payload is just more boxes, on the way down to ``stco``
+_CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+
+def _top_level_boxes(data: bytes):
+    offset = 0
+    while offset < len(data):
+        size, box_type = struct.unpack(">I4s", data[offset:offset + 8])
+        yield box_type, data[offset:offset + size]
+        offset += size
+
+
+def _shift_chunk_offsets(box: bytearray, start: int, end: int, shift: int):
+    """Add ``shift`` to every ``stco`` chunk offset in ``box[start:end]``."""
+    offset = start
+    while offset < end:
+        size, box_type = struct.unpack(">I4s", box[offset:offset + 8])
+        if box_type in _CONTAINER_BOXES:
+            _shift_chunk_offsets(box, offset + 8, offset + size, shift)
+        elif box_type == b"stco":
+            count = struct.unpack(">I", box[offset + 12:offset + 16])[0]
+            for entry in range(offset + 16, offset + 16 + 4 * count, 4):
+                chunk = struct.unpack(">I", box[entry:entry + 4])[0]
+                box[entry:entry + 4] = struct.pack(">I", chunk + shift)
+        offset += size
+
+
+def make_faststart(source: str, path: str) -> str:
+    """Rewrite an MP4 with ``moov`` moved in front of ``mdat``."""
+    with open(source, "rb") as f:
+        boxes = dict(_top_level_boxes(f.read()))
+    moov = bytearray(boxes[b"moov"])
+    _shift_chunk_offsets(moov, 8, len(moov), len(moov))
+    with open(path, "wb") as f:
+        f.write(boxes[b"ftyp"] + bytes(moov) + boxes.get(b"free", b"") + boxes[b"mdat"])
+    return path
+
+
+def make_video(path: str, fourcc: str) -> str:
+    import cv2
+    import numpy as np
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), FPS, (WIDTH, HEIGHT))
+    for i in range(DURATION * FPS):
+        writer.write(np.full((HEIGHT, WIDTH, 3), i % 256, np.uint8))
+    writer.release()
+    return path
+
+
+@pytest.fixture(scope="module")
+def mp4(tmp_path_factory):
+    """An MP4 as OpenCV writes it, with ``moov`` after ``mdat``."""
+    path = tmp_path_factory.mktemp("videos") / "moov_at_end.mp4"
+    return make_synthetic_video(str(path), duration=DURATION, fps=FPS, width=WIDTH, height=HEIGHT)
+
+
+@pytest.fixture(autouse=True)
+def empty_probe_cache():
+    video_probe._probe_cache.clear()
+    yield
+    video_probe._probe_cache.clear()
+
+
+def assert_metadata(metadata, codec, container):
+    assert metadata is not None
+    assert metadata.source == "header"
+    assert metadata.duration == pytest.approx(DURATION)
+    assert metadata.fps == pytest.approx(FPS)
+    assert (metadata.width, metadata.height) == (WIDTH, HEIGHT)
+    assert (metadata.codec, metadata.container) == (codec, container)
+
+
+def test_faststart_mp4_is_read_from_the_head(mp4, tmp_path):
+    path = make_faststart(mp4, str(tmp_path / "faststart.mp4"))
+    with open(path, "rb") as f:
+        head = f.read(16 * 1024)
+
+    assert_metadata(probe_bytes(head), "mpeg4", "mp4")
+    assert get_video_duration_from_head(head) == pytest.approx(DURATION)
+    assert_metadata(probe_header(path), "mpeg4", "mp4")
+
+
+def test_moov_at_end_needs_more_than_the_head(mp4):
+    with open(mp4, "rb") as f:
+        head = f.read(16 * 1024)
+
+    assert probe_bytes(head) is None
+    assert_metadata(probe_header(mp4), "mpeg4", "mp4")
+
+
+def test_moov_at_end_over_http_fetches_only_the_boxes(mp4):
+    source = FileSource(mp4)
+    try:
+        with RangeServer(source) as server:
+            metadata = probe_header(server.url)
+    finally:
+        source.close()
+
+    assert_metadata(metadata, "mpeg4", "mp4")
+    # The first block, then a range request straight to ``moov``
+    assert server.requests == 2
+    assert server.bytes_served < source.size / 2
+
+
+def test_webm_header(tmp_path):
+    path = make_video(str(tmp_path / "clip.webm"), "VP80")
+    with open(path, "rb") as f:
+        head = f.read(4096)
+
+    assert_metadata(probe_bytes(head), "vp8", "webm")
+    assert_metadata(probe_header(path), "vp8", "webm")
+
+
+def test_truncated_header_is_not_parsed(mp4, tmp_path):
+    path = make_faststart(mp4, str(tmp_path / "faststart.mp4"))
+    with open(path, "rb") as f:
+        data = f.read()
+    moov_end = data.index(b"mdat") - 4
+
+    assert probe_bytes(data[:moov_end - 100]) is None
+    assert probe_bytes(b"\x1a\x45\xdf\xa3" + b"\xff" * 64) is None
+    assert probe_bytes(b"not a video at all") is None
+    assert get_video_duration_from_head(b"not a video at all") == 0.0
+
+
+def test_unparsed_container_falls_back_to_opencv(tmp_path):
+    path = make_video(str(tmp_path / "clip.avi"), "MJPG")
+
+    assert probe_header(path) is None
+    metadata = probe_video(path)
+    assert metadata.source == "opencv"
+    assert metadata.duration == pytest.approx(DURATION)
+    assert (metadata.width, metadata.height) == (WIDTH, HEIGHT)
+
+
+def test_garbage_file_raises(tmp_path):
+    path = tmp_path / "garbage.mp4"
+    path.write_bytes(b"\x00\x00\x00\x18ftypisom" + b"\x00" * 1000)
+
+    assert probe_header(str(path)) is None
+    with pytest.raises(ValueError):
+        probe_video(str(path))
+
+
+def test_probe_cache_hit_skips_the_file(mp4, monkeypatch):
+    first = probe_video(mp4, content_hash="abc")
+
+    def fail(video_path):
+        raise AssertionError("probed again")
+
+    monkeypatch.setattr(video_probe, "probe_header", fail)
+    monkeypatch.setattr(video_probe, "probe_with_opencv", fail)
+    assert probe_video(mp4, content_hash="abc") is first
+    with pytest.raises(AssertionError):
+        probe_video(mp4, content_hash="other")
@@ -0,0 +1,105 @@
+"""Tests for frame sampling and description in the video worker."""
+import bisect
+
+import cv2
+import numpy as np
+import pytest
+
+import video_processor
+from tests.synthetic import (describe_batches, extract_frames, extract_frames_sequential,
+                             make_shot_video, make_slide_video, make_synthetic_video)
+
+FPS = 25
+
+
+@pytest.fixture(scope="module")
+def video_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("videos") / "synthetic.mp4"
+    return make_synthetic_video(str(path), duration=30, fps=FPS, width=320, height=180)
+
+
+@pytest.fixture(scope="module")
+def decoded_frames(video_path):
+    """Every frame of the video, decoded in order and converted to RGB."""
+    cap = cv2.VideoCapture(video_path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    cap.release()
+    return frames
+
+
+def assert_frames(sampled, decoded_frames, frame_numbers):
+    """Check the sampled frames are exactly the given frames of the video."""
+    assert [timestamp for _, timestamp, _ in sampled] == [n / FPS for n in frame_numbers]
+    for (image, _, _), number in zip(sampled, frame_numbers):
+        assert np.array_equal(np.asarray(image), decoded_frames[number]), number
+
+
+@pytest.mark.parametrize("interval", [1, 2, 5, 7])
+@pytest.mark.parametrize("keyframe_index", [True, False])
+def test_sampler_returns_the_frames_on_the_interval_grid(
+        video_path, decoded_frames, monkeypatch, interval, keyframe_index):
+    if not keyframe_index:
+        # Without the container's keyframe index the sampler seeks by gap
+        monkeypatch.setattr(video_processor, "probe_header", lambda path: None)
+
+    sampled = list(video_processor.iter_frames(video_path, interval, max_edge=None))
+
+    assert_frames(sampled, decoded_frames, range(0, len(decoded_frames), interval * FPS))
+
+
+def test_sampler_time_range_stays_on_the_grid(video_path, decoded_frames):
+    sampled = list(video_processor.sample_frames(
+        video_path, 4, max_edge=None, start=5.0, end=17.0))
+
+    assert_frames(sampled, decoded_frames, [8 * FPS, 12 * FPS, 16 * FPS])
+
+
+def test_sampler_downscales_to_max_edge(video_path):
+    image, _, _ = next(video_processor.iter_frames(video_path, 2, max_edge=160))
+
+    assert image.size == (160, 90)
+
+
+def test_extract_frames_matches_sequential_decode(video_path):
+    frames, timestamps = extract_frames(video_path, 3)
+    expected_frames, expected_timestamps = extract_frames_sequential(video_path, 3)
+
+    assert timestamps == expected_timestamps
+    assert all(np.array_equal(np.asarray(a), np.asarray(b))
+               for a, b in zip(frames, expected_frames))
+
+
+def test_scene_sampling_takes_one_frame_per_shot(tmp_path):
+    # The fifth shot has a white flash halfway through, which is not a cut
+    path = str(tmp_path / "shots.mp4")
+    starts = make_shot_video(path, [3.0, 1.2, 0.6, 4.0, 8.0], width=320, height=180)
+
+    timestamps = [ts for _, ts, _ in video_processor.sample_frames(
+        path, 2, "scene", max_edge=None)]
+
+    assert [bisect.bisect_right(starts, ts) - 1 for ts in timestamps] == [0, 1, 2, 3, 4]
+
+
+def test_near_duplicate_frames_reuse_the_last_description(tmp_path):
+    # Frames at 0, 2, 4s show slide 1; 6, 8s slide 2; 10, 12, 14s slide 3
+    path = make_slide_video(str(tmp_path / "slides.mp4"), slides=3, seconds_per_slide=5)
+    described = []
+
+    def describe(images, hashes):
+        described.extend(images)
+        return [f"slide {len(described) - len(images) + i}" for i in range(len(images))]
+
+    frames = list(video_processor.iter_frames(path, 2))
+    summaries = describe_batches(
+        [frames[i:i + 4] for i in range(0, len(frames), 4)], describe)
+
+    # Only the first frame of each slide goes to the model, across batches
+    assert len(described) == 3
+    assert [s.get("reused_from") for s in summaries] == [None, 0, 0, None, 3, None, 5, 5]
+    assert [s["description"] for s in summaries] == ["slide 0"] * 3 + ["slide 1"] * 2 + \
+        ["slide 2"] * 3
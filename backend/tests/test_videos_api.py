@@ -0,0 +1,97 @@
+"""Tests for conditional GETs of a single video, with the fake database."""
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+import main
+from supabase_client import create_video_summaries, update_video
+
+pytestmark = pytest.mark.anyio
+
+API_KEY = "test-key"
+
+
+@pytest.fixture
+async def api(fake_db):
+    fake_db.add("api_keys", api_key=API_KEY, expires_at=None)
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def video(fake_db):
+    return fake_db.add(
+        "videos", video_url="gs://test-bucket/videos/clip.mp4", title="Clip",
+        duration="0:10", status="processing", key_topics=None, frame_interval=2,
+        sampling="interval", total_frames=0, progress=0.0,
+        updated_at=datetime.now(timezone.utc).isoformat())
+
+
+def summaries(video_id: str, frame_numbers):
+    return [{
+        "video_id": video_id,
+        "frame_number": i,
+        "timestamp": f"0:{i * 2:02d}",
+        "timestamp_seconds": i * 2.0,
+        "description": f"frame {i}",
+    } for i in frame_numbers]
+
+
+def video_reads(fake_db) -> int:
+    return sum(1 for r in fake_db.requests if r.method == "GET" and r.table == "videos")
+
+
+@pytest.mark.parametrize("path", ["/videos/{}", "/api/videos/{}"])
+async def test_unchanged_video_is_answered_with_304(api, video, path):
+    url = path.format(video["id"])
+    headers = {"X-API-Key": API_KEY}
+
+    first = await api.get(url, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('"') and first.json()["id"] == video["id"]
+
+    for if_none_match in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = await api.get(url, headers={**headers, "If-None-Match": if_none_match})
+        assert response.status_code == 304, if_none_match
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+    response = await api.get(url, headers={**headers, "If-None-Match": '"other"'})
+    assert response.status_code == 200
+    assert response.content == first.content
+
+
+async def test_etag_changes_when_summaries_are_stored(api, video):
+    url = f"/videos/{video['id']}"
+    before = await api.get(url)
+
+    # A processing video is read fresh, so new summaries alone change it
+    await create_video_summaries(summaries(video["id"], range(3)))
+
+    after = await api.get(url, headers={"If-None-Match": before.headers["ETag"]})
+    assert after.status_code == 200
+    assert after.headers["ETag"] != before.headers["ETag"]
+    assert [s["frame_number"] for s in after.json()["summaries"]] == [0, 1, 2]
+
+
+async def test_completed_video_is_served_from_cache_until_updated(api, fake_db, video):
+    url = f"/videos/{video['id']}"
+    await create_video_summaries(summaries(video["id"], range(3)))
+    await update_video(video["id"], {"total_frames": 3, "status": "completed"})
+
+    completed = await api.get(url)
+    reads = video_reads(fake_db)
+    cached = await api.get(url, headers={"If-None-Match": completed.headers["ETag"]})
+    assert cached.status_code == 304
+    assert video_reads(fake_db) == reads
+
+    # Summaries stored by a reprocessing job are picked up once the row changes
+    await create_video_summaries(summaries(video["id"], [3]))
+    await update_video(video["id"], {"total_frames": 4})
+    updated = await api.get(url, headers={"If-None-Match": completed.headers["ETag"]})
+    assert updated.status_code == 200
+    assert updated.headers["ETag"] != completed.headers["ETag"]
+    assert len(updated.json()["summaries"]) == 4
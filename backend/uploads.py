@@ -0,0 +1,386 @@
+"""Streaming multipart uploads and resumable chunked upload sessions."""
+import hashlib
+import logging
+import math
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Allowance for multipart boundaries, part headers and small form fields
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class StreamedUpload:
+    """A file part that has been streamed to disk."""
+
+    def __init__(self, path: Path, filename: str, size: int, sha256: str):
+        self.path = path
+        self.filename = filename
+        self.size = size
+        self.sha256 = sha256
+
+
+class _FilePartWriter:
+    """
+    Receives multipart callbacks and writes the file part to disk.
+
+    Data is accumulated into a buffer of ``chunk_size`` bytes which is
+    hashed and flushed to the temp file once full, so memory use is
+    bounded by the chunk size no matter how large the upload is.
+    """
+
+    def __init__(
+        self,
+        field_name: str,
+        dest_dir: Path,
+        max_bytes: int,
+        chunk_size: int,
+        validate_filename: Optional[Callable[[str], bool]] = None,
+    ):
+        self.field_name = field_name
+        self.dest_dir = dest_dir
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.validate_filename = validate_filename
+
+        self.filename: Optional[str] = None
+        self.path: Optional[Path] = None
+        self.size = 0
+        self.error: Optional[HTTPException] = None
+        self.done = False
+
+        self._hasher = hashlib.sha256()
+        self._file = None
+        self._buffer = bytearray()
+        self._pending: list = []
+        self._header_field = b""
+        self._headers: dict = {}
+        self._in_file_part = False
+
+    # Multipart parser callbacks
+
+    def on_part_begin(self):
+        self._headers = {}
+        self._header_field = b""
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        key = self._header_field.lower()
+        self._headers[key] = self._headers.get(key, b"") + data[start:end]
+
+    def on_header_end(self):
+        self._header_field = b""
+
+    def on_headers_finished(self):
+        _, options = parse_options_header(
+            self._headers.get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("latin-1")
+        filename = options.get(b"filename")
+        self._in_file_part = (
+            name == self.field_name and filename is not None and not self.done)
+        if not self._in_file_part:
+            return
+
+        self.filename = filename.decode("utf-8", errors="replace")
+        if self.validate_filename and not self.validate_filename(self.filename):
+            self.error = HTTPException(
+                status_code=400,
+                detail=f"Unsupported video format. Allowed: {', '.join(settings.ALLOWED_VIDEO_EXTENSIONS)}"
+            )
+            return
+
+        temp_file = tempfile.NamedTemporaryFile(
+            delete=False,
+            suffix=Path(self.filename).suffix,
+            dir=self.dest_dir
+        )
+        self._file = temp_file
+        self.path = Path(temp_file.name)
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if not self._in_file_part or self.error:
+            return
+        self.size += end - start
+        if self.size > self.max_bytes:
+            self.error = HTTPException(
+                status_code=400,
+                detail=f"File too large. Maximum size: {settings.MAX_VIDEO_SIZE}MB"
+            )
+            return
+        self._buffer += data[start:end]
+        if len(self._buffer) >= self.chunk_size:
+            self._pending.append(bytes(self._buffer))
+            self._buffer.clear()
+
+    def on_part_end(self):
+        if self._in_file_part and not self.error:
+            if self._buffer:
+                self._pending.append(bytes(self._buffer))
+                self._buffer.clear()
+            self.done = True
+        self._in_file_part = False
+
+    # Disk I/O, run off the event loop
+
+    def _write_pending(self):
+        for chunk in self._pending:
+            self._hasher.update(chunk)
+            self._file.write(chunk)
+        self._pending.clear()
+
+    async def flush(self):
+        if self._pending and self._file is not None:
+            await run_in_threadpool(self._write_pending)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    def discard(self):
+        self.close()
+        if self.path and self.path.exists():
+            self.path.unlink()
+
+    @property
+    def sha256(self) -> str:
+        return self._hasher.hexdigest()
+
+
+async def stream_upload_to_disk(
+    request: Request,
+    field_name: str = "file",
+    dest_dir: Optional[Path] = None,
+    max_bytes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    validate_filename: Optional[Callable[[str], bool]] = None,
+) -> StreamedUpload:
+    """
+    Stream a multipart file upload straight from the request body to disk.
+
+    The body is parsed incrementally as it arrives; the file part is written
+    to ``dest_dir`` in ``chunk_size`` blocks and hashed with SHA-256 on the
+    fly. The upload is aborted as soon as the declared Content-Length or the
+    bytes received exceed ``max_bytes``, without reading the rest of the body.
+
+    Args:
+        request: Incoming request with a multipart/form-data body
+        field_name: Name of the form field holding the file
+        dest_dir: Directory for the temp file (default: UPLOAD_DIR)
+        max_bytes: Maximum file size (default: MAX_VIDEO_SIZE)
+        chunk_size: Write block size (default: UPLOAD_CHUNK_SIZE)
+        validate_filename: Optional check applied to the part's filename
+
+    Returns:
+        StreamedUpload with the temp file path, original filename, size and hash
+
+    Raises:
+        HTTPException: If the body is not multipart, the file is missing,
+            has an unsupported format or is too large
+    """
+    dest_dir = dest_dir or settings.UPLOAD_DIR
+    max_bytes = max_bytes if max_bytes is not None else settings.MAX_VIDEO_SIZE * 1024 * 1024
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+
+    content_type, params = parse_options_header(
+        request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(
+            status_code=400, detail="Expected a multipart/form-data upload")
+
+    # Reject oversized uploads before reading any of the body
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and \
+            int(content_length) > max_bytes + MULTIPART_OVERHEAD:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Maximum size: {settings.MAX_VIDEO_SIZE}MB"
+        )
+
+    writer = _FilePartWriter(
+        field_name, dest_dir, max_bytes, chunk_size, validate_filename)
+    parser = MultipartParser(boundary, callbacks={
+        "on_part_begin": writer.on_part_begin,
+        "on_header_field": writer.on_header_field,
+        "on_header_value": writer.on_header_value,
+        "on_header_end": writer.on_header_end,
+        "on_headers_finished": writer.on_headers_finished,
+        "on_part_data": writer.on_part_data,
+        "on_part_end": writer.on_part_end,
+    })
+
+    try:
+        async for body_chunk in request.stream():
+            parser.write(body_chunk)
+            if writer.error:
+                raise writer.error
+            await writer.flush()
+        parser.finalize()
+        await writer.flush()
+        writer.close()
+    except Exception:
+        writer.discard()
+        raise
+
+    if not writer.done or writer.path is None:
+        writer.discard()
+        raise HTTPException(
+            status_code=400, detail=f"Missing '{field_name}' file in upload")
+
+    logger.info("Streamed upload %s to %s (%d bytes, sha256 %s)",
+                writer.filename, writer.path, writer.size, writer.sha256)
+    return StreamedUpload(writer.path, writer.filename, writer.size, writer.sha256)
+
+
+class UploadSession:
+    """
+    State of a resumable, chunked upload.
+
+    The file is split into ``chunk_count`` chunks of ``chunk_size`` bytes
+    (the last one may be shorter). Each chunk is stored as its own GCS
+    object as it arrives, in any order, and the chunks are composed into
+    the final video when the session is completed.
+
+    The SHA-256 of the file is computed incrementally, in chunk order:
+    ``hasher`` covers the first ``hashed_chunks`` chunks. A chunk that
+    arrives in order is hashed as it streams through; the rest are read back
+    from GCS on completion. ``hash_generation`` changes whenever the hash is
+    reset because an already hashed chunk was replaced.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        size: int,
+        chunk_size: int,
+        frame_interval: int,
+        title: Optional[str] = None,
+        sampling: str = "interval",
+    ):
+        now = datetime.now(timezone.utc)
+        self.id = str(uuid.uuid4())
+        self.filename = filename
+        self.size = size
+        self.chunk_size = chunk_size
+        self.chunk_count = max(1, math.ceil(size / chunk_size))
+        self.frame_interval = frame_interval
+        self.sampling = sampling
+        self.title = title
+        self.received: set = set()
+        self.head: bytes = b""
+        self.hasher = hashlib.sha256()
+        self.hashed_chunks = 0
+        self.hash_generation = 0
+        self.active_chunks = 0  # chunk uploads in progress
+        self.completing = False
+        self.completed = False
+        self.job_id: Optional[str] = None
+        self.created_at = now
+        self.updated_at = now
+
+    def expected_chunk_size(self, index: int) -> int:
+        """Number of bytes chunk ``index`` must contain."""
+        if index == self.chunk_count - 1:
+            return self.size - index * self.chunk_size
+        return self.chunk_size
+
+    def reset_hash(self):
+        """Start the hash over, e.g. because a hashed chunk was replaced."""
+        self.hasher = hashlib.sha256()
+        self.hashed_chunks = 0
+        self.hash_generation += 1
+
+    async def finish_hash(self, read_chunk: Callable[[str], AsyncIterator[bytes]]) -> str:
+        """
+        Hash the chunks not yet hashed, in order, and return the file's SHA-256.
+
+        Args:
+            read_chunk: Streams the contents of a chunk blob, given its name
+        """
+        while self.hashed_chunks < self.chunk_count:
+            # Hash into a copy, so a failed read leaves the state consistent
+            hasher = self.hasher.copy()
+            async for piece in read_chunk(self.chunk_blob_name(self.hashed_chunks)):
+                hasher.update(piece)
+            self.hasher = hasher
+            self.hashed_chunks += 1
+        return self.hasher.hexdigest()
+
+    def chunk_blob_name(self, index: int) -> str:
+        return f"upload_sessions/{self.id}/chunk-{index:05d}"
+
+    @property
+    def missing_chunks(self) -> List[int]:
+        return [i for i in range(self.chunk_count) if i not in self.received]
+
+    def received_ranges(self) -> List[List[int]]:
+        """Received bytes as merged, inclusive ``[start, end]`` ranges."""
+        ranges: List[List[int]] = []
+        for index in sorted(self.received):
+            start = index * self.chunk_size
+            end = start + self.expected_chunk_size(index) - 1
+            if ranges and ranges[-1][1] == start - 1:
+                ranges[-1][1] = end
+            else:
+                ranges.append([start, end])
+        return ranges
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "size": self.size,
+            "chunk_size": self.chunk_size,
+            "chunk_count": self.chunk_count,
+            "received_chunks": sorted(self.received),
+            "received_ranges": self.received_ranges(),
+            "missing_chunks": self.missing_chunks,
+            "completed": self.completed,
+            "job_id": self.job_id,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class UploadSessionStore:
+    """In-memory registry of resumable upload sessions, expiring idle ones."""
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._sessions: Dict[str, UploadSession] = {}
+
+    def create(self, *args, **kwargs) -> UploadSession:
+        session = UploadSession(*args, **kwargs)
+        self._sessions[session.id] = session
+        return session
+
+    def get(self, session_id: str) -> Optional[UploadSession]:
+        return self._sessions.get(session_id)
+
+    def expire(self) -> List[UploadSession]:
+        """Drop sessions idle for longer than the TTL and return them."""
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.ttl_seconds)
+        expired = [s for s in self._sessions.values() if s.updated_at < cutoff]
+        for session in expired:
+            del self._sessions[session.id]
+        return expired
+
+
+# Global upload session store
+upload_session_store = UploadSessionStore(settings.UPLOAD_SESSION_TTL)
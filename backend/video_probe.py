@@ -0,0 +1,489 @@
+"""Lightweight video metadata probe that reads container headers directly.
+
+Parses MP4/MOV (``moov``/``mvhd``/``trak``) and Matroska/WebM (EBML
+``Info``/``Tracks``) headers to get duration, frame rate, resolution and
+codec without opening a decoder. Only the header bytes are read, and the
+parsers also work on a prefix of a file that is still being downloaded.
+Anything that cannot be parsed falls back to OpenCV.
+
+Only the standard library is imported at module level so this module can
+also be used by the Modal worker.
+"""
+import logging
+import struct
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from range_stream import RangeReader
+
+logger = logging.getLogger(__name__)
+
+# Give up looking for Matroska headers after this many bytes
+MAX_HEADER_BYTES = 16 * 1024 * 1024
+PROBE_CACHE_SIZE = 1024
+# Range request size when probing a URL
+HEADER_BLOCK_SIZE = 256 * 1024
+
+MP4_CODECS = {
+    "avc1": "h264", "avc3": "h264",
+    "hvc1": "hevc", "hev1": "hevc",
+    "mp4v": "mpeg4", "av01": "av1", "vp09": "vp9", "vp08": "vp8",
+    "mjpa": "mjpeg", "mjpb": "mjpeg", "jpeg": "mjpeg",
+    "apcn": "prores", "apch": "prores", "apcs": "prores", "apco": "prores",
+}
+
+# FourCCs reported by OpenCV's FFmpeg backend that differ from the MP4 ones
+OPENCV_CODECS = {
+    "h264": "h264", "x264": "h264", "hevc": "hevc", "h265": "hevc",
+    "fmp4": "mpeg4", "xvid": "mpeg4", "divx": "mpeg4", "dx50": "mpeg4",
+    "mjpg": "mjpeg", "vp80": "vp8", "vp90": "vp9", "av01": "av1",
+}
+
+MATROSKA_CODECS = {
+    "V_MPEG4/ISO/AVC": "h264",
+    "V_MPEGH/ISO/HEVC": "hevc",
+    "V_MPEG4/ISO/SP": "mpeg4", "V_MPEG4/ISO/ASP": "mpeg4",
+    "V_VP8": "vp8", "V_VP9": "vp9", "V_AV1": "av1",
+    "V_MJPEG": "mjpeg", "V_THEORA": "theora",
+}
+
+
+class VideoMetadata:
+    """Basic properties of a video stream."""
+
+    def __init__(
+        self,
+        duration: float = 0.0,
+        fps: float = 0.0,
+        width: int = 0,
+        height: int = 0,
+        codec: Optional[str] = None,
+        container: Optional[str] = None,
+        source: str = "header",
+        keyframes: Optional[List[int]] = None,
+    ):
+        self.duration = duration
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.codec = codec
+        self.container = container
+        self.source = source
+        # Zero-based indices of the sync samples, when the container lists them
+        self.keyframes = keyframes
+
+    def to_dict(self) -> Dict:
+        return {
+            "duration": self.duration,
+            "fps": self.fps,
+            "width": self.width,
+            "height": self.height,
+            "codec": self.codec,
+            "container": self.container,
+            "source": self.source,
+            "keyframe_count": len(self.keyframes) if self.keyframes is not None else None,
+        }
+
+    def __repr__(self) -> str:
+        return f"VideoMetadata({self.to_dict()})"
+
+
+# MP4 / MOV
+
+def _iter_boxes(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[str, int, int]]:
+    """Yield (type, payload_start, box_end) for complete boxes in ``data[start:end]``."""
+    end = len(data) if end is None else end
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack(">I4s", data[offset:offset + 8])
+        header = 8
+        if size == 1:
+            if offset + 16 > end:
+                return
+            size = struct.unpack(">Q", data[offset + 8:offset + 16])[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header or offset + size > end:
+            return
+        yield box_type.decode("latin-1"), offset + header, offset + size
+        offset += size
+
+
+def _find_box(data: bytes, start: int, end: int, box_type: str) -> Optional[Tuple[int, int]]:
+    for found_type, payload, box_end in _iter_boxes(data, start, end):
+        if found_type == box_type:
+            return payload, box_end
+    return None
+
+
+def _parse_timing(data: bytes, payload: int) -> Tuple[int, int]:
+    """Read (timescale, duration) from an ``mvhd`` or ``mdhd`` payload."""
+    version = data[payload]
+    if version == 1:
+        return struct.unpack(">IQ", data[payload + 20:payload + 32])
+    return struct.unpack(">II", data[payload + 12:payload + 20])
+
+
+def _parse_moov(moov: bytes) -> Optional[VideoMetadata]:
+    """Extract metadata from the contents of a ``moov`` box."""
+    metadata = VideoMetadata(container="mp4")
+
+    mvhd = _find_box(moov, 0, len(moov), "mvhd")
+    if mvhd:
+        timescale, duration = _parse_timing(moov, mvhd[0])
+        if timescale:
+            metadata.duration = duration / timescale
+
+    for box_type, trak_start, trak_end in _iter_boxes(moov):
+        if box_type != "trak":
+            continue
+        mdia = _find_box(moov, trak_start, trak_end, "mdia")
+        if not mdia:
+            continue
+        hdlr = _find_box(moov, mdia[0], mdia[1], "hdlr")
+        if not hdlr or moov[hdlr[0] + 8:hdlr[0] + 12] != b"vide":
+            continue
+
+        # Video track found
+        tkhd = _find_box(moov, trak_start, trak_end, "tkhd")
+        if tkhd:
+            width, height = struct.unpack(">II", moov[tkhd[1] - 8:tkhd[1]])
+            metadata.width, metadata.height = width >> 16, height >> 16
+
+        track_duration = 0.0
+        timescale = 0
+        mdhd = _find_box(moov, mdia[0], mdia[1], "mdhd")
+        if mdhd:
+            timescale, duration = _parse_timing(moov, mdhd[0])
+            if timescale:
+                track_duration = duration / timescale
+        if not metadata.duration:
+            metadata.duration = track_duration
+
+        minf = _find_box(moov, mdia[0], mdia[1], "minf")
+        stbl = _find_box(moov, minf[0], minf[1], "stbl") if minf else None
+        if stbl:
+            stsd = _find_box(moov, stbl[0], stbl[1], "stsd")
+            if stsd and stsd[0] + 16 <= stsd[1]:
+                fourcc = moov[stsd[0] + 12:stsd[0] + 16].decode("latin-1")
+                metadata.codec = MP4_CODECS.get(fourcc, fourcc.strip())
+                entry = stsd[0] + 8
+                if not metadata.width and entry + 36 <= stsd[1]:
+                    metadata.width, metadata.height = struct.unpack(
+                        ">HH", moov[entry + 32:entry + 36])
+
+            stts = _find_box(moov, stbl[0], stbl[1], "stts")
+            if stts and track_duration:
+                entry_count = struct.unpack(">I", moov[stts[0] + 4:stts[0] + 8])[0]
+                samples = 0
+                for i in range(entry_count):
+                    entry = stts[0] + 8 + i * 8
+                    if entry + 8 > stts[1]:
+                        break
+                    samples += struct.unpack(">I", moov[entry:entry + 4])[0]
+                metadata.fps = samples / track_duration
+
+            stss = _find_box(moov, stbl[0], stbl[1], "stss")
+            if stss:
+                entry_count = struct.unpack(">I", moov[stss[0] + 4:stss[0] + 8])[0]
+                entry_count = min(entry_count, (stss[1] - stss[0] - 8) // 4)
+                sync_samples = struct.unpack(
+                    f">{entry_count}I", moov[stss[0] + 8:stss[0] + 8 + entry_count * 4])
+                metadata.keyframes = [sample - 1 for sample in sync_samples]
+        break
+
+    if metadata.duration <= 0:
+        # e.g. fragmented MP4, where durations live in the fragments
+        return None
+    return metadata
+
+
+def _probe_mp4_bytes(data: bytes) -> Optional[VideoMetadata]:
+    moov = _find_box(data, 0, len(data), "moov")
+    if not moov:
+        return None
+    return _parse_moov(data[moov[0]:moov[1]])
+
+
+def _probe_mp4_file(f) -> Optional[VideoMetadata]:
+    """Find and parse ``moov`` by seeking over the other top-level boxes."""
+    offset = 0
+    while True:
+        f.seek(offset)
+        header = f.read(16)
+        if len(header) < 8:
+            return None
+        size, box_type = struct.unpack(">I4s", header[:8])
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            return None
+        if size < header_size:
+            return None
+        if box_type == b"moov":
+            f.seek(offset + header_size)
+            return _parse_moov(f.read(size - header_size))
+        offset += size
+
+
+# Matroska / WebM
+
+EBML_HEADER = 0x1A45DFA3
+EBML_DOCTYPE = 0x4282
+SEGMENT = 0x18538067
+INFO = 0x1549A966
+TIMECODE_SCALE = 0x2AD7B1
+DURATION = 0x4489
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_TYPE = 0x83
+CODEC_ID = 0x86
+DEFAULT_DURATION = 0x23E383
+VIDEO = 0xE0
+PIXEL_WIDTH = 0xB0
+PIXEL_HEIGHT = 0xBA
+CLUSTER = 0x1F43B675
+
+
+def _read_vint(data: bytes, offset: int, strip_marker: bool) -> Tuple[Optional[int], int]:
+    """Read an EBML variable-length integer; returns (value, length)."""
+    if offset >= len(data):
+        return None, 0
+    first = data[offset]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8 or offset + length > len(data):
+        return None, 0
+    value = first & (mask - 1) if strip_marker else first
+    for byte in data[offset + 1:offset + length]:
+        value = (value << 8) | byte
+    # All value bits set means "unknown size"
+    if strip_marker and value == (1 << (7 * length)) - 1:
+        value = -1
+    return value, length
+
+
+def _iter_elements(data: bytes, start: int, end: int) -> Iterator[Tuple[int, int, int]]:
+    """Yield (id, payload_start, payload_end) for EBML elements in ``data[start:end]``."""
+    offset = start
+    while offset < end:
+        element_id, id_length = _read_vint(data, offset, strip_marker=False)
+        if element_id is None:
+            return
+        size, size_length = _read_vint(data, offset + id_length, strip_marker=True)
+        if size is None:
+            return
+        payload = offset + id_length + size_length
+        payload_end = end if size == -1 else payload + size
+        yield element_id, payload, min(payload_end, end)
+        if payload_end > end:
+            return
+        offset = payload_end
+
+
+def _read_uint(data: bytes, start: int, end: int) -> int:
+    return int.from_bytes(data[start:end], "big")
+
+
+def _read_float(data: bytes, start: int, end: int) -> float:
+    if end - start == 4:
+        return struct.unpack(">f", data[start:end])[0]
+    if end - start == 8:
+        return struct.unpack(">d", data[start:end])[0]
+    return 0.0
+
+
+def _probe_matroska_bytes(data: bytes) -> Optional[VideoMetadata]:
+    elements = _iter_elements(data, 0, len(data))
+    first = next(elements, None)
+    if not first or first[0] != EBML_HEADER:
+        return None
+
+    metadata = VideoMetadata(container="matroska")
+    for element_id, start, end in _iter_elements(data, first[1], first[2]):
+        if element_id == EBML_DOCTYPE:
+            metadata.container = data[start:end].decode("ascii", errors="replace")
+
+    timecode_scale = 1_000_000
+    raw_duration = None
+    found_tracks = False
+    for element_id, seg_start, seg_end in elements:
+        if element_id != SEGMENT:
+            continue
+        for child_id, start, end in _iter_elements(data, seg_start, seg_end):
+            if child_id == INFO:
+                for info_id, i_start, i_end in _iter_elements(data, start, end):
+                    if info_id == TIMECODE_SCALE:
+                        timecode_scale = _read_uint(data, i_start, i_end)
+                    elif info_id == DURATION:
+                        raw_duration = _read_float(data, i_start, i_end)
+            elif child_id == TRACKS:
+                found_tracks = _parse_matroska_tracks(data, start, end, metadata)
+            elif child_id == CLUSTER:
+                break
+        break
+
+    if raw_duration is None or not found_tracks:
+        return None
+    metadata.duration = raw_duration * timecode_scale / 1e9
+    return metadata
+
+
+def _parse_matroska_tracks(data: bytes, start: int, end: int, metadata: VideoMetadata) -> bool:
+    """Fill in codec, resolution and fps from the first video TrackEntry."""
+    for element_id, t_start, t_end in _iter_elements(data, start, end):
+        if element_id != TRACK_ENTRY:
+            continue
+        fields: Dict[int, Tuple[int, int]] = {
+            child_id: (c_start, c_end)
+            for child_id, c_start, c_end in _iter_elements(data, t_start, t_end)
+        }
+        if TRACK_TYPE not in fields or _read_uint(data, *fields[TRACK_TYPE]) != 1:
+            continue
+
+        if CODEC_ID in fields:
+            codec_id = data[slice(*fields[CODEC_ID])].decode("ascii", errors="replace").rstrip("\x00")
+            metadata.codec = MATROSKA_CODECS.get(codec_id, codec_id)
+        if DEFAULT_DURATION in fields:
+            frame_ns = _read_uint(data, *fields[DEFAULT_DURATION])
+            if frame_ns:
+                metadata.fps = 1e9 / frame_ns
+        if VIDEO in fields:
+            for video_id, v_start, v_end in _iter_elements(data, *fields[VIDEO]):
+                if video_id == PIXEL_WIDTH:
+                    metadata.width = _read_uint(data, v_start, v_end)
+                elif video_id == PIXEL_HEIGHT:
+                    metadata.height = _read_uint(data, v_start, v_end)
+        return True
+    return False
+
+
+# Public API
+
+def probe_bytes(data: bytes) -> Optional[VideoMetadata]:
+    """
+    Parse video metadata from the leading bytes of a file.
+
+    Args:
+        data: The whole file or a prefix of it (e.g. the head of a download)
+
+    Returns:
+        VideoMetadata, or None if the headers are not (fully) in ``data``
+    """
+    try:
+        if data[4:8] in (b"ftyp", b"moov", b"free", b"wide", b"mdat", b"skip"):
+            return _probe_mp4_bytes(data)
+        if data[:4] == b"\x1a\x45\xdf\xa3":
+            return _probe_matroska_bytes(data)
+    except (struct.error, IndexError, ValueError) as e:
+        logger.debug("Could not parse video header: %s", e)
+    return None
+
+
+def probe_header(video_path: str) -> Optional[VideoMetadata]:
+    """
+    Parse video metadata from a file's container headers only.
+
+    ``video_path`` may also be an HTTP(S) URL; only the header bytes are
+    then fetched, with range requests.
+
+    Returns:
+        VideoMetadata, or None if the container is not supported or the
+        headers cannot be parsed
+    """
+    try:
+        with _open(video_path) as f:
+            head = f.read(16)
+            f.seek(0)
+            if head[4:8] in (b"ftyp", b"moov", b"free", b"wide", b"mdat", b"skip"):
+                return _probe_mp4_file(f)
+            if head[:4] == b"\x1a\x45\xdf\xa3":
+                # Info and Tracks normally sit near the start; read more if not
+                size = 256 * 1024
+                while True:
+                    data = f.read(size)
+                    metadata = _probe_matroska_bytes(data)
+                    if metadata or len(data) < size or size >= MAX_HEADER_BYTES:
+                        return metadata
+                    f.seek(0)
+                    size *= 4
+    except (OSError, struct.error, IndexError, ValueError) as e:
+        logger.debug("Could not parse video header of %s: %s", video_path, e)
+    return None
+
+
+def _open(video_path: str):
+    """Open a local file or an HTTP(S) URL for seekable binary reading."""
+    if video_path.startswith(("http://", "https://")):
+        return RangeReader(video_path, block_size=HEADER_BLOCK_SIZE)
+    return open(video_path, "rb")
+
+
+def probe_with_opencv(video_path: str) -> VideoMetadata:
+    """Read video metadata by opening the file with OpenCV."""
+    import cv2
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video file: {video_path}")
+
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+        codec = "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip().lower()
+        return VideoMetadata(
+            duration=frame_count / fps if fps > 0 else 0.0,
+            fps=fps,
+            width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            codec=OPENCV_CODECS.get(codec, MP4_CODECS.get(codec, codec)) or None,
+            source="opencv",
+        )
+    finally:
+        cap.release()
+
+
+_probe_cache: "OrderedDict[str, VideoMetadata]" = OrderedDict()
+_probe_cache_lock = threading.Lock()
+
+
+def probe_video(video_path: str, content_hash: Optional[str] = None) -> VideoMetadata:
+    """
+    Get video metadata from the container headers, falling back to OpenCV.
+
+    Args:
+        video_path: Path to the video file
+        content_hash: Optional hash of the file contents; results are cached
+            by it, so the same video is only probed once
+
+    Returns:
+        VideoMetadata
+
+    Raises:
+        ValueError: If the file can be neither parsed nor opened
+    """
+    if content_hash:
+        with _probe_cache_lock:
+            if content_hash in _probe_cache:
+                _probe_cache.move_to_end(content_hash)
+                return _probe_cache[content_hash]
+
+    metadata = probe_header(video_path)
+    if metadata is None:
+        logger.info("Falling back to OpenCV to probe %s", video_path)
+        metadata = probe_with_opencv(video_path)
+
+    if content_hash:
+        with _probe_cache_lock:
+            _probe_cache[content_hash] = metadata
+            if len(_probe_cache) > PROBE_CACHE_SIZE:
+                _probe_cache.popitem(last=False)
+    return metadata
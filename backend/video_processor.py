@@ -1,10 +1,80 @@
 # video_processor.py
 import modal
+import bisect
+import contextlib
 import json
-from typing import List, Dict
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import TYPE_CHECKING, Callable, Iterator, List, Dict, Optional, Tuple, Union
+
+# Imported at module level so Modal mounts them alongside this file
+from frame_cache import FrameDescriptionCache
+from range_stream import HeaderProvider, RangeReader, RangeServer
+from video_probe import probe_header
+
+if TYPE_CHECKING:
+    from PIL import Image
 
 app = modal.App("video-frame-processor")
 
+# Longest image edge the SmolVLM processor works with; frames are
+# downscaled to this while decoding instead of inside the processor
+MAX_IMAGE_EDGE = 1536
+
+# Codecs OpenCV's bundled FFmpeg decodes directly, so no transcode is needed
+DECODABLE_CODECS = {"h264", "hevc", "mpeg4", "vp8", "vp9", "av1", "mjpeg"}
+
+# Without a keyframe index, only seek when skipping at least this long
+MIN_SEEK_SECONDS = 4.0
+
+# Decoded batches buffered ahead of inference; bounds frame memory
+PREFETCH_BATCHES = 2
+
+# Decode videos straight from GCS with range requests instead of
+# downloading them first (see stream_video)
+STREAM_FROM_GCS = True
+# Lifetime of the signed URLs used for streaming
+SIGNED_URL_SECONDS = 6 * 3600
+
+# Frame sampling modes: a fixed interval, or one frame per shot
+SAMPLING_MODES = ("interval", "scene")
+
+# Scene sampling: frames analysed per second for shot boundaries
+SCENE_ANALYSIS_FPS = 6
+# Bhattacharyya distance between HSV histograms that counts as a cut
+SCENE_HIST_THRESHOLD = 0.35
+# Mean absolute luma change (0-255) that counts as a cut
+SCENE_LUMA_THRESHOLD = 40.0
+# Cuts closer together than this are treated as one (flashes, fades)
+SCENE_MIN_SHOT_SECONDS = 0.4
+# A frame is taken at least every SCENE_MAX_GAP_INTERVALS * interval seconds
+SCENE_MAX_GAP_INTERVALS = 5
+# Frames the budget lets a burst of short shots take ahead of the interval rate
+SCENE_BURST_FRAMES = 16
+
+# Frames whose 64-bit dHash is within this many bits of the last described
+# frame reuse its description; negative disables deduplication
+DEDUP_DISTANCE = 5
+
+DEFAULT_MODEL_ID = "HuggingFaceTB/SmolVLM-Instruct"
+PROMPT = "Describe what's happening in this video."
+# Models a worker keeps loaded at once (least recently used is evicted)
+MAX_RESIDENT_MODELS = 2
+# Model precisions: "auto" (fp16 on GPU, fp32 on CPU), or CPU-only "fp32"
+# and "int8" (dynamically quantized language model, see load_model)
+PRECISIONS = ("auto", "fp32", "int8")
+# Upper bound on tokens generated per frame description
+MAX_NEW_TOKENS = 100
+
+# Frame-description cache shared by all worker containers
+cache_volume = modal.Volume.from_name("frame-description-cache", create_if_missing=True)
+CACHE_DIR = "/cache"
+FRAME_CACHE_MAX_ENTRIES = 100_000
+
 # Minimal FFmpeg install
 image = (
     modal.Image.debian_slim(python_version="3.11")
@@ -21,159 +91,870 @@ image = (
 )
 
 
-@app.function(
-    image=image,
-    gpu="A10G",
-    timeout=3600,
-    secrets=[modal.Secret.from_name("gcp-secret")],
-    memory=16384,
-)
-def process_video_on_gpu(
-    gcp_bucket_name: str,
-    gcp_blob_path: str,
-    interval: int = 2,
-    batch_size: int = 8,
-    model_id: str = "HuggingFaceTB/SmolVLM-Instruct"
-) -> List[Dict]:
-    """Process video frames on Modal GPU."""
-    import cv2
+class ModelCache:
+    """
+    Keeps loaded ``(model, processor)`` pairs resident, keyed by model ID.
+
+    Holds at most ``max_models`` models; loading another evicts the least
+    recently used one.
+    """
+
+    def __init__(self, max_models: int = MAX_RESIDENT_MODELS,
+                 loader: Optional[Callable[[str], Tuple]] = None):
+        self.max_models = max_models
+        self._loader = loader or load_model
+        self._models: "OrderedDict[str, Tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, model_id: str) -> Tuple:
+        """Return ``(model, processor)`` for ``model_id``, loading it if needed."""
+        with self._lock:
+            if model_id in self._models:
+                self._models.move_to_end(model_id)
+                self.hits += 1
+                return self._models[model_id]
+
+            self.misses += 1
+            entry = self._loader(model_id)
+            self._models[model_id] = entry
+            while len(self._models) > self.max_models:
+                evicted_id, _ = self._models.popitem(last=False)
+                print(f"Evicted model: {evicted_id}")
+                _release_memory()
+            return entry
+
+    @property
+    def model_ids(self) -> List[str]:
+        return list(self._models)
+
+
+def _release_memory():
+    """Return freed model memory to the GPU allocator."""
+    import gc
+
+    gc.collect()
+    if "torch" in sys.modules:
+        import torch
+
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+
+def load_model(model_id: str, precision: str = "auto", threads: int = 0) -> Tuple:
+    """
+    Load a VLM and its processor.
+
+    Args:
+        model_id: HuggingFace model ID
+        precision: ``"auto"`` loads fp16 on GPU and fp32 on CPU. ``"fp32"``
+            and ``"int8"`` always run on CPU; ``"int8"`` also quantizes the
+            language model (see ``quantize_language_model``)
+        threads: Intra-op threads for CPU inference (process-wide); 0 keeps
+            torch's default of one per core
+
+    Raises:
+        ValueError: If ``precision`` is unknown
+    """
     import torch
-    import subprocess
-    from PIL import Image
     from transformers import AutoProcessor, AutoModelForVision2Seq
-    from google.cloud import storage
-    from google.oauth2 import service_account
+
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}'. Choose from: {', '.join(PRECISIONS)}")
+    if threads > 0:
+        torch.set_num_threads(threads)
+
+    print(f"Loading model: {model_id} ({precision})")
+    start = time.perf_counter()
+    processor = AutoProcessor.from_pretrained(model_id)
+    if precision == "auto" and torch.cuda.is_available():
+        model = AutoModelForVision2Seq.from_pretrained(
+            model_id, torch_dtype=torch.float16, device_map="auto"
+        )
+    else:
+        model = AutoModelForVision2Seq.from_pretrained(
+            model_id, torch_dtype=torch.float32)
+    model.eval()
+    if precision == "int8":
+        quantize_language_model(model)
+    print(f"Model loaded in {time.perf_counter() - start:.1f}s")
+    return model, processor
+
+
+def quantize_language_model(model):
+    """
+    Apply dynamic int8 quantization to the language model, in place.
+
+    Every ``nn.Linear`` in the text decoder and the LM head stores int8
+    weights, and activations are quantized per batch at run time. This
+    cuts their memory four-fold and speeds up CPU matmuls. The vision
+    encoder and connector stay fp32. Descriptions differ slightly from the
+    unquantized model's, so they are cached separately (see
+    ``process_batch``).
+    """
+    import torch
+    from torch.ao.quantization import default_dynamic_qconfig, quantize_dynamic
+
+    quantize_dynamic(
+        model,
+        {"model.text_model": default_dynamic_qconfig, "lm_head": default_dynamic_qconfig},
+        mapping={torch.nn.Linear: torch.ao.nn.quantized.dynamic.Linear},
+        inplace=True,
+    )
+    model.quantization = "int8"
+    return model
+
+
+def download_blob(storage_client, gcp_bucket_name: str, gcp_blob_path: str) -> str:
+    """Download a GCS object to a temp file and return its path."""
     import os
-    import json
     import tempfile
 
-    print(f"Starting video processing: {gcp_blob_path}")
-    print(f"GPU available: {torch.cuda.is_available()}")
-
-    # Download video from GCP
-    print("Downloading video from GCP...")
-    credentials_json = os.environ.get("GCP_SERVICE_KEY")
-    credentials_dict = json.loads(credentials_json)
-    credentials = service_account.Credentials.from_service_account_info(
-        credentials_dict)
+    suffix = os.path.splitext(gcp_blob_path)[1] or ".mp4"
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+        storage_client.bucket(gcp_bucket_name).blob(
+            gcp_blob_path).download_to_filename(tmp_file.name)
+        return tmp_file.name
+
+
+def signed_blob_url(storage_client, gcp_bucket_name: str, gcp_blob_path: str) -> str:
+    """V4 signed GET URL for a GCS object, valid for ``SIGNED_URL_SECONDS``."""
+    from datetime import timedelta
+
+    return storage_client.bucket(gcp_bucket_name).blob(gcp_blob_path).generate_signed_url(
+        version="v4", expiration=timedelta(seconds=SIGNED_URL_SECONDS), method="GET")
+
+
+@contextlib.contextmanager
+def stream_video(url: str, headers: Union[Dict[str, str], HeaderProvider, None] = None,
+                 suffix: str = ".mp4") -> Iterator[str]:
+    """
+    Make a remote video decodable without downloading it.
+
+    Yields a loopback URL that serves ``url`` through a ``RangeReader``.
+    OpenCV and FFmpeg open it like a file: the container index is read
+    first, and seeks to sampled frames only fetch the blocks around them.
+    Going through the loopback server rather than handing ``url`` to FFmpeg
+    lets requests carry ``headers`` (or a callable that returns fresh ones
+    for every request), keeps fetched blocks cached across the several
+    times a video is opened (probe, transcode check, decode), and counts
+    the bytes transferred, which are printed on exit.
+    """
+    started = time.perf_counter()
+    reader = RangeReader(url, headers)
+    try:
+        with RangeServer(reader, filename=f"video{suffix}") as server:
+            yield server.url
+    finally:
+        print(f"Streamed {reader.bytes_fetched / 1e6:.1f} of {reader.size / 1e6:.1f} MB "
+              f"in {reader.requests} range requests over {time.perf_counter() - started:.1f}s")
 
-    storage_client = storage.Client(credentials=credentials)
-    bucket = storage_client.bucket(gcp_bucket_name)
-    blob = bucket.blob(gcp_blob_path)
 
-    with tempfile.NamedTemporaryFile(delete=False, suffix='_original.mp4') as tmp_file:
-        blob.download_to_filename(tmp_file.name)
-        original_video_path = tmp_file.name
+def transcode_video(video_path: str) -> str:
+    """Re-encode a video to H.264 (downscaled, no audio); returns the new path."""
+    import subprocess
+    import tempfile
 
-    # Convert to H.264
-    print("Converting video to H.264...")
     with tempfile.NamedTemporaryFile(delete=False, suffix='_converted.mp4') as converted_file:
         converted_video_path = converted_file.name
 
     ffmpeg_cmd = [
-        'ffmpeg', '-i', original_video_path,
+        'ffmpeg', '-i', video_path,
+        '-vf', f"scale='if(gt(iw,ih),min({MAX_IMAGE_EDGE},iw),-2)':'if(gt(iw,ih),-2,min({MAX_IMAGE_EDGE},ih))'",
         '-c:v', 'libx264', '-preset', 'fast', '-crf', '23',
-        '-c:a', 'aac', '-y', converted_video_path
+        '-an', '-y', converted_video_path
     ]
 
     subprocess.run(ffmpeg_cmd, capture_output=True, check=True)
-    print("Video converted")
+    return converted_video_path
+
+
+def describe_video(
+    video_path: str,
+    interval: int,
+    batch_size: int,
+    model_id: str,
+    models: ModelCache,
+    dedup_distance: int = DEDUP_DISTANCE,
+    cache: Optional[FrameDescriptionCache] = None,
+    sampling: str = "interval",
+    start: float = 0.0,
+    end: Optional[float] = None,
+    max_new_tokens: int = MAX_NEW_TOKENS,
+) -> List[Dict]:
+    """Run ``describe_video_batches`` to completion and return all summaries."""
+    return [summary for summaries in describe_video_batches(
+                video_path, interval, batch_size, model_id, models,
+                dedup_distance, cache, sampling, start, end, max_new_tokens)
+            for summary in summaries]
+
+
+def describe_video_batches(
+    video_path: str,
+    interval: int,
+    batch_size: int,
+    model_id: str,
+    models: ModelCache,
+    dedup_distance: int = DEDUP_DISTANCE,
+    cache: Optional[FrameDescriptionCache] = None,
+    sampling: str = "interval",
+    start: float = 0.0,
+    end: Optional[float] = None,
+    max_new_tokens: int = MAX_NEW_TOKENS,
+    model_executor: Optional[Executor] = None,
+) -> Iterator[List[Dict]]:
+    """
+    Sample frames from a local video (or a URL, see ``stream_video``),
+    describe them with a cached model and yield the summaries one batch at
+    a time. Descriptions are at most ``max_new_tokens`` tokens long.
+
+    ``sampling`` picks the frames: ``"interval"`` takes one every
+    ``interval`` seconds, ``"scene"`` one per shot (see ``iter_scene_frames``).
+    Only ``[start, end)`` seconds are sampled, and frames are numbered from
+    0 within that range (see ``shards.merge_shard_streams``).
+
+    Decoding starts before the model is fetched from ``models``, so a cold
+    model load overlaps with the first batches being decoded. Near-duplicate
+    frames are not sent to the model (see ``iter_summary_batches``), nor are
+    frames found in the cross-video ``cache``.
+
+    Transcoding and decoding run on the calling thread and a background
+    decoder; with a ``model_executor``, only the ``generate`` calls are
+    submitted to it.
+    """
+    import os
 
+    started = time.perf_counter()
+    # Convert to H.264 only if OpenCV cannot decode the original
+    converted_video_path = None
+    if needs_transcode(video_path):
+        print("Converting video to H.264...")
+        converted_video_path = transcode_video(video_path)
+        video_path = converted_video_path
+        print("Video converted")
+    else:
+        print("Video is decodable as-is, skipping conversion")
+
+    # The queue is bounded, so the decoder blocks once it is
+    # PREFETCH_BATCHES ahead of inference
+    batches = BatchPrefetcher(_log_first_frame(
+        sample_frames(video_path, interval, sampling, start=start, end=end), started), batch_size)
     try:
-        # Extract frames
-        print("Extracting frames...")
-        frames, timestamps = extract_frames(converted_video_path, interval)
-        print(f"Extracted {len(frames)} frames")
-
-        # Load model
-        print(f"Loading model: {model_id}")
-        processor = AutoProcessor.from_pretrained(model_id)
-        model = AutoModelForVision2Seq.from_pretrained(
-            model_id, torch_dtype=torch.float16, device_map="auto"
-        )
-        model.eval()
-        print("Model loaded")
-
-        # Process frames
-        descriptions = []
-        for i in range(0, len(frames), batch_size):
-            batch = frames[i:i+batch_size]
-            batch_descriptions = process_batch(batch, model, processor)
-            descriptions.extend(batch_descriptions)
-            print(
-                f"Processed {min(i+batch_size, len(frames))}/{len(frames)} frames")
+        model, processor = models.get(model_id)
+        yield from iter_summary_batches(
+            batches,
+            lambda images, hashes: process_batch(
+                images, model, processor, max_new_tokens, hashes=hashes, cache=cache,
+                model_id=model_id, executor=model_executor),
+            dedup_distance)
+        if cache is not None:
+            print(f"Frame cache: {cache.hits} hits, {cache.misses} misses in this worker")
+    finally:
+        batches.close()
+        if converted_video_path:
+            os.remove(converted_video_path)
 
-        summaries = []
-        for i, (ts, desc) in enumerate(zip(timestamps, descriptions)):
-            summaries.append({
-                "timestamp": format_timestamp(ts),
-                "timestamp_seconds": ts,
-                "description": desc,
-                "frame_number": i
-            })
 
-        return summaries
+def _log_first_frame(frames: Iterator, started: float) -> Iterator:
+    """Pass ``frames`` through, printing how long the first one took to decode."""
+    for i, frame in enumerate(frames):
+        if i == 0:
+            print(f"First frame decoded {time.perf_counter() - started:.2f}s after opening the video")
+        yield frame
+
+
+@app.cls(
+    image=image,
+    gpu="A10G",
+    timeout=3600,
+    secrets=[modal.Secret.from_name("gcp-secret")],
+    memory=16384,
+    volumes={CACHE_DIR: cache_volume},
+)
+class VideoProcessor:
+    """
+    GPU worker that keeps models loaded across videos.
+
+    The default model and the GCS client are created once per container in
+    ``load``; each ``process`` call then only pays for fetching, decoding and
+    inference while the container stays warm. Videos are decoded from a
+    signed URL with range requests (``STREAM_FROM_GCS``), so frames are
+    described while the rest of the file is still in the bucket.
+
+    Frame descriptions are cached in SQLite on a shared Volume. Each call
+    reloads the Volume first and commits it afterwards. Containers that
+    commit at the same time can overwrite each other's new entries, which
+    only costs cache hits.
+    """
+
+    @modal.enter()
+    def load(self):
+        import os
+        import torch
+        from google.cloud import storage
+        from google.oauth2 import service_account
+
+        print(f"GPU available: {torch.cuda.is_available()}")
+        credentials = service_account.Credentials.from_service_account_info(
+            json.loads(os.environ["GCP_SERVICE_KEY"]))
+        self.storage_client = storage.Client(credentials=credentials)
+        self.models = ModelCache(MAX_RESIDENT_MODELS)
+        self.models.get(DEFAULT_MODEL_ID)
+        # No WAL: the shared-memory index does not work on network volumes
+        self.frame_cache = FrameDescriptionCache(
+            f"{CACHE_DIR}/frame_descriptions.sqlite3", FRAME_CACHE_MAX_ENTRIES, wal=False)
+
+    @modal.method()
+    def process_stream(
+        self,
+        gcp_bucket_name: str,
+        gcp_blob_path: str,
+        interval: int = 2,
+        batch_size: int = 8,
+        model_id: str = DEFAULT_MODEL_ID,
+        dedup_distance: int = DEDUP_DISTANCE,
+        sampling: str = "interval",
+        start: float = 0.0,
+        end: Optional[float] = None
+    ) -> Iterator[List[Dict]]:
+        """
+        Process video frames on Modal GPU, yielding the summaries of each
+        batch as soon as it is described. Call with
+        ``process_stream.remote_gen`` (see ``inference_backend.ModalBackend``).
+
+        ``start`` and ``end`` limit processing to one time range of the
+        video, so a long video can be fanned out over several containers.
+        """
+        yield from self._describe_blob(
+            gcp_bucket_name, gcp_blob_path, interval, batch_size, model_id,
+            dedup_distance, sampling, start, end)
+
+    def _describe_blob(self, gcp_bucket_name: str, gcp_blob_path: str, interval: int,
+                       batch_size: int, model_id: str, dedup_distance: int, sampling: str,
+                       start: float, end: Optional[float]) -> Iterator[List[Dict]]:
+        import os
+
+        print(f"Starting video processing: {gcp_blob_path} [{start:.0f}s, "
+              f"{'end' if end is None else f'{end:.0f}s'})")
+        with contextlib.ExitStack() as stack:
+            if STREAM_FROM_GCS:
+                print("Streaming video from GCP...")
+                video_path = stack.enter_context(stream_video(
+                    signed_blob_url(self.storage_client, gcp_bucket_name, gcp_blob_path),
+                    suffix=os.path.splitext(gcp_blob_path)[1] or ".mp4"))
+            else:
+                print("Downloading video from GCP...")
+                started = time.perf_counter()
+                video_path = download_blob(
+                    self.storage_client, gcp_bucket_name, gcp_blob_path)
+                stack.callback(os.remove, video_path)
+                print(f"Downloaded {os.path.getsize(video_path) / 1e6:.1f} MB "
+                      f"in {time.perf_counter() - started:.1f}s")
+            cache_volume.reload()
+            stack.callback(cache_volume.commit)
+            yield from describe_video_batches(
+                video_path, interval, batch_size, model_id, self.models,
+                dedup_distance, self.frame_cache, sampling, start, end)
+
+
+# Per-process state of local shard workers (see init_shard_worker)
+_shard_models: Optional[ModelCache] = None
+_shard_frame_cache: Optional[FrameDescriptionCache] = None
+
+
+def init_shard_worker(max_models: int = MAX_RESIDENT_MODELS,
+                      frame_cache_path: Optional[str] = None,
+                      frame_cache_max_entries: int = FRAME_CACHE_MAX_ENTRIES,
+                      loader: Optional[Callable[[str], Tuple]] = None):
+    """
+    Set up a process-pool worker that runs ``describe_shard``.
+
+    Each worker keeps its own resident models; the frame cache file is
+    shared by all of them.
+    """
+    global _shard_models, _shard_frame_cache
+    _shard_models = ModelCache(max_models, loader)
+    _shard_frame_cache = FrameDescriptionCache(
+        frame_cache_path, frame_cache_max_entries) if frame_cache_path else None
+
+
+def describe_shard(video_path: str, interval: int, batch_size: int, model_id: str,
+                   dedup_distance: int, sampling: str, start: float,
+                   end: Optional[float], max_new_tokens: int = MAX_NEW_TOKENS) -> List[Dict]:
+    """Describe one time range of a local video in a pool worker."""
+    return describe_video(
+        video_path, interval, batch_size, model_id, _shard_models,
+        dedup_distance, _shard_frame_cache, sampling, start, end, max_new_tokens)
+
+
+def needs_transcode(video_path: str) -> bool:
+    """Whether the video has to be re-encoded before OpenCV can decode it."""
+    import cv2
+
+    metadata = probe_header(video_path)
+    if metadata is not None and metadata.codec not in DECODABLE_CODECS:
+        return True
+
+    cap = cv2.VideoCapture(video_path)
+    try:
+        return not (cap.isOpened() and cap.grab())
     finally:
-        os.remove(original_video_path)
-        os.remove(converted_video_path)
+        cap.release()
+
+
+def resize_to_max_edge(frame, max_edge: Optional[int]):
+    """Downscale a frame so its longest edge is at most ``max_edge``."""
+    import cv2
 
+    height, width = frame.shape[:2]
+    if not max_edge or max(height, width) <= max_edge:
+        return frame
+    scale = max_edge / max(height, width)
+    return cv2.resize(
+        frame, (max(1, round(width * scale)), max(1, round(height * scale))),
+        interpolation=cv2.INTER_AREA)
 
-def extract_frames(video_path: str, interval: int = 2):
+
+def dhash(frame, hash_size: int = 8) -> int:
+    """
+    Perceptual difference hash of a BGR frame.
+
+    The frame is reduced to a ``(hash_size + 1) x hash_size`` grayscale
+    thumbnail and each bit records whether brightness increases between
+    horizontally adjacent pixels, giving a ``hash_size ** 2``-bit integer
+    that is stable under re-encoding, noise and small changes.
+    """
+    import cv2
+    import numpy as np
+
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    thumbnail = cv2.resize(
+        gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = thumbnail[:, 1:] > thumbnail[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def iter_frames(
+    video_path: str,
+    interval: int = 2,
+    max_edge: Optional[int] = MAX_IMAGE_EDGE,
+    start: float = 0.0,
+    end: Optional[float] = None,
+) -> Iterator[Tuple["Image.Image", float, int]]:
+    """
+    Yield ``(frame, timestamp, dhash)`` for one frame every ``interval`` seconds.
+
+    Only the sampled frames are decoded in full. Between samples the reader
+    either grabs (demuxes and decodes without colour conversion) or, when a
+    keyframe lies between the current position and the next sample, seeks
+    straight to it. Sampled frames are downscaled to ``max_edge`` before
+    being converted to PIL images.
+
+    With ``start`` and ``end`` only samples in ``[start, end)`` seconds are
+    yielded. Samples stay on the whole video's grid, so consecutive ranges
+    together yield exactly the frames of one pass over the video.
+    """
     import cv2
     from PIL import Image
 
     cap = cv2.VideoCapture(video_path)
     fps = cap.get(cv2.CAP_PROP_FPS)
-    frame_interval = int(fps * interval)
-    frames, timestamps = [], []
-    frame_count = 0
-
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-        if frame_count % frame_interval == 0:
+    frame_total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frame_interval = max(1, int(fps * interval))
+    metadata = probe_header(video_path)
+    keyframes = metadata.keyframes if metadata else None
+    min_seek_gap = max(1, int(fps * MIN_SEEK_SECONDS))
+    start_frame, end_frame = _frame_range(fps, start, end)
+    if frame_total > 0:
+        end_frame = min(end_frame, frame_total)
+
+    position = 0  # index of the next frame the reader will return
+    target = -(-start_frame // frame_interval) * frame_interval
+
+    try:
+        while cap.isOpened() and target < end_frame:
+            gap = target - position
+            if keyframes:
+                # Seek only if it lands on a keyframe past the current position
+                k = bisect.bisect_right(keyframes, target) - 1
+                should_seek = k >= 0 and keyframes[k] > position
+            else:
+                should_seek = gap >= min_seek_gap
+
+            if should_seek and cap.set(cv2.CAP_PROP_POS_FRAMES, target):
+                position = target
+            else:
+                while position < target and cap.grab():
+                    position += 1
+                if position < target:
+                    break
+
+            ret, frame = cap.read()
+            if not ret:
+                break
+            position += 1
+
+            frame = resize_to_max_edge(frame, max_edge)
             rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            frames.append(Image.fromarray(rgb_frame))
-            timestamps.append(frame_count / fps)
-        frame_count += 1
+            yield Image.fromarray(rgb_frame), target / fps, dhash(frame)
+            target += frame_interval
+    finally:
+        cap.release()
 
-    cap.release()
-    return frames, timestamps
 
+def iter_scene_frames(
+    video_path: str,
+    interval: int = 2,
+    max_edge: Optional[int] = MAX_IMAGE_EDGE,
+    start: float = 0.0,
+    end: Optional[float] = None,
+) -> Iterator[Tuple["Image.Image", float, int]]:
+    """
+    Yield ``(frame, timestamp, dhash)`` for one frame per shot.
+
+    Every frame is grabbed, and ``SCENE_ANALYSIS_FPS`` frames per second are
+    decoded and reduced to a small thumbnail. A shot boundary is a jump in
+    the thumbnail's HSV colour histogram or mean luma from the previous
+    analysed frame; cuts within ``SCENE_MIN_SHOT_SECONDS`` of each other
+    are merged, keeping the last one, so flashes and fades give one frame.
+    Shots longer than ``SCENE_MAX_GAP_INTERVALS * interval`` seconds get a
+    safety frame each time that gap passes.
+
+    Frames are budgeted like a token bucket: on average at most one per
+    ``interval`` seconds, with up to ``SCENE_BURST_FRAMES`` saved up during
+    long shots for runs of short ones. Cuts found while the budget is
+    spent are dropped.
+
+    With ``start`` and ``end`` only ``[start, end)`` seconds are analysed;
+    the first frame of the range counts as a cut.
+    """
+    import cv2
+    import numpy as np
+    from PIL import Image
 
-def process_batch(images, model, processor):
-    import torch
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 25.0
+    analysis_step = max(1, round(fps / SCENE_ANALYSIS_FPS))
+    min_shot = SCENE_MIN_SHOT_SECONDS
+    max_gap = SCENE_MAX_GAP_INTERVALS * interval
+
+    start_frame, end_frame = _frame_range(fps, start, end)
+
+    tokens = float(SCENE_BURST_FRAMES)
+    last_time = start_frame / fps
+    last_emitted = None  # timestamp of the last yielded frame
+    pending = None  # (frame, timestamp, features before the cut) of an unconfirmed cut
+    previous = None  # (histogram, luma) of the previous analysed frame
+
+    def take_token(timestamp: float) -> bool:
+        nonlocal tokens, last_time
+        tokens = min(SCENE_BURST_FRAMES, tokens + max(0.0, timestamp - last_time) / interval)
+        last_time = timestamp
+        if tokens < 1:
+            return False
+        tokens -= 1
+        return True
+
+    def is_shot_change(a, b) -> bool:
+        return (cv2.compareHist(a[0], b[0], cv2.HISTCMP_BHATTACHARYYA) >= SCENE_HIST_THRESHOLD
+                or float(np.abs(a[1] - b[1]).mean()) >= SCENE_LUMA_THRESHOLD)
+
+    def emit(frame, timestamp: float):
+        nonlocal last_emitted
+        last_emitted = timestamp
+        frame = resize_to_max_edge(frame, max_edge)
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return Image.fromarray(rgb_frame), timestamp, dhash(frame)
+
+    position = 0
+    if start_frame and cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame):
+        position = start_frame
+    try:
+        while cap.isOpened() and position < end_frame and cap.grab():
+            position += 1
+            if position <= start_frame or (position - 1) % analysis_step:
+                continue
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+            timestamp = (position - 1) / fps
+
+            thumbnail = cv2.resize(frame, (64, 36), interpolation=cv2.INTER_AREA)
+            hist = cv2.calcHist([cv2.cvtColor(thumbnail, cv2.COLOR_BGR2HSV)], [0, 1, 2],
+                                None, [8, 4, 4], [0, 180, 0, 256, 0, 256])
+            cv2.normalize(hist, hist)
+            luma = cv2.cvtColor(thumbnail, cv2.COLOR_BGR2GRAY).astype(np.int16)
+            features = (hist, luma)
+            is_cut = previous is None or is_shot_change(previous, features)
+
+            if pending is not None and timestamp - pending[1] >= min_shot:
+                if take_token(pending[1]):
+                    yield emit(pending[0], pending[1])
+                pending = None
+
+            if is_cut and pending is not None and pending[2] is not None \
+                    and not is_shot_change(pending[2], features):
+                # Back to the shot before the pending cut: it was a flash
+                pending = None
+            elif is_cut:
+                # Keep the features from before the first of a run of cuts
+                before = pending[2] if pending is not None else previous
+                pending = (frame, timestamp, before)
+            elif (pending is None and last_emitted is not None
+                  and timestamp - last_emitted >= max_gap and take_token(timestamp)):
+                yield emit(frame, timestamp)
+            previous = features
+
+        if pending is not None and take_token(pending[1]):
+            yield emit(pending[0], pending[1])
+    finally:
+        cap.release()
 
-    descriptions = []
 
-    # Process each image individually (batching doesn't work well with this model)
-    for image in images:
-        messages = [{
-            "role": "user",
-            "content": [
-                {"type": "image"},
-                {"type": "text", "text": "Describe what's happening in this video."}
-            ]
-        }]
+def _frame_range(fps: float, start: float, end: Optional[float]) -> Tuple[int, float]:
+    """Frame indices ``[start_frame, end_frame)`` of a time range."""
+    start_frame = max(0, round(start * fps))
+    end_frame = round(end * fps) if end is not None else float("inf")
+    return start_frame, end_frame
 
-        prompt_text = processor.apply_chat_template(
-            messages, add_generation_prompt=True)
-        inputs = processor(text=prompt_text, images=[
-                           image], return_tensors="pt")
 
-        device = next(model.parameters()).device
-        inputs = {k: v.to(device) for k, v in inputs.items()}
+def sample_frames(
+    video_path: str,
+    interval: int = 2,
+    sampling: str = "interval",
+    max_edge: Optional[int] = MAX_IMAGE_EDGE,
+    start: float = 0.0,
+    end: Optional[float] = None,
+) -> Iterator[Tuple["Image.Image", float, int]]:
+    """Yield ``(frame, timestamp, dhash)`` for the frames ``sampling`` selects."""
+    if sampling == "interval":
+        return iter_frames(video_path, interval, max_edge, start, end)
+    if sampling == "scene":
+        return iter_scene_frames(video_path, interval, max_edge, start, end)
+    raise ValueError(
+        f"Unknown sampling mode '{sampling}'. Choose from: {', '.join(SAMPLING_MODES)}")
+
+
+class BatchPrefetcher:
+    """
+    Decodes frames on a background thread into a bounded queue of batches.
+
+    Iterating yields lists of up to ``batch_size`` items from ``frames``.
+    The decoder stays at most ``max_batches`` batches ahead of the consumer,
+    so at most ``max_batches + 2`` batches of frames are alive at once
+    (queued, being filled, and being consumed) however long the video is.
+    Decoder errors are re-raised in the consumer.
+    """
+
+    def __init__(self, frames: Iterator, batch_size: int, max_batches: int = PREFETCH_BATCHES):
+        self.batch_size = batch_size
+        self._frames = frames
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_batches)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._produce, name="frame-decoder", daemon=True)
+        self._thread.start()
+
+    def _put(self, kind: str, payload=None) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._queue.put((kind, payload), timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        batch = []
+        try:
+            for item in self._frames:
+                batch.append(item)
+                if len(batch) == self.batch_size:
+                    if not self._put("batch", batch):
+                        return
+                    batch = []
+            if batch and not self._put("batch", batch):
+                return
+            self._put("done")
+        except Exception as e:
+            self._put("error", e)
+        finally:
+            close = getattr(self._frames, "close", None)
+            if close:
+                close()
+
+    def __iter__(self) -> Iterator[List[Tuple]]:
+        while True:
+            kind, payload = self._queue.get()
+            if kind == "batch":
+                yield payload
+            elif kind == "error":
+                raise payload
+            else:
+                return
+
+    def close(self):
+        """Stop the decoder thread and drop any queued batches."""
+        self._stop.set()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        self._thread.join(timeout=5)
+
+
+def iter_summary_batches(
+    batches: Iterator[List[Tuple["Image.Image", float, Optional[int]]]],
+    describe_batch: Callable[[List["Image.Image"], List[Optional[int]]], List[str]],
+    dedup_distance: int = DEDUP_DISTANCE,
+) -> Iterator[List[Dict]]:
+    """
+    Run ``describe_batch(images, hashes)`` over batches of frames and yield
+    the summaries of each batch as soon as it is described.
+
+    A frame whose hash is within ``dedup_distance`` bits of the last frame
+    sent to the model is not described again: it reuses that frame's
+    description and its summary gets ``reused_from`` set to the described
+    frame's number. Comparing against the last described frame, rather
+    than the previous frame, keeps slow drift from chaining duplicates.
+    """
+    count = 0
+    last_hash = None
+    last_number = None
+    last_description = None
+    for batch in batches:
+        sources = []
+        new_images = []
+        new_hashes = []
+        for i, (frame, _, frame_hash) in enumerate(batch):
+            if (dedup_distance >= 0 and frame_hash is not None and last_hash is not None
+                    and hamming_distance(frame_hash, last_hash) <= dedup_distance):
+                sources.append(last_number)
+            else:
+                sources.append(None)
+                new_images.append(frame)
+                new_hashes.append(frame_hash)
+                last_hash, last_number = frame_hash, count + i
+
+        start = time.perf_counter()
+        descriptions = iter(describe_batch(new_images, new_hashes) if new_images else [])
+        elapsed = time.perf_counter() - start
 
-        with torch.no_grad():
-            outputs = model.generate(**inputs, max_new_tokens=100)
+        summaries = []
+        for (_, ts, _), source in zip(batch, sources):
+            if source is None:
+                last_description = next(descriptions)
+            summary = {
+                "timestamp": format_timestamp(ts),
+                "timestamp_seconds": ts,
+                "description": last_description,
+                "frame_number": count + len(summaries)
+            }
+            if source is not None:
+                summary["reused_from"] = source
+            summaries.append(summary)
+        count += len(summaries)
+        rate = f", {len(new_images) / elapsed:.1f} frames/s" if new_images else ""
+        print(f"Processed {count} frames ({len(new_images)} described, "
+              f"{len(batch) - len(new_images)} reused{rate})")
+        yield summaries
+
+
+def _strip_prompt(decoded: str) -> str:
+    """Keep only the text after the last "Assistant:" marker."""
+    return decoded.split(
+        "Assistant:")[-1].strip() if "Assistant:" in decoded else decoded.strip()
+
+
+def process_batch(
+    images,
+    model,
+    processor,
+    max_new_tokens: int = MAX_NEW_TOKENS,
+    hashes: Optional[List[int]] = None,
+    cache: Optional[FrameDescriptionCache] = None,
+    model_id: Optional[str] = None,
+    executor: Optional[Executor] = None,
+):
+    """
+    Describe a batch of frames with a single ``generate`` call.
+
+    Prompts are left-padded so that generation for every sample continues
+    from the same position, and each decoded sequence is cut after its own
+    "Assistant:" marker.
+
+    With a ``cache`` and the frames' perceptual ``hashes``, frames already
+    described (in any video) are looked up first and only the rest go to
+    ``generate``; their descriptions are then added to the cache.
+    Quantized models and each ``max_new_tokens`` have their own cache
+    entries.
+
+    With an ``executor``, the ``generate`` call runs on it and this waits
+    for the result; cache lookups stay on the calling thread.
+    """
+    if not images:
+        return []
+    if executor is None:
+        generate = _generate_descriptions
+    else:
+        def generate(*args):
+            return executor.submit(_generate_descriptions, *args).result()
+    if cache is None or hashes is None:
+        return generate(images, model, processor, max_new_tokens)
+
+    model_id = model_id or model.name_or_path
+    if getattr(model, "quantization", None):
+        model_id = f"{model_id}:{model.quantization}"
+    # Descriptions are cut off at max_new_tokens, so each cap has its own entries
+    model_id = f"{model_id}:max_new_tokens={max_new_tokens}"
+    cached = cache.get_many(model_id, PROMPT, hashes)
+    pending = [i for i, frame_hash in enumerate(hashes) if frame_hash not in cached]
+    generated = generate(
+        [images[i] for i in pending], model, processor, max_new_tokens) if pending else []
+    cache.put_many(model_id, PROMPT, {hashes[i]: desc for i, desc in zip(pending, generated)})
+
+    descriptions = [cached.get(frame_hash) for frame_hash in hashes]
+    for i, desc in zip(pending, generated):
+        descriptions[i] = desc
+    return descriptions
 
-        decoded = processor.decode(outputs[0], skip_special_tokens=True)
-        desc = decoded.split(
-            "Assistant:")[-1].strip() if "Assistant:" in decoded else decoded.strip()
-        descriptions.append(desc)
 
-    return descriptions
+def _generate_descriptions(images, model, processor, max_new_tokens: int = MAX_NEW_TOKENS):
+    """Run one batched ``generate`` call over ``images``."""
+    import torch
+
+    messages = [{
+        "role": "user",
+        "content": [
+            {"type": "image"},
+            {"type": "text", "text": PROMPT}
+        ]
+    }]
+
+    prompt_text = processor.apply_chat_template(
+        messages, add_generation_prompt=True)
+    processor.tokenizer.padding_side = "left"
+    inputs = processor(
+        text=[prompt_text] * len(images),
+        images=[[image] for image in images],
+        return_tensors="pt",
+        padding=True,
+    )
+
+    device = next(model.parameters()).device
+    inputs = {k: v.to(device) for k, v in inputs.items()}
+
+    with torch.no_grad():
+        outputs = model.generate(**inputs, max_new_tokens=max_new_tokens)
+
+    decoded = processor.batch_decode(outputs, skip_special_tokens=True)
+    return [_strip_prompt(text) for text in decoded]
 
 
 def format_timestamp(seconds: float) -> str:
@@ -185,12 +966,12 @@ def format_timestamp(seconds: float) -> str:
 
 @app.local_entrypoint()
 def test():
-    """Test the Modal function locally."""
-    result = process_video_on_gpu.remote(
+    """Test the Modal worker from a local shell."""
+    result = [summary for summaries in VideoProcessor().process_stream.remote_gen(
         gcp_bucket_name="youtube_storage_nex",
         # Try the other video
         gcp_blob_path="_Td7JjCTfyc_30 second animation assignment.mp4.mp4",
         interval=2,
         batch_size=8
-    )
+    ) for summary in summaries]
     print(json.dumps(result[:3], indent=2))  # Print first 3 results
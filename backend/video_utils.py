@@ -1,32 +1,56 @@
 """Video utility functions."""
-import cv2
-from typing import Tuple
+import os
+import tempfile
+from typing import Optional
 
+from video_probe import probe_bytes, probe_video, probe_with_opencv
 
-def get_video_duration(video_path: str) -> float:
+
+def get_video_duration(video_path: str, content_hash: Optional[str] = None) -> float:
     """
     Get the duration of a video in seconds.
-    
+
+    Reads the container headers (see ``video_probe``) and only opens the
+    video with OpenCV if they cannot be parsed.
+
     Args:
         video_path: Path to the video file
-    
+        content_hash: Optional SHA-256 of the file, used to cache the result
+
     Returns:
         Duration in seconds
     """
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        raise ValueError(f"Could not open video file: {video_path}")
-    
+    return probe_video(video_path, content_hash).duration
+
+
+def get_video_duration_from_head(head: bytes, suffix: str = ".mp4") -> float:
+    """
+    Estimate the duration of a video from the first bytes of the file.
+
+    Works when the container metadata is at the start of the file (e.g.
+    "faststart" MP4s or WebM); otherwise returns 0.0.
+
+    Args:
+        head: Leading bytes of the video file
+        suffix: File extension hinting the container format
+
+    Returns:
+        Duration in seconds, or 0.0 if it could not be determined
+    """
+    metadata = probe_bytes(head)
+    if metadata is not None:
+        return metadata.duration
+
+    # Containers the probe does not parse (AVI, FLV, ...) go through OpenCV
+    fd, path = tempfile.mkstemp(suffix=suffix)
     try:
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
-        if fps > 0:
-            duration = frame_count / fps
-            return duration
-        else:
-            return 0.0
+        with os.fdopen(fd, "wb") as f:
+            f.write(head)
+        return probe_with_opencv(path).duration
+    except ValueError:
+        return 0.0
     finally:
-        cap.release()
+        os.remove(path)
 
 
 def format_timestamp(seconds: float) -> str:
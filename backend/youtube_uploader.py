@@ -1,6 +1,7 @@
 """YouTube video uploader using Apify and Google Cloud Storage."""
 import json
 import logging
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional
 from apify_client import ApifyClient
@@ -10,10 +11,26 @@ from config import settings
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4)
+def _read_gcp_service_key(path: str, mtime: float) -> Dict[str, Any]:
+    """Parse a service key file; cached per path and modification time."""
+    try:
+        with open(path, 'r') as f:
+            service_key = json.load(f)
+        logger.info("Loaded GCP service key from: %s", path)
+        return service_key
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON in service key file: {e}")
+    except Exception as e:
+        raise ValueError(f"Error reading service key file: {e}")
+
+
 def load_gcp_service_key() -> Dict[str, Any]:
     """
     Load Google Cloud service account key from JSON file.
 
+    The file is parsed once and cached until it changes on disk.
+
     Returns:
         Service key dictionary
 
@@ -29,15 +46,9 @@ def load_gcp_service_key() -> Dict[str, Any]:
             f"Set GCP_SERVICE_KEY_PATH environment variable or place service-key.json in backend folder."
         )
 
-    try:
-        with open(service_key_path, 'r') as f:
-            service_key = json.load(f)
-        logger.info("Loaded GCP service key from: %s", service_key_path)
-        return service_key
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Invalid JSON in service key file: {e}")
-    except Exception as e:
-        raise ValueError(f"Error reading service key file: {e}")
+    # Return a copy so callers cannot modify the cached key
+    return dict(_read_gcp_service_key(
+        str(service_key_path), service_key_path.stat().st_mtime))
 
 
 def upload_youtube_to_gcp(
@@ -40,6 +40,19 @@ export interface ApiKeyResponse {
   id: string;
 }
 
+export interface JobResponse {
+  id: string;
+  kind: string;
+  video_id?: string;
+  status: 'queued' | 'running' | 'completed' | 'failed';
+  stage: string;
+  progress: number;
+  error?: string;
+  result: Record<string, any>;
+  created_at: string;
+  updated_at: string;
+}
+
 export interface VideoListResponse {
   videos: ProcessUrlResponse[];
   total: number;
@@ -78,12 +91,28 @@ export async function uploadYouTubeVideo(
 }
 
 /**
- * Process a video from a URL (GCP URL or regular URL)
+ * Get the status of a background processing job
+ */
+export async function getJob(jobId: string): Promise<JobResponse> {
+  const response = await fetch(`${API_URL}/jobs/${jobId}`);
+
+  if (!response.ok) {
+    const error = await response.json().catch(() => ({ detail: 'Unknown error' }));
+    throw new Error(error.detail || `HTTP ${response.status}`);
+  }
+
+  return response.json();
+}
+
+/**
+ * Process a video from a URL (GCP URL or regular URL).
+ * Queues a job and polls it until the video has been processed.
  */
 export async function processVideoUrl(
   url: string,
   frameInterval: number = 5,
-  title?: string
+  title?: string,
+  pollIntervalMs: number = 2000
 ): Promise<ProcessUrlResponse> {
   const response = await fetch(`${API_URL}/videos/process-url`, {
     method: 'POST',
@@ -102,7 +131,23 @@ export async function processVideoUrl(
     throw new Error(error.detail || `HTTP ${response.status}`);
   }
 
-  return response.json();
+  let job: JobResponse = await response.json();
+  while (job.status === 'queued' || job.status === 'running') {
+    await new Promise((resolve) => setTimeout(resolve, pollIntervalMs));
+    job = await getJob(job.id);
+  }
+
+  if (job.status === 'failed') {
+    throw new Error(job.error || 'Video processing failed');
+  }
+
+  const videoResponse = await fetch(`${API_URL}/videos/${job.video_id}`);
+  if (!videoResponse.ok) {
+    const error = await videoResponse.json().catch(() => ({ detail: 'Unknown error' }));
+    throw new Error(error.detail || `HTTP ${videoResponse.status}`);
+  }
+
+  return videoResponse.json();
 }
 
 /**